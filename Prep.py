@@ -1,19 +1,59 @@
-import React, { useState, useRef, useEffect } from 'react';
+import React, { useState, useRef, useEffect, useLayoutEffect, useMemo, useCallback } from 'react';
+import {
+  createStore,
+  emptyRateWindow,
+  groupChannel,
+  recordRate,
+  telemetry,
+  useStoreSelector,
+  type RateWindow,
+  type Store
+} from './core.tsx';
+import { DEFAULT_BLOCKED_WORDS, compileBlockedWords } from './shared/moderation.mjs';
+import { createIdGenerator } from './shared/ids.mjs';
+import { FloodGuard, normalizeUserName } from './shared/flood.mjs';
+import { PRESENCE_HEARTBEAT_MS, type PresenceDelta } from './shared/presence.mjs';
+import { IMAGE_WORKER_SOURCE } from './shared/image-worker.mjs';
+import { SEARCH_WORKER_SOURCE } from './shared/search-worker.mjs';
+import { BlobUploader, blobUrl, hashBlob } from './shared/blobs.mjs';
 
 interface Message {
   id: string;
   name: string;
   text: string;
   timestamp: Date;
+  // GENERAL_CHANNEL or groupChannel(groupId)
+  channel: string;
   isFlagged?: boolean;
   image?: string;
+  thumbnail?: string;
+  imageRefs?: ImageRefs;
+  // Own messages the server hasn't acknowledged yet, or has rejected
+  status?: 'pending' | 'failed';
 }
 
-interface JeeResource {
-  id: number;
-  title: string;
-  url: string;
-  description: string;
+// An optimistic message and the version the server acknowledged
+interface MessageUpdate {
+  previousId: string;
+  message: Message;
+}
+
+// Content addresses (hex SHA-256) of an image's uploaded renditions
+interface ImageRefs {
+  thumbnail: string;
+  display: string;
+}
+
+interface ImageUrls {
+  thumbnail: string;
+  display: string;
+  // Set once the renditions have been hashed and queued for upload
+  refs?: ImageRefs;
+}
+
+interface FlagInfo {
+  name: string;
+  flaggedAt: number;
 }
 
 interface StudyGroup {
@@ -23,89 +63,1688 @@ interface StudyGroup {
   isJoined: boolean;
 }
 
-const PrepBoosterChat: React.FC = () => {
-  // State management
+// Ids sort in time order (see shared/ids.mjs)
+const createMessageId = createIdGenerator();
+
+// Index of the first message whose id is >= id (lists are kept id-sorted)
+const lowerBoundById = (items: Message[], id: string) => {
+  let lo = 0;
+  let hi = items.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (items[mid].id < id) {
+      lo = mid + 1;
+    } else {
+      hi = mid;
+    }
+  }
+  return lo;
+};
+
+const indexOfId = (items: Message[], id: string) => {
+  const index = lowerBoundById(items, id);
+  return items[index]?.id === id ? index : -1;
+};
+
+// Merges id-sorted `incoming` into id-sorted `current`, skipping duplicates.
+// Live traffic is almost always newer than the tail, which is an O(1) push.
+const mergeSortedMessages = (current: Message[], incoming: Message[]) => {
+  const result = current.slice();
+  for (const message of incoming) {
+    const last = result[result.length - 1];
+    if (!last || last.id < message.id) {
+      result.push(message);
+      continue;
+    }
+    const index = lowerBoundById(result, message.id);
+    if (result[index]?.id !== message.id) result.splice(index, 0, message);
+  }
+  return result;
+};
+
+// Applies updates to an id-sorted list in place. A changed id moves the
+// message with two binary searches; if the new id is already present (the
+// server echoed it before acking) the optimistic copy is just dropped.
+const reconcileSortedMessages = (items: Message[], updates: MessageUpdate[]) => {
+  updates.forEach(({ previousId, message }) => {
+    const index = indexOfId(items, previousId);
+    if (index >= 0) items.splice(index, 1);
+    const at = lowerBoundById(items, message.id);
+    if (items[at]?.id !== message.id) items.splice(at, 0, message);
+  });
+};
+
+// Channels
+// Everyone is in the general channel; each study group is its own channel,
+// and clients only receive and store traffic for the groups they've joined.
+const GENERAL_CHANNEL = 'general';
+
+const groupByChannel = <T,>(items: T[], channelOf: (item: T) => string) => {
+  const groups = new Map<string, T[]>();
+  items.forEach(item => {
+    const group = groups.get(channelOf(item));
+    if (group) {
+      group.push(item);
+    } else {
+      groups.set(channelOf(item), [item]);
+    }
+  });
+  return groups;
+};
+
+// Content-addressed image uploads (see shared/blobs.mjs)
+const whenOnline = () => new Promise<void>(resolve => {
+  if (navigator.onLine) {
+    resolve();
+  } else {
+    window.addEventListener('online', () => resolve(), { once: true });
+  }
+});
+
+const blobUploads = new BlobUploader({ whenOnline });
+
+// Resolves once both renditions are on the server
+const uploadImage = async (image: ImageUrls) => {
+  const { refs } = image;
+  if (!refs) throw new Error('Image was not hashed');
+  const renditions: [string, string][] = [[refs.display, image.display], [refs.thumbnail, image.thumbnail]];
+  await Promise.all(renditions.map(async ([hash, url]) =>
+    blobUploads.pending(hash) ?? blobUploads.upload(hash, await fetch(url).then(response => response.blob()))
+  ));
+};
+
+// Image pipeline
+// Decoding, downscaling and re-encoding run in a worker (see
+// shared/image-worker.mjs) so large photos never block the chat; the results
+// are kept as Blobs behind object URLs instead of base64 strings in state.
+let imageWorker: Worker | null = null;
+// Set when the worker fails to start or dies; images then take the main-thread path
+let imageWorkerFailed = false;
+let nextImageJobId = 0;
+interface ImageJobResult {
+  thumbnail?: Blob;
+  display?: Blob;
+  thumbnailHash?: string;
+  displayHash?: string;
+  error?: string;
+}
+
+const imageJobs = new Map<number, (result: ImageJobResult) => void>();
+
+const getImageWorker = () => {
+  if (!imageWorker) {
+    const source = URL.createObjectURL(new Blob([IMAGE_WORKER_SOURCE], { type: 'text/javascript' }));
+    imageWorker = new Worker(source);
+    URL.revokeObjectURL(source);
+    imageWorker.onmessage = (event) => {
+      const { id, ...result } = event.data;
+      imageJobs.get(id)?.(result);
+      imageJobs.delete(id);
+    };
+    // A worker blocked from starting (e.g. by CSP) or dead would leave its
+    // jobs waiting forever; fail them over to the fallback instead
+    imageWorker.onerror = (event) => {
+      event.preventDefault();
+      imageWorker?.terminate();
+      imageWorker = null;
+      imageWorkerFailed = true;
+      imageJobs.forEach(resolve => resolve({ error: event.message || 'Image worker failed' }));
+      imageJobs.clear();
+    };
+  }
+  return imageWorker;
+};
+
+// Produces a thumbnail and a capped-resolution copy and starts uploading
+// both; falls back to the original file when the browser lacks
+// OffscreenCanvas, the worker fails or decoding fails.
+const processImage = async (file: File): Promise<ImageUrls> => {
+  if (!imageWorkerFailed && typeof Worker !== 'undefined' && typeof OffscreenCanvas !== 'undefined') {
+    const id = nextImageJobId++;
+    const result = await new Promise<ImageJobResult>(resolve => {
+      imageJobs.set(id, resolve);
+      getImageWorker().postMessage({ id, file });
+    }).catch((error): ImageJobResult => {
+      // new Worker() itself threw
+      imageJobs.delete(id);
+      imageWorkerFailed = true;
+      return { error: String(error) };
+    });
+    const { thumbnail, display, thumbnailHash, displayHash } = result;
+    if (thumbnail && display && thumbnailHash && displayHash) {
+      blobUploads.upload(displayHash, display).catch(() => undefined);
+      blobUploads.upload(thumbnailHash, thumbnail).catch(() => undefined);
+      return {
+        thumbnail: URL.createObjectURL(thumbnail),
+        display: URL.createObjectURL(display),
+        refs: { thumbnail: thumbnailHash, display: displayHash }
+      };
+    }
+  }
+  const url = URL.createObjectURL(file);
+  const refs = await hashBlob(file).then(hash => {
+    blobUploads.upload(hash, file).catch(() => undefined);
+    return { thumbnail: hash, display: hash };
+  }, () => undefined);
+  return { thumbnail: url, display: url, refs };
+};
+
+const releaseImageUrls = (urls: ImageUrls) => {
+  URL.revokeObjectURL(urls.thumbnail);
+  if (urls.display !== urls.thumbnail) URL.revokeObjectURL(urls.display);
+};
+
+const releaseMessageImages = (items: Message[]) => {
+  items.forEach(message => {
+    if (message.image) releaseImageUrls({ thumbnail: message.thumbnail ?? message.image, display: message.image });
+  });
+};
+
+// Real-time transport
+// Messages are queued and flushed in batches, presence and group membership
+// are coalesced to their latest state, and the client resumes from the last
+// message id it has seen after a reconnect. The server fans each message out
+// only to subscribers of its channel; hello re-subscribes after a reconnect.
+// Sent messages stay queued until acked and are re-sent after a reconnect
+// under the same client id, which the server uses as an idempotency key.
+// A message still unacked ACK_TIMEOUT_MS after it was sent is given up on
+// and reported, so the user can retry it.
+// server/chat.mjs is a stand-in that speaks this protocol.
+const CHAT_SOCKET_URL = typeof window !== 'undefined'
+  ? `${window.location.protocol === 'https:' ? 'wss' : 'ws'}://${window.location.host}/chat`
+  : '';
+const FLUSH_INTERVAL_MS = 50;
+const MAX_BATCH_SIZE = 100;
+const MAX_OUTBOX_SIZE = 1000;
+const SOCKET_HIGH_WATER_BYTES = 256 * 1024;
+const MAX_RECONNECT_DELAY_MS = 30000;
+const ACK_TIMEOUT_MS = 10000;
+
+interface WireMessage {
+  id: string;
+  name: string;
+  text: string;
+  timestamp: number;
+  channel: string;
+  isFlagged?: boolean;
+  image?: ImageRefs;
+  // Set on outgoing messages only
+  clientId?: string;
+}
+
+// The server's verdict on one of our messages; it assigns the final id and
+// timestamp and has the last word on moderation and bans
+interface WireAck {
+  clientId: string;
+  id: string;
+  timestamp: number;
+  isFlagged?: boolean;
+  rejected?: 'banned' | 'blocked';
+}
+
+type ServerEvent =
+  | { type: 'messages'; messages: WireMessage[] }
+  | { type: 'acks'; acks: WireAck[] }
+  // Full list on connect, deltas after that
+  | { type: 'presence'; online: string[] }
+  | ({ type: 'presenceDelta' } & PresenceDelta)
+  | { type: 'groups'; members: Record<string, number> };
+
+interface TransportHandlers {
+  onMessages: (messages: Message[]) => void;
+  onPresence: (online: string[]) => void;
+  onPresenceDelta: (delta: PresenceDelta) => void;
+  onGroupMembers: (members: Record<string, number>) => void;
+  onAcks: (acks: WireAck[]) => void;
+  // Client ids of messages that went unacked for ACK_TIMEOUT_MS
+  onAckTimeout: (clientIds: string[]) => void;
+}
+
+// Images travel as content hashes; receivers load them from the blob server
+const toWireMessage = (message: Message): WireMessage => ({
+  id: message.id,
+  name: message.name,
+  text: message.text,
+  timestamp: message.timestamp.getTime(),
+  channel: message.channel,
+  isFlagged: message.isFlagged,
+  image: message.imageRefs
+});
+
+const fromWireMessage = (message: WireMessage): Message => ({
+  id: message.id,
+  name: message.name,
+  text: message.text,
+  timestamp: new Date(message.timestamp),
+  channel: message.channel ?? GENERAL_CHANNEL,
+  isFlagged: message.isFlagged,
+  image: message.image && blobUrl(message.image.display),
+  thumbnail: message.image && blobUrl(message.image.thumbnail),
+  imageRefs: message.image
+});
+
+class ChatTransport {
+  private socket: WebSocket | null = null;
+  private outbox: WireMessage[] = [];
+  // Sent but not yet acknowledged, in send order (and so deadline order)
+  private unacked = new Map<string, { message: WireMessage; deadline: number }>();
+  private pendingPresence: boolean | null = null;
+  private pendingGroups = new Map<number, boolean>();
+  private channels = new Set([GENERAL_CHANNEL]);
+  private flushTimer: ReturnType<typeof setTimeout> | null = null;
+  private reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+  private heartbeatTimer: ReturnType<typeof setInterval> | null = null;
+  private ackTimer: ReturnType<typeof setTimeout> | null = null;
+  private reconnectDelay = 500;
+  private lastMessageId: string | null = null;
+  private closed = false;
+
+  constructor(private url: string, private name: string, private handlers: TransportHandlers) {}
+
+  connect() {
+    if (this.closed || !this.url) return;
+    const socket = new WebSocket(this.url);
+    this.socket = socket;
+
+    socket.onopen = () => {
+      this.reconnectDelay = 500;
+      socket.send(JSON.stringify({
+        type: 'hello',
+        name: this.name,
+        resumeAfter: this.lastMessageId,
+        channels: [...this.channels]
+      }));
+      this.pendingPresence = true;
+      // Anything unacked may not have arrived; the server drops repeats by clientId
+      this.outbox = [...this.unacked.values()].map(entry => entry.message);
+      this.scheduleFlush(0);
+      this.heartbeatTimer = setInterval(() => {
+        if (socket.readyState === WebSocket.OPEN) socket.send(JSON.stringify({ type: 'heartbeat' }));
+      }, PRESENCE_HEARTBEAT_MS);
+    };
+
+    socket.onmessage = (event) => {
+      const data: ServerEvent = JSON.parse(event.data);
+      if (data.type === 'messages' && data.messages.length) {
+        this.lastMessageId = data.messages[data.messages.length - 1].id;
+        // Drops stragglers for channels left while they were in flight
+        const messages = data.messages.map(fromWireMessage).filter(message => this.channels.has(message.channel));
+        if (messages.length) this.handlers.onMessages(messages);
+      } else if (data.type === 'presence') {
+        this.handlers.onPresence(data.online);
+      } else if (data.type === 'presenceDelta') {
+        this.handlers.onPresenceDelta(data);
+      } else if (data.type === 'groups') {
+        this.handlers.onGroupMembers(data.members);
+      } else if (data.type === 'acks') {
+        data.acks.forEach(ack => this.unacked.delete(ack.clientId));
+        this.handlers.onAcks(data.acks);
+      }
+    };
+
+    socket.onclose = () => {
+      this.socket = null;
+      if (this.heartbeatTimer) clearInterval(this.heartbeatTimer);
+      this.heartbeatTimer = null;
+      if (this.closed) return;
+      // Exponential backoff with jitter so a server restart isn't stampeded
+      const delay = this.reconnectDelay * (0.5 + Math.random());
+      this.reconnectDelay = Math.min(this.reconnectDelay * 2, MAX_RECONNECT_DELAY_MS);
+      this.reconnectTimer = setTimeout(() => this.connect(), delay);
+    };
+  }
+
+  // Returns false when too many messages are awaiting acks and it was not
+  // queued. Retrying a message sends it again under its original client id.
+  send(message: Message) {
+    if (this.unacked.size >= MAX_OUTBOX_SIZE) return false;
+    const wire = { ...toWireMessage(message), clientId: message.id };
+    this.unacked.delete(message.id);
+    this.unacked.set(message.id, { message: wire, deadline: Date.now() + ACK_TIMEOUT_MS });
+    this.outbox.push(wire);
+    this.scheduleFlush(FLUSH_INTERVAL_MS);
+    this.scheduleAckCheck();
+    return true;
+  }
+
+  setGroupMembership(groupId: number, joined: boolean) {
+    if (joined) {
+      this.channels.add(groupChannel(groupId));
+    } else {
+      this.channels.delete(groupChannel(groupId));
+    }
+    this.pendingGroups.set(groupId, joined);
+    this.scheduleFlush(FLUSH_INTERVAL_MS);
+  }
+
+  close() {
+    this.closed = true;
+    if (this.flushTimer) clearTimeout(this.flushTimer);
+    if (this.reconnectTimer) clearTimeout(this.reconnectTimer);
+    if (this.heartbeatTimer) clearInterval(this.heartbeatTimer);
+    if (this.ackTimer) clearTimeout(this.ackTimer);
+    if (this.socket?.readyState === WebSocket.OPEN) {
+      this.socket.send(JSON.stringify({ type: 'presence', online: false }));
+    }
+    this.socket?.close();
+    this.socket = null;
+  }
+
+  private scheduleFlush(delay: number) {
+    if (this.flushTimer || this.closed) return;
+    this.flushTimer = setTimeout(() => {
+      this.flushTimer = null;
+      this.flush();
+    }, delay);
+  }
+
+  // One timer for the oldest deadline; later ones can only be further out
+  private scheduleAckCheck() {
+    if (this.ackTimer || this.closed) return;
+    const oldest = this.unacked.values().next().value;
+    if (!oldest) return;
+    this.ackTimer = setTimeout(() => {
+      this.ackTimer = null;
+      this.expireUnacked();
+    }, Math.max(0, oldest.deadline - Date.now()));
+  }
+
+  private expireUnacked() {
+    const now = Date.now();
+    const expired: string[] = [];
+    for (const [clientId, { deadline }] of this.unacked) {
+      if (deadline > now) break;
+      expired.push(clientId);
+    }
+    if (expired.length) {
+      expired.forEach(clientId => this.unacked.delete(clientId));
+      const gone = new Set(expired);
+      this.outbox = this.outbox.filter(message => !gone.has(message.clientId!));
+      this.handlers.onAckTimeout(expired);
+    }
+    this.scheduleAckCheck();
+  }
+
+  private flush() {
+    const socket = this.socket;
+    if (!socket || socket.readyState !== WebSocket.OPEN) return;
+    // Backpressure: let the socket drain before queueing more frames
+    if (socket.bufferedAmount > SOCKET_HIGH_WATER_BYTES) {
+      this.scheduleFlush(FLUSH_INTERVAL_MS * 4);
+      return;
+    }
+
+    if (this.pendingPresence !== null) {
+      socket.send(JSON.stringify({ type: 'presence', online: this.pendingPresence }));
+      this.pendingPresence = null;
+    }
+    if (this.pendingGroups.size) {
+      socket.send(JSON.stringify({ type: 'groups', membership: Object.fromEntries(this.pendingGroups) }));
+      this.pendingGroups.clear();
+    }
+    if (this.outbox.length) {
+      socket.send(JSON.stringify({ type: 'messages', messages: this.outbox.splice(0, MAX_BATCH_SIZE) }));
+    }
+    if (this.outbox.length) this.scheduleFlush(FLUSH_INTERVAL_MS);
+  }
+}
+
+// Chat history storage
+// Each channel's full history lives in its own store; only a window of pages
+// around what the user is looking at is kept in React state.
+interface HistoryStore {
+  append(messages: Message[]): Promise<void>;
+  latest(limit: number): Promise<Message[]>;
+  before(id: string, limit: number): Promise<Message[]>;
+  after(id: string, limit: number): Promise<Message[]>;
+  // Swaps optimistic messages for their acknowledged versions
+  replace(updates: MessageUpdate[]): Promise<void>;
+  // Both resolve with the messages that were removed
+  remove(ids: string[]): Promise<Message[]>;
+  clear(): Promise<Message[]>;
+}
+
+export class MemoryHistoryStore implements HistoryStore {
+  private items: Message[] = [];
+
+  async append(messages: Message[]) {
+    this.items = mergeSortedMessages(this.items, messages);
+  }
+
+  async latest(limit: number) {
+    return this.items.slice(-limit);
+  }
+
+  // Cursors need not still exist; pages are bounded by id order
+  async before(id: string, limit: number) {
+    const index = lowerBoundById(this.items, id);
+    return this.items.slice(Math.max(0, index - limit), index);
+  }
+
+  async after(id: string, limit: number) {
+    let index = lowerBoundById(this.items, id);
+    if (this.items[index]?.id === id) index++;
+    return this.items.slice(index, index + limit);
+  }
+
+  async replace(updates: MessageUpdate[]) {
+    reconcileSortedMessages(this.items, updates);
+  }
+
+  // One binary search per id; splicing from the back keeps indexes valid
+  async remove(ids: string[]) {
+    const indexes = ids
+      .map(id => indexOfId(this.items, id))
+      .filter(index => index >= 0)
+      .sort((a, b) => b - a);
+    const removed = indexes.map(index => this.items.splice(index, 1)[0]);
+    return removed.reverse();
+  }
+
+  async clear() {
+    const removed = this.items;
+    this.items = [];
+    return removed;
+  }
+}
+
+// Persistent history
+// Messages are stored compactly (timestamps as numbers, images as blob refs)
+// keyed by id and indexed by [channel, id], so index order is time order
+// within a channel and pages are plain key-range cursors. Appends are
+// buffered and written in one transaction.
+const CHAT_DB_NAME = 'prepbooster-chat';
+const CHAT_DB_VERSION = 2;
+const PERSIST_DELAY_MS = 250;
+
+interface StoredMessage {
+  id: string;
+  n: string;
+  x: string;
+  t: number;
+  c: string;
+  f?: 1;
+  h?: ImageRefs;
+  // Image Blobs, written by earlier versions; images are now loaded from
+  // the blob server by their refs
+  img?: Blob;
+  th?: Blob;
+  // Not delivered; the retry queue doesn't survive a reload, so these load as failed
+  s?: 1;
+}
+
+let chatDatabase: Promise<IDBDatabase> | null = null;
+
+const openChatDatabase = () => {
+  if (!chatDatabase) {
+    chatDatabase = new Promise((resolve, reject) => {
+      const request = indexedDB.open(CHAT_DB_NAME, CHAT_DB_VERSION);
+      request.onupgradeneeded = (event) => {
+        const db = request.result;
+        // Each case upgrades from that version; later versions add cases below
+        switch (event.oldVersion) {
+          case 0:
+            db.createObjectStore('messages', { keyPath: 'id' });
+            db.createObjectStore('meta');
+          // falls through
+          case 1: {
+            // Per-channel paging; rows written before channels existed belong to general
+            const messages = request.transaction!.objectStore('messages');
+            messages.createIndex('channel', ['c', 'id']);
+            walkCursor(messages.openCursor(), cursor => {
+              if (!cursor.value.c) cursor.update({ ...cursor.value, c: GENERAL_CHANNEL });
+              return true;
+            });
+          }
+        }
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => reject(request.error);
+    });
+  }
+  return chatDatabase;
+};
+
+const requestResult = <T,>(request: IDBRequest<T>) => new Promise<T>((resolve, reject) => {
+  request.onsuccess = () => resolve(request.result);
+  request.onerror = () => reject(request.error);
+});
+
+const transactionDone = (tx: IDBTransaction) => new Promise<void>((resolve, reject) => {
+  tx.oncomplete = () => resolve();
+  tx.onerror = () => reject(tx.error);
+  tx.onabort = () => reject(tx.error);
+});
+
+// Walks a cursor, calling visit for each row until it returns false
+const walkCursor = (request: IDBRequest<IDBCursorWithValue | null>, visit: (cursor: IDBCursorWithValue) => boolean) =>
+  new Promise<void>((resolve, reject) => {
+    request.onsuccess = () => {
+      const cursor = request.result;
+      if (cursor && visit(cursor)) {
+        cursor.continue();
+      } else {
+        resolve();
+      }
+    };
+    request.onerror = () => reject(request.error);
+  });
+
+// Sorts after every message id, to close [channel, id] ranges
+const MAX_ID_KEY = '\uffff';
+
+export class IndexedDbHistoryStore implements HistoryStore {
+  private pending: Message[] = [];
+  private flushTimer: ReturnType<typeof setTimeout> | null = null;
+  private writes: Promise<void> = Promise.resolve();
+  // Object URLs for images, created once per message and revoked on removal
+  private imageUrls = new Map<string, ImageUrls>();
+
+  constructor(private channel: string) {}
+
+  async append(messages: Message[]) {
+    messages.forEach(message => {
+      if (message.image) {
+        this.imageUrls.set(message.id, { display: message.image, thumbnail: message.thumbnail ?? message.image });
+      }
+    });
+    this.pending.push(...messages);
+    if (!this.flushTimer) this.flushTimer = setTimeout(() => this.flush(), PERSIST_DELAY_MS);
+  }
+
+  // Writes everything buffered so far; reads call this first
+  flush() {
+    if (this.flushTimer) {
+      clearTimeout(this.flushTimer);
+      this.flushTimer = null;
+    }
+    const batch = this.pending;
+    this.pending = [];
+    if (batch.length) this.writes = this.writes.then(() => this.write(batch)).catch(() => undefined);
+    return this.writes;
+  }
+
+  async latest(limit: number) {
+    const rows = await this.query(index => index.openCursor(this.range('', MAX_ID_KEY), 'prev'), limit);
+    return rows.reverse();
+  }
+
+  async before(id: string, limit: number) {
+    const rows = await this.query(index => index.openCursor(this.range('', id, false, true), 'prev'), limit);
+    return rows.reverse();
+  }
+
+  async after(id: string, limit: number) {
+    return this.query(index => index.openCursor(this.range(id, MAX_ID_KEY, true)), limit);
+  }
+
+  async replace(updates: MessageUpdate[]) {
+    await this.flush();
+    updates.forEach(({ previousId, message }) => {
+      const urls = this.imageUrls.get(previousId);
+      if (!urls || previousId === message.id) return;
+      this.imageUrls.delete(previousId);
+      this.imageUrls.set(message.id, urls);
+    });
+    const moved = updates.filter(({ previousId, message }) => previousId !== message.id);
+    this.writes = this.writes
+      .then(() => this.write(updates.map(update => update.message), moved.map(update => update.previousId)))
+      .catch(() => undefined);
+    return this.writes;
+  }
+
+  async remove(ids: string[]) {
+    await this.flush();
+    const db = await openChatDatabase();
+    const tx = db.transaction('messages', 'readwrite');
+    const store = tx.objectStore('messages');
+    // Requests run in order, so each get sees the row before its delete
+    const rows = ids.map(id => {
+      const row = requestResult<StoredMessage | undefined>(store.get(id));
+      store.delete(id);
+      return row;
+    });
+    const found = (await Promise.all(rows)).filter((row): row is StoredMessage => !!row);
+    await transactionDone(tx);
+    return found.map(row => {
+      const message = this.toMessage(row);
+      this.imageUrls.delete(row.id);
+      return message;
+    });
+  }
+
+  // Clears this channel only
+  async clear() {
+    await this.flush();
+    const db = await openChatDatabase();
+    const tx = db.transaction('messages', 'readwrite');
+    const rows: StoredMessage[] = [];
+    await walkCursor(tx.objectStore('messages').index('channel').openCursor(this.range('', MAX_ID_KEY)), cursor => {
+      rows.push(cursor.value);
+      cursor.delete();
+      return true;
+    });
+    await transactionDone(tx);
+    const removed = rows.map(row => this.toMessage(row));
+    this.imageUrls.clear();
+    return removed;
+  }
+
+  // Deletes run first, in the same transaction, so a moved message never exists twice
+  // Images are stored as their refs only: the bytes are on the blob server,
+  // and the browser's HTTP cache already holds them
+  private async write(batch: Message[], deletions: string[] = []) {
+    const rows = batch.map(message => {
+      const row: StoredMessage = {
+        id: message.id,
+        n: message.name,
+        x: message.text,
+        t: message.timestamp.getTime(),
+        c: message.channel
+      };
+      if (message.isFlagged) row.f = 1;
+      if (message.imageRefs) row.h = message.imageRefs;
+      if (message.status) row.s = 1;
+      return row;
+    });
+    const db = await openChatDatabase();
+    const tx = db.transaction('messages', 'readwrite');
+    const store = tx.objectStore('messages');
+    deletions.forEach(id => store.delete(id));
+    rows.forEach(row => store.put(row));
+    await transactionDone(tx);
+  }
+
+  private range(lower: string, upper: string, lowerOpen = false, upperOpen = false) {
+    return IDBKeyRange.bound([this.channel, lower], [this.channel, upper], lowerOpen, upperOpen);
+  }
+
+  private async query(open: (index: IDBIndex) => IDBRequest<IDBCursorWithValue | null>, limit: number) {
+    await this.flush();
+    const db = await openChatDatabase();
+    const rows: StoredMessage[] = [];
+    await walkCursor(open(db.transaction('messages').objectStore('messages').index('channel')), cursor => {
+      rows.push(cursor.value);
+      return rows.length < limit;
+    });
+    return rows.map(row => this.toMessage(row));
+  }
+
+  private toMessage(row: StoredMessage): Message {
+    let urls = this.imageUrls.get(row.id);
+    if (!urls && row.img) {
+      const display = URL.createObjectURL(row.img);
+      urls = { display, thumbnail: row.th ? URL.createObjectURL(row.th) : display };
+      this.imageUrls.set(row.id, urls);
+    } else if (!urls && row.h) {
+      urls = { display: blobUrl(row.h.display), thumbnail: blobUrl(row.h.thumbnail) };
+    }
+    return {
+      id: row.id,
+      name: row.n,
+      text: row.x,
+      timestamp: new Date(row.t),
+      channel: row.c,
+      isFlagged: row.f === 1 || undefined,
+      image: urls?.display,
+      thumbnail: urls?.thumbnail,
+      imageRefs: row.h,
+      status: row.s ? 'failed' : undefined
+    };
+  }
+}
+
+const createHistoryStore = (channel: string): HistoryStore =>
+  typeof indexedDB !== 'undefined' ? new IndexedDbHistoryStore(channel) : new MemoryHistoryStore();
+
+export const HISTORY_PAGE_SIZE = 50;
+export const MAX_RESIDENT_PAGES = 6;
+
+// Keeps a contiguous run of history pages resident. Pages are numbered in
+// scroll order; when more than MAX_RESIDENT_PAGES are loaded, whichever edge
+// page was seen least recently is evicted (only edges can go, so the
+// resident run stays contiguous).
+export const useMessageHistory = (store: HistoryStore) => {
   const [messages, setMessages] = useState<Message[]>([]);
-  const [currentMessage, setCurrentMessage] = useState('');
-  const [selectedImage, setSelectedImage] = useState<File | null>(null);
-  const [imagePreview, setImagePreview] = useState<string>('');
-  const [userName, setUserName] = useState('');
-  const [isNameSet, setIsNameSet] = useState(false);
-  const [adminMode, setAdminMode] = useState(false);
-  const [adminPassword, setAdminPassword] = useState('');
-  const [showAdminLogin, setShowAdminLogin] = useState(false);
-  const [flaggedMessages, setFlaggedMessages] = useState<string[]>([]);
-  const [bannedUsers, setBannedUsers] = useState<string[]>([]);
-  const [onlineUsers, setOnlineUsers] = useState<string[]>([]);
-  const [showOnlineUsers, setShowOnlineUsers] = useState(false);
-  const [activeTab, setActiveTab] = useState('chat');
-  const [joinedGroups, setJoinedGroups] = useState<string[]>([]);
-  
-  const [jeeResources, setJeeResources] = useState<JeeResource[]>([
-    { id: 1, title: 'JEE Main Previous Year Papers', url: '#', description: 'Download previous 10 years question papers' },
-    { id: 2, title: 'NCERT Solutions', url: '#', description: 'Complete NCERT solutions for Physics, Chemistry, Math' },
-    { id: 3, title: 'Important Formulas', url: '#', description: 'Quick revision formulas for all subjects' }
-  ]);
-  
-  const [studyGroups, setStudyGroups] = useState<StudyGroup[]>([
-    { id: 1, name: 'Physics Help Group', members: 23, isJoined: false },
-    { id: 2, name: 'Chemistry Doubts', members: 18, isJoined: false },
-    { id: 3, name: 'Math Problem Solving', members: 31, isJoined: false }
-  ]);
-  
-  // Refs
-  const messagesEndRef = useRef<HTMLDivElement>(null);
-  const adminPasswordRef = useRef('prepboosters0909');
+  const [hasOlder, setHasOlder] = useState(false);
+  const [hasNewer, setHasNewer] = useState(false);
+  const messagesRef = useRef(messages);
+  const hasOlderRef = useRef(false);
+  const hasNewerRef = useRef(false);
+  const loadingRef = useRef(false);
+  const pageOfRef = useRef(new Map<string, number>());
+  const pageSeenRef = useRef(new Map<number, number>());
+  const livePageRef = useRef({ page: 0, count: 0 });
+
+  const commit = (next: Message[]) => {
+    messagesRef.current = next;
+    setMessages(next);
+  };
+
+  const markHasOlder = (value: boolean) => {
+    hasOlderRef.current = value;
+    setHasOlder(value);
+  };
 
-  // Blocked words list
-  const blockedWords = ['gaali', 'abuse', 'curse', 'fuck', 'shit', 'asshole', 'bastard', 'mc', 'bc', 'chod'];
+  const markHasNewer = (value: boolean) => {
+    hasNewerRef.current = value;
+    setHasNewer(value);
+  };
 
-  // Auto-scroll to bottom of chat
-  const scrollToBottom = () => {
-    messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
+  const evictPages = (list: Message[]) => {
+    const pageOf = pageOfRef.current;
+    const seen = pageSeenRef.current;
+    let result = list;
+    while (result.length) {
+      const first = pageOf.get(result[0].id)!;
+      const last = pageOf.get(result[result.length - 1].id)!;
+      if (last - first < MAX_RESIDENT_PAGES) break;
+      const fromTop = (seen.get(first) ?? 0) <= (seen.get(last) ?? 0);
+      const page = fromTop ? first : last;
+      result = result.filter(message => {
+        if (pageOf.get(message.id) !== page) return true;
+        pageOf.delete(message.id);
+        return false;
+      });
+      seen.delete(page);
+      if (fromTop) {
+        markHasOlder(true);
+      } else {
+        markHasNewer(true);
+      }
+    }
+    return result;
   };
 
+  // Drops the resident window and reloads the newest page
+  const jumpToLatest = useCallback(async () => {
+    const latest = await store.latest(HISTORY_PAGE_SIZE);
+    pageOfRef.current = new Map(latest.map(message => [message.id, 0] as [string, number]));
+    pageSeenRef.current = new Map([[0, performance.now()]]);
+    livePageRef.current = { page: 0, count: latest.length };
+    markHasOlder(latest.length === HISTORY_PAGE_SIZE);
+    markHasNewer(false);
+    commit(latest);
+  }, [store]);
+
+  // Switching stores (channels) drops the window and starts from the newest page
+  const storeRef = useRef(store);
   useEffect(() => {
-    scrollToBottom();
-  }, [messages]);
+    if (storeRef.current === store) return;
+    storeRef.current = store;
+    pageOfRef.current = new Map();
+    commit([]);
+    jumpToLatest();
+  }, [store, jumpToLatest]);
 
-  // Handle user name setup
-  const handleSetName = () => {
-    if (userName.trim() && !bannedUsers.includes(userName.toLowerCase())) {
-      setIsNameSet(true);
-      setOnlineUsers(prev => [...prev, userName]);
-    } else if (bannedUsers.includes(userName.toLowerCase())) {
-      alert('This username has been banned. Please choose a different name.');
+  // `reveal` brings the tail back into view when it isn't resident (own sends)
+  const appendMessages = useCallback((incoming: Message[], reveal = false) => {
+    store.append(incoming);
+    // Otherwise new messages are picked up when the user scrolls down
+    if (hasNewerRef.current) {
+      if (reveal) jumpToLatest();
+      return;
+    }
+    const pageOf = pageOfRef.current;
+    const current = messagesRef.current;
+    const head = current[0];
+    const tail = current[current.length - 1];
+    // Late arrivals older than a trimmed head belong to a page that isn't resident
+    const fresh = incoming
+      .filter(message => !pageOf.has(message.id) && !(hasOlderRef.current && head && message.id < head.id))
+      .sort((a, b) => (a.id < b.id ? -1 : 1));
+    if (!fresh.length) return;
+    const merged = mergeSortedMessages(current, fresh);
+
+    // Out-of-order arrivals join the page of the message after them
+    for (let i = fresh.length - 1; i >= 0; i--) {
+      const message = fresh[i];
+      if (!tail || message.id > tail.id) continue;
+      const next = merged[lowerBoundById(merged, message.id) + 1];
+      pageOf.set(message.id, pageOf.get(next.id)!);
     }
+
+    const live = livePageRef.current;
+    fresh.forEach(message => {
+      if (tail && message.id < tail.id) return;
+      if (live.count >= HISTORY_PAGE_SIZE) {
+        // A new live page inherits the recency of the one before it
+        pageSeenRef.current.set(live.page + 1, pageSeenRef.current.get(live.page) ?? 0);
+        live.page++;
+        live.count = 0;
+      }
+      pageOf.set(message.id, live.page);
+      live.count++;
+    });
+    commit(evictPages(merged));
+  }, [store, jumpToLatest]);
+
+  const loadOlder = useCallback(async () => {
+    const first = messagesRef.current[0];
+    if (loadingRef.current || !first) return;
+    loadingRef.current = true;
+    const older = await store.before(first.id, HISTORY_PAGE_SIZE);
+    loadingRef.current = false;
+    if (messagesRef.current[0] !== first) return;
+    if (older.length < HISTORY_PAGE_SIZE) markHasOlder(false);
+    if (!older.length) return;
+    const page = pageOfRef.current.get(first.id)! - 1;
+    older.forEach(message => pageOfRef.current.set(message.id, page));
+    pageSeenRef.current.set(page, performance.now());
+    commit(evictPages([...older, ...messagesRef.current]));
+  }, [store]);
+
+  const loadNewer = useCallback(async () => {
+    const current = messagesRef.current;
+    const last = current[current.length - 1];
+    if (loadingRef.current || !last) return;
+    loadingRef.current = true;
+    const newer = await store.after(last.id, HISTORY_PAGE_SIZE);
+    loadingRef.current = false;
+    if (messagesRef.current[messagesRef.current.length - 1] !== last) return;
+    const page = pageOfRef.current.get(last.id)! + 1;
+    newer.forEach(message => pageOfRef.current.set(message.id, page));
+    pageSeenRef.current.set(page, performance.now());
+    if (newer.length < HISTORY_PAGE_SIZE) {
+      markHasNewer(false);
+      livePageRef.current = { page, count: newer.length };
+    }
+    if (newer.length) commit(evictPages([...messagesRef.current, ...newer]));
+  }, [store]);
+
+  // Acks only touch resident rows; the rest are updated in the store
+  const reconcileMessages = useCallback((updates: MessageUpdate[]) => {
+    store.replace(updates);
+    const pageOf = pageOfRef.current;
+    const resident = updates.filter(update => pageOf.has(update.previousId));
+    if (!resident.length) return;
+    const next = messagesRef.current.slice();
+    resident.forEach(({ previousId, message }) => {
+      pageOf.set(message.id, pageOf.get(previousId)!);
+      if (previousId !== message.id) pageOf.delete(previousId);
+    });
+    reconcileSortedMessages(next, resident);
+    commit(next);
+  }, [store]);
+
+  const removeMessages = useCallback(async (ids: string[]) => {
+    const removing = new Set(ids);
+    commit(messagesRef.current.filter(message => {
+      if (!removing.has(message.id)) return true;
+      pageOfRef.current.delete(message.id);
+      return false;
+    }));
+    return store.remove(ids);
+  }, [store]);
+
+  const clearMessages = useCallback(async () => {
+    pageOfRef.current.clear();
+    pageSeenRef.current.clear();
+    livePageRef.current = { page: 0, count: 0 };
+    markHasOlder(false);
+    markHasNewer(false);
+    commit([]);
+    return store.clear();
+  }, [store]);
+
+  // Records which pages are on screen for the eviction policy
+  const markVisible = useCallback((start: number, end: number) => {
+    const current = messagesRef.current;
+    if (start >= end) return;
+    const now = performance.now();
+    const first = pageOfRef.current.get(current[start].id)!;
+    const last = pageOfRef.current.get(current[end - 1].id)!;
+    for (let page = first; page <= last; page++) pageSeenRef.current.set(page, now);
+  }, []);
+
+  return {
+    messages,
+    hasOlder,
+    hasNewer,
+    appendMessages,
+    reconcileMessages,
+    loadOlder,
+    loadNewer,
+    jumpToLatest,
+    removeMessages,
+    clearMessages,
+    markVisible
   };
+};
 
-  // Handle join/leave group
-  const handleJoinGroup = (groupId: number) => {
-    setStudyGroups(prev => prev.map(group => 
-      group.id === groupId 
-        ? { ...group, members: group.members + 1, isJoined: true }
-        : group
-    ));
-    setJoinedGroups(prev => [...prev, `${groupId}`]);
-    alert('Successfully joined the study group!');
+// Chat search
+// An inverted index over message text lives in a worker (see
+// shared/search-worker.mjs) and is updated as messages arrive, so queries
+// never scan history.
+interface SearchQuery {
+  text: string;
+  // Treat the last token as a prefix (search-as-you-type)
+  prefix?: boolean;
+  // Normalized user name
+  author?: string;
+  // Inclusive epoch-millisecond bounds
+  from?: number;
+  to?: number;
+  limit?: number;
+}
+
+interface SearchResult {
+  id: string;
+  name: string;
+  text: string;
+  time: number;
+}
+
+const SEARCH_RESULT_LIMIT = 20;
+const SEARCH_BACKFILL_BATCH = 500;
+
+let searchWorker: Worker | null = null;
+let nextSearchId = 0;
+const searchRequests = new Map<number, (results: SearchResult[]) => void>();
+
+const getSearchWorker = () => {
+  if (!searchWorker) {
+    const source = URL.createObjectURL(new Blob([SEARCH_WORKER_SOURCE], { type: 'text/javascript' }));
+    searchWorker = new Worker(source);
+    URL.revokeObjectURL(source);
+    searchWorker.onmessage = (event) => {
+      const { id, results } = event.data;
+      searchRequests.get(id)?.(results);
+      searchRequests.delete(id);
+    };
+  }
+  return searchWorker;
+};
+
+// The worker handles messages in order, so a query always sees earlier updates
+const indexMessages = (items: Message[]) => {
+  if (typeof Worker === 'undefined' || !items.length) return;
+  getSearchWorker().postMessage({
+    type: 'add',
+    docs: items.map(message => ({
+      id: message.id,
+      name: message.name,
+      author: normalizeUserName(message.name),
+      text: message.text,
+      time: message.timestamp.getTime()
+    }))
+  });
+};
+
+const unindexMessages = (ids: string[]) => {
+  if (typeof Worker === 'undefined' || !ids.length) return;
+  getSearchWorker().postMessage({ type: 'remove', ids });
+};
+
+// Drops the whole index, e.g. when the chat unmounts
+const clearSearchIndex = () => {
+  searchWorker?.postMessage({ type: 'clear' });
+};
+
+const searchMessages = (query: SearchQuery) => {
+  if (typeof Worker === 'undefined') return Promise.resolve<SearchResult[]>([]);
+  const id = nextSearchId++;
+  return new Promise<SearchResult[]>(resolve => {
+    searchRequests.set(id, resolve);
+    getSearchWorker().postMessage({ type: 'query', id, query: { limit: SEARCH_RESULT_LIMIT, ...query } });
+  });
+};
+
+// Indexes what is already in the store, oldest first, a batch at a time
+const indexStoredHistory = async (store: HistoryStore) => {
+  for (let cursor = ''; ;) {
+    const batch = await store.after(cursor, SEARCH_BACKFILL_BATCH);
+    if (!batch.length) return;
+    indexMessages(batch);
+    cursor = batch[batch.length - 1].id;
+  }
+};
+
+// Windowed rendering for the chat list
+const ESTIMATED_TEXT_ROW_HEIGHT = 72;
+const ESTIMATED_IMAGE_ROW_HEIGHT = 264;
+const OVERSCAN_PX = 600;
+const STICK_TO_BOTTOM_PX = 48;
+const PAGE_LOAD_THRESHOLD_PX = 400;
+
+const estimateMessageHeight = (message: Message) =>
+  message.image ? ESTIMATED_IMAGE_ROW_HEIGHT : ESTIMATED_TEXT_ROW_HEIGHT;
+
+// Index of the row that contains the given pixel offset
+const findRowAt = (offsets: Float64Array, y: number) => {
+  let lo = 0;
+  let hi = offsets.length - 2;
+  while (lo < hi) {
+    const mid = (lo + hi + 1) >> 1;
+    if (offsets[mid] <= y) {
+      lo = mid;
+    } else {
+      hi = mid - 1;
+    }
+  }
+  return lo;
+};
+
+// Mounts only the rows in view (plus overscan); row heights are measured
+// with a ResizeObserver and estimated until a row has been rendered once.
+// Away from the bottom, the first visible row is used as a scroll anchor so
+// prepending, evicting or re-measuring rows doesn't move the content. Row
+// offsets start below the container's top padding, which is subtracted from
+// scrollTop before looking rows up.
+export const useWindowedMessages = (messages: Message[]) => {
+  const containerRef = useRef<HTMLDivElement | null>(null);
+  const observerRef = useRef<ResizeObserver | null>(null);
+  const insetRef = useRef(0);
+  const heightsRef = useRef(new Map<string, number>());
+  const stickToBottomRef = useRef(true);
+  const anchorRef = useRef<{ id: string; delta: number } | null>(null);
+  const messagesRef = useRef(messages);
+  const offsetsRef = useRef(new Float64Array(1));
+  const frameRef = useRef(0);
+  const [measureVersion, setMeasureVersion] = useState(0);
+  const [viewport, setViewport] = useState({ scrollTop: 0, height: 0 });
+
+  // Refs attach before effects run, so whatever is already mounted is
+  // observed here and later rows as they attach
+  useEffect(() => {
+    if (typeof ResizeObserver === 'undefined') return () => cancelAnimationFrame(frameRef.current);
+    const observer = new ResizeObserver(entries => {
+      let changed = false;
+      for (const entry of entries) {
+        const el = entry.target as HTMLElement;
+        if (el === containerRef.current) {
+          // Shown again after a tab switch, or resized, while parked at the bottom
+          if (stickToBottomRef.current) el.scrollTop = el.scrollHeight;
+          setViewport(prev => (prev.height === el.clientHeight && prev.scrollTop === el.scrollTop
+            ? prev
+            : { scrollTop: el.scrollTop, height: el.clientHeight }));
+          continue;
+        }
+        const key = el.dataset.key;
+        if (!key || !el.isConnected) {
+          observer.unobserve(el);
+          continue;
+        }
+        if (heightsRef.current.get(key) !== el.offsetHeight) {
+          heightsRef.current.set(key, el.offsetHeight);
+          changed = true;
+        }
+      }
+      if (changed) setMeasureVersion(v => v + 1);
+    });
+    observerRef.current = observer;
+    const container = containerRef.current;
+    if (container) {
+      observer.observe(container);
+      container.querySelectorAll('[data-key]').forEach(row => observer.observe(row));
+    }
+    return () => {
+      observer.disconnect();
+      observerRef.current = null;
+      cancelAnimationFrame(frameRef.current);
+    };
+  }, []);
+
+  const setContainer = useCallback((el: HTMLDivElement | null) => {
+    if (containerRef.current) observerRef.current?.unobserve(containerRef.current);
+    containerRef.current = el;
+    if (el) {
+      insetRef.current = parseFloat(getComputedStyle(el).paddingTop) || 0;
+      observerRef.current?.observe(el);
+      setViewport({ scrollTop: el.scrollTop, height: el.clientHeight });
+    }
+  }, []);
+
+  const measureRow = useCallback((el: HTMLDivElement | null) => {
+    if (el) observerRef.current?.observe(el);
+  }, []);
+
+  const handleScroll = useCallback(() => {
+    if (frameRef.current) return;
+    frameRef.current = requestAnimationFrame(() => {
+      frameRef.current = 0;
+      const el = containerRef.current;
+      if (!el) return;
+      stickToBottomRef.current = el.scrollHeight - el.scrollTop - el.clientHeight <= STICK_TO_BOTTOM_PX;
+      const top = el.scrollTop - insetRef.current;
+      const index = findRowAt(offsetsRef.current, top);
+      const anchor = messagesRef.current[index];
+      anchorRef.current = anchor ? { id: anchor.id, delta: top - offsetsRef.current[index] } : null;
+      setViewport({ scrollTop: el.scrollTop, height: el.clientHeight });
+    });
+  }, []);
+
+  // Prefix sums of row heights; offsets[i] is the top of row i
+  const offsets = useMemo(() => {
+    const heights = heightsRef.current;
+    if (heights.size > messages.length * 2) {
+      const live = new Set(messages.map(message => message.id));
+      heights.forEach((_, key) => {
+        if (!live.has(key)) heights.delete(key);
+      });
+    }
+    const result = new Float64Array(messages.length + 1);
+    messages.forEach((message, i) => {
+      result[i + 1] = result[i] + (heights.get(message.id) ?? estimateMessageHeight(message));
+    });
+    return result;
+  }, [messages, measureVersion]);
+  messagesRef.current = messages;
+  offsetsRef.current = offsets;
+
+  const scrollToBottom = useCallback(() => {
+    stickToBottomRef.current = true;
+    const el = containerRef.current;
+    if (!el) return;
+    // Reading scrollHeight forces layout; this is where jank shows up
+    const span = telemetry.begin();
+    el.scrollTop = el.scrollHeight;
+    telemetry.end('list:scroll-to-bottom', span);
+    setViewport(prev => (prev.scrollTop === el.scrollTop && prev.height === el.clientHeight
+      ? prev
+      : { scrollTop: el.scrollTop, height: el.clientHeight }));
+  }, []);
+
+  // Keep the newest message in view while the user is parked at the bottom,
+  // otherwise hold the anchor row still
+  useLayoutEffect(() => {
+    if (stickToBottomRef.current) {
+      scrollToBottom();
+      return;
+    }
+    const el = containerRef.current;
+    const anchor = anchorRef.current;
+    if (!el || !anchor) return;
+    const index = indexOfId(messages, anchor.id);
+    if (index < 0) return;
+    const target = insetRef.current + offsets[index] + anchor.delta;
+    if (Math.abs(el.scrollTop - target) >= 1) {
+      el.scrollTop = target;
+      setViewport({ scrollTop: el.scrollTop, height: el.clientHeight });
+    }
+  }, [offsets, scrollToBottom]);
+
+  const count = messages.length;
+  const top = viewport.scrollTop - insetRef.current;
+  const start = findRowAt(offsets, top - OVERSCAN_PX);
+  const end = Math.min(count, findRowAt(offsets, top + viewport.height + OVERSCAN_PX) + 1);
+
+  return {
+    setContainer,
+    measureRow,
+    handleScroll,
+    scrollToBottom,
+    start,
+    end,
+    visibleMessages: messages.slice(start, end),
+    padTop: offsets[start],
+    padBottom: offsets[count] - offsets[end],
+    nearTop: top < PAGE_LOAD_THRESHOLD_PX,
+    nearBottom: offsets[count] - top - viewport.height < PAGE_LOAD_THRESHOLD_PX
   };
+};
 
-  const handleLeaveGroup = (groupId: number) => {
-    setStudyGroups(prev => prev.map(group => 
-      group.id === groupId 
-        ? { ...group, members: Math.max(0, group.members - 1), isJoined: false }
-        : group
-    ));
-    setJoinedGroups(prev => prev.filter(id => id !== `${groupId}`));
-    alert('Left the study group successfully.');
+// Moderation aggregates
+// Counters are updated as messages and flags arrive so the admin panel never
+// scans history. Every update produces a new ModerationStats object for
+// subscribers; the per-user maps are copied on write, like the rest of the
+// state. Actions that count carry their own time (`at`), so the reducer stays
+// pure.
+interface ModerationStats {
+  messageCount: number;
+  flagCount: number;
+  messagesByUser: Map<string, number>;
+  flagsByUser: Map<string, number>;
+  topFlagged: { name: string; count: number } | null;
+  messageRate: RateWindow;
+  flagRate: RateWindow;
+}
+
+const createModerationStats = (): ModerationStats => ({
+  messageCount: 0,
+  flagCount: 0,
+  messagesByUser: new Map(),
+  flagsByUser: new Map(),
+  topFlagged: null,
+  messageRate: emptyRateWindow(),
+  flagRate: emptyRateWindow()
+});
+
+// Inserts ids into an id-sorted (and therefore time-sorted) queue
+const insertSortedIds = (queue: string[], ids: string[]) => {
+  const result = queue.slice();
+  ids.forEach(id => {
+    let lo = 0;
+    let hi = result.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (result[mid] < id) {
+        lo = mid + 1;
+      } else {
+        hi = mid;
+      }
+    }
+    if (result[lo] !== id) result.splice(lo, 0, id);
+  });
+  return result;
+};
+
+// Community state store
+// Moderation, presence and group state live in a small external store so
+// components can subscribe to just the slice they render.
+interface CommunityState {
+  flaggedMessages: Map<string, FlagInfo>;
+  flagQueue: string[];
+  stats: ModerationStats;
+  bannedUsers: Set<string>;
+  // Normalized name to display name
+  onlineUsers: Map<string, string>;
+  studyGroups: StudyGroup[];
+  joinedGroups: string[];
+  activeChannel: string;
+  // Unread messages per channel other than the open one
+  unreadCounts: Map<string, number>;
+}
+
+type CommunityAction =
+  | { type: 'messagesAdded'; messages: Message[]; at: number }
+  | { type: 'flag'; messages: Message[]; at: number }
+  | { type: 'messagesReconciled'; updates: MessageUpdate[]; at: number }
+  | { type: 'banUser'; name: string }
+  | { type: 'clearFlags' }
+  | { type: 'unbanAll' }
+  | { type: 'userJoined'; name: string }
+  | { type: 'setOnlineUsers'; users: string[] }
+  | { type: 'presenceDelta'; delta: PresenceDelta }
+  | { type: 'joinGroup'; groupId: number }
+  | { type: 'leaveGroup'; groupId: number }
+  | { type: 'setGroupMembers'; members: Record<string, number> }
+  | { type: 'openChannel'; channel: string }
+  | { type: 'hydrate'; snapshot: CommunitySnapshot };
+
+// Persisted subset of CommunityState; bump the version when the shape changes
+const COMMUNITY_SNAPSHOT_VERSION = 1;
+
+interface CommunitySnapshot {
+  version: number;
+  bannedUsers: string[];
+  flaggedMessages: [string, FlagInfo][];
+  joinedGroups: string[];
+}
+
+const DEFAULT_STUDY_GROUPS: StudyGroup[] = [
+  { id: 1, name: 'Physics Help Group', members: 23, isJoined: false },
+  { id: 2, name: 'Chemistry Doubts', members: 18, isJoined: false },
+  { id: 3, name: 'Math Problem Solving', members: 31, isJoined: false }
+];
+
+export const createCommunityState = (): CommunityState => ({
+  flaggedMessages: new Map(),
+  flagQueue: [],
+  stats: createModerationStats(),
+  bannedUsers: new Set(),
+  onlineUsers: new Map(),
+  studyGroups: DEFAULT_STUDY_GROUPS,
+  joinedGroups: [],
+  activeChannel: GENERAL_CHANNEL,
+  unreadCounts: new Map()
+});
+
+// Bumps unread counters for messages outside the open channel; the map is
+// only copied when something changes and only holds channels with traffic
+const countUnread = (state: CommunityState, messages: Message[]) => {
+  let unreadCounts = state.unreadCounts;
+  messages.forEach(message => {
+    if (message.channel === state.activeChannel) return;
+    if (unreadCounts === state.unreadCounts) unreadCounts = new Map(unreadCounts);
+    unreadCounts.set(message.channel, (unreadCounts.get(message.channel) ?? 0) + 1);
+  });
+  return unreadCounts;
+};
+
+// The user with the most flags, for when the current top user loses one
+const topOf = (counts: Map<string, number>): ModerationStats['topFlagged'] => {
+  let top: ModerationStats['topFlagged'] = null;
+  for (const [name, count] of counts) {
+    if (!top || count > top.count) top = { name, count };
+  }
+  return top;
+};
+
+// Adds flags for messages not already flagged and bumps the flag counters
+const applyFlags = (state: CommunityState, messages: Message[], at: number): CommunityState => {
+  const fresh = messages.filter(message => !state.flaggedMessages.has(message.id));
+  if (!fresh.length) return state;
+  const flaggedMessages = new Map(state.flaggedMessages);
+  const flagsByUser = new Map(state.stats.flagsByUser);
+  let { topFlagged, flagRate } = state.stats;
+  fresh.forEach(message => {
+    const name = normalizeUserName(message.name);
+    flaggedMessages.set(message.id, { name, flaggedAt: message.timestamp.getTime() });
+    const count = (flagsByUser.get(name) ?? 0) + 1;
+    flagsByUser.set(name, count);
+    if (!topFlagged || count > topFlagged.count) topFlagged = { name, count };
+    flagRate = recordRate(flagRate, at);
+  });
+  return {
+    ...state,
+    flaggedMessages,
+    flagQueue: insertSortedIds(state.flagQueue, fresh.map(message => message.id)),
+    stats: { ...state.stats, flagCount: state.stats.flagCount + fresh.length, flagsByUser, topFlagged, flagRate }
   };
+};
 
-  // Check for blocked words
-  const containsBlockedWord = (text: string) => {
-    return blockedWords.some(word => 
-      text.toLowerCase().includes(word.toLowerCase())
-    );
+export const communityReducer = (state: CommunityState, action: CommunityAction): CommunityState => {
+  switch (action.type) {
+    case 'messagesAdded': {
+      if (!action.messages.length) return state;
+      const messagesByUser = new Map(state.stats.messagesByUser);
+      action.messages.forEach(message => {
+        const name = normalizeUserName(message.name);
+        messagesByUser.set(name, (messagesByUser.get(name) ?? 0) + 1);
+      });
+      const counted = {
+        ...state,
+        unreadCounts: countUnread(state, action.messages),
+        stats: {
+          ...state.stats,
+          messageCount: state.stats.messageCount + action.messages.length,
+          messagesByUser,
+          messageRate: recordRate(state.stats.messageRate, action.at, action.messages.length)
+        }
+      };
+      return applyFlags(counted, action.messages.filter(message => message.isFlagged), action.at);
+    }
+    case 'flag':
+      return applyFlags(state, action.messages, action.at);
+    case 'messagesReconciled': {
+      // The server's flag verdict wins; local flags follow the message to its
+      // new id, and flags it clears come off the counters
+      const stale = new Set<string>();
+      const moved: [string, FlagInfo][] = [];
+      const cleared: FlagInfo[] = [];
+      const newlyFlagged: Message[] = [];
+      action.updates.forEach(({ previousId, message }) => {
+        const flag = state.flaggedMessages.get(previousId);
+        if (!flag) {
+          if (message.isFlagged) newlyFlagged.push(message);
+          return;
+        }
+        if (previousId !== message.id || !message.isFlagged) stale.add(previousId);
+        if (previousId !== message.id && message.isFlagged) moved.push([message.id, flag]);
+        if (!message.isFlagged) cleared.push(flag);
+      });
+      if (!stale.size) return applyFlags(state, newlyFlagged, action.at);
+      const flaggedMessages = new Map(state.flaggedMessages);
+      stale.forEach(id => flaggedMessages.delete(id));
+      moved.forEach(([id, flag]) => flaggedMessages.set(id, flag));
+      const flagQueue = insertSortedIds(state.flagQueue.filter(id => !stale.has(id)), moved.map(([id]) => id));
+      let { stats } = state;
+      if (cleared.length) {
+        const flagsByUser = new Map(stats.flagsByUser);
+        cleared.forEach(({ name }) => {
+          const count = (flagsByUser.get(name) ?? 0) - 1;
+          if (count > 0) flagsByUser.set(name, count);
+          else flagsByUser.delete(name);
+        });
+        const topName = stats.topFlagged?.name;
+        stats = {
+          ...stats,
+          flagCount: Math.max(0, stats.flagCount - cleared.length),
+          flagsByUser,
+          topFlagged: cleared.some(({ name }) => name === topName) ? topOf(flagsByUser) : stats.topFlagged
+        };
+      }
+      return applyFlags({ ...state, flaggedMessages, flagQueue, stats }, newlyFlagged, action.at);
+    }
+    case 'banUser': {
+      const name = normalizeUserName(action.name);
+      return state.bannedUsers.has(name) ? state : { ...state, bannedUsers: new Set(state.bannedUsers).add(name) };
+    }
+    case 'clearFlags':
+      return state.flagQueue.length ? { ...state, flaggedMessages: new Map(), flagQueue: [] } : state;
+    case 'unbanAll':
+      return state.bannedUsers.size ? { ...state, bannedUsers: new Set() } : state;
+    case 'userJoined': {
+      const name = normalizeUserName(action.name);
+      if (state.onlineUsers.has(name)) return state;
+      return { ...state, onlineUsers: new Map(state.onlineUsers).set(name, action.name) };
+    }
+    case 'setOnlineUsers':
+      return { ...state, onlineUsers: new Map(action.users.map(user => [normalizeUserName(user), user] as [string, string])) };
+    case 'presenceDelta': {
+      // Deltas arrive at most once per broadcast interval, so copying the map is cheap
+      const onlineUsers = new Map(state.onlineUsers);
+      action.delta.left.forEach(user => onlineUsers.delete(normalizeUserName(user)));
+      action.delta.joined.forEach(user => onlineUsers.set(normalizeUserName(user), user));
+      return { ...state, onlineUsers };
+    }
+    case 'joinGroup':
+      return {
+        ...state,
+        studyGroups: state.studyGroups.map(group =>
+          group.id === action.groupId
+            ? { ...group, members: group.members + 1, isJoined: true }
+            : group
+        ),
+        joinedGroups: [...state.joinedGroups, `${action.groupId}`]
+      };
+    case 'leaveGroup': {
+      const channel = groupChannel(action.groupId);
+      const unreadCounts = new Map(state.unreadCounts);
+      unreadCounts.delete(channel);
+      return {
+        ...state,
+        activeChannel: state.activeChannel === channel ? GENERAL_CHANNEL : state.activeChannel,
+        unreadCounts,
+        studyGroups: state.studyGroups.map(group =>
+          group.id === action.groupId
+            ? { ...group, members: Math.max(0, group.members - 1), isJoined: false }
+            : group
+        ),
+        joinedGroups: state.joinedGroups.filter(id => id !== `${action.groupId}`)
+      };
+    }
+    case 'setGroupMembers':
+      return {
+        ...state,
+        studyGroups: state.studyGroups.map(group =>
+          action.members[group.id] === undefined ? group : { ...group, members: action.members[group.id] }
+        )
+      };
+    case 'openChannel': {
+      if (state.activeChannel === action.channel && !state.unreadCounts.has(action.channel)) return state;
+      const unreadCounts = new Map(state.unreadCounts);
+      unreadCounts.delete(action.channel);
+      return { ...state, activeChannel: action.channel, unreadCounts };
+    }
+    case 'hydrate': {
+      const joined = new Set(action.snapshot.joinedGroups);
+      return {
+        ...state,
+        bannedUsers: new Set(action.snapshot.bannedUsers),
+        flaggedMessages: new Map(action.snapshot.flaggedMessages),
+        flagQueue: action.snapshot.flaggedMessages.map(([id]) => id).sort(),
+        joinedGroups: action.snapshot.joinedGroups,
+        studyGroups: state.studyGroups.map(group => ({ ...group, isJoined: joined.has(`${group.id}`) }))
+      };
+    }
+    default:
+      return state;
+  }
+};
+
+export type CommunityStore = Store<CommunityState, CommunityAction>;
+
+// Tests build the community store from the app module
+export { createStore };
+
+// Restores and write-behind persists bans, flags and joined groups
+const loadCommunitySnapshot = async () => {
+  const db = await openChatDatabase();
+  const snapshot: CommunitySnapshot | undefined = await requestResult(
+    db.transaction('meta').objectStore('meta').get('community')
+  );
+  return snapshot?.version === COMMUNITY_SNAPSHOT_VERSION ? snapshot : undefined;
+};
+
+const persistCommunityState = (store: CommunityStore) => {
+  let timer: ReturnType<typeof setTimeout> | null = null;
+  const save = async () => {
+    timer = null;
+    const state = store.getState();
+    const snapshot: CommunitySnapshot = {
+      version: COMMUNITY_SNAPSHOT_VERSION,
+      bannedUsers: [...state.bannedUsers],
+      flaggedMessages: [...state.flaggedMessages],
+      joinedGroups: state.joinedGroups
+    };
+    const db = await openChatDatabase();
+    db.transaction('meta', 'readwrite').objectStore('meta').put(snapshot, 'community');
+  };
+  const unsubscribe = store.subscribe(() => {
+    if (!timer) timer = setTimeout(save, PERSIST_DELAY_MS);
+  });
+  return () => {
+    unsubscribe();
+    if (timer) clearTimeout(timer);
   };
+};
+
+// Keeps the transport's group subscriptions in step with joinedGroups,
+// whatever changes it: a join or leave, or a restored session that lands
+// after the transport has connected
+export const followJoinedGroups = (store: CommunityStore, transport: ChatTransport) => {
+  let joinedGroups: string[] = [];
+  const sync = () => {
+    const next = store.getState().joinedGroups;
+    if (next === joinedGroups) return;
+    const previous = new Set(joinedGroups);
+    const current = new Set(next);
+    current.forEach(groupId => {
+      if (!previous.has(groupId)) transport.setGroupMembership(Number(groupId), true);
+    });
+    previous.forEach(groupId => {
+      if (!current.has(groupId)) transport.setGroupMembership(Number(groupId), false);
+    });
+    joinedGroups = next;
+  };
+  sync();
+  return store.subscribe(sync);
+};
+
+// Idle scheduling
+const IDLE_TIMEOUT_MS = 2000;
+
+// Runs callback once the main thread is idle (or after timeoutMs at the
+// latest); returns a cancel function
+const whenIdle = (callback: () => void, timeoutMs = IDLE_TIMEOUT_MS) => {
+  if (typeof requestIdleCallback === 'function') {
+    const handle = requestIdleCallback(() => callback(), { timeout: timeoutMs });
+    return () => cancelIdleCallback(handle);
+  }
+  const timer = setTimeout(callback, 0);
+  return () => clearTimeout(timer);
+};
+
+// Code splitting
+// The resources and groups tabs and the admin panel are separate chunks
+// (ui/), so the name screen ships without them. Each loads when it first
+// renders, or earlier through prefetch(): the tabs once the browser is idle
+// after joining or when their nav button is hovered, the admin panel when
+// the admin login is hovered or opened. The chunks import only from core.tsx
+// and shared/, never from this module, so nothing of the app is pulled in
+// through them.
+const lazyWithPrefetch = <T extends React.ComponentType<any>>(load: () => Promise<{ default: T }>) => {
+  let loading: Promise<{ default: T }> | undefined;
+  // A failed load is forgotten, so the next attempt fetches again
+  const loadOnce = () =>
+    (loading ??= load().catch(error => {
+      loading = undefined;
+      throw error;
+    }));
+  return Object.assign(React.lazy(loadOnce), {
+    prefetch: () => {
+      loadOnce().catch(() => {});
+    }
+  });
+};
+
+const ResourcesTab = lazyWithPrefetch(() => import('./ui/ResourcesTab'));
+const GroupsTab = lazyWithPrefetch(() => import('./ui/GroupsTab'));
+const AdminPanel = lazyWithPrefetch(() => import('./ui/AdminPanel'));
+
+const CHUNK_FALLBACK = <div className="text-center text-gray-500 py-8">Loading…</div>;
+
+// Format time for messages
+const formatTime = (date: Date) => {
+  return date.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
+};
+
+// Chat components
+interface MessageRowProps {
+  message: Message;
+  isOwn: boolean;
+  measureRef: (el: HTMLDivElement | null) => void;
+  onRetry?: (message: Message) => void;
+}
+
+export const MessageRow = React.memo(({ message, isOwn, measureRef, onRetry }: MessageRowProps) => (
+  <div data-key={message.id} ref={measureRef} className={`flex flex-col pb-4 ${isOwn ? 'items-end' : ''}`}>
+    <div className="flex items-center space-x-2 mb-1">
+      <span className="font-semibold text-indigo-600 text-sm">{message.name}</span>
+      <span className="text-xs text-gray-500">{formatTime(message.timestamp)}</span>
+      {message.isFlagged && (
+        <span className="text-xs bg-red-100 text-red-700 px-2 py-0.5 rounded">Flagged</span>
+      )}
+      {message.status === 'pending' && <span className="text-xs text-gray-400">Sending…</span>}
+      {message.status === 'failed' && <span className="text-xs text-red-600">Not delivered</span>}
+      {message.status === 'failed' && isOwn && onRetry && (
+        <button onClick={() => onRetry(message)} className="text-xs text-indigo-600 hover:underline">
+          Retry
+        </button>
+      )}
+    </div>
+    <div className={`rounded-lg px-4 py-2 max-w-md ${isOwn ? 'bg-indigo-100' : 'bg-blue-50'} ${message.isFlagged ? 'border border-red-300' : ''} ${message.status === 'pending' ? 'opacity-60' : ''}`}>
+      {message.image && (
+        <div className="mb-2">
+          <a href={message.image} target="_blank" rel="noopener noreferrer">
+          <img 
+            src={message.thumbnail ?? message.image} 
+            loading="lazy"
+            alt="Shared content" 
+            className="rounded-lg max-w-full max-h-48 object-cover"
+          />
+          </a>
+        </div>
+      )}
+      <p className="text-gray-800 break-words">{message.text}</p>
+    </div>
+  </div>
+));
+
+interface ComposerProps {
+  store: CommunityStore;
+  userName: string;
+  onSend: (messageContent: string, image: ImageUrls | null) => boolean;
+}
+
+// Owns the draft, so keystrokes re-render only this component
+export const Composer = React.memo(({ store, userName, onSend }: ComposerProps) => {
+  const [currentMessage, setCurrentMessage] = useState('');
+  const [selectedImage, setSelectedImage] = useState<File | null>(null);
+  const [imagePreview, setImagePreview] = useState<ImageUrls | null>(null);
+  const imageJobRef = useRef(0);
+  const previewRef = useRef(imagePreview);
+  previewRef.current = imagePreview;
+  const isBanned = useStoreSelector(store, state => state.bannedUsers.has(normalizeUserName(userName)));
+
+  // A preview still on screen at unmount was never sent, so nothing else
+  // will revoke it; an image still processing is released when it lands
+  useEffect(() => () => {
+    imageJobRef.current++;
+    if (previewRef.current) releaseImageUrls(previewRef.current);
+  }, []);
 
   // Handle image selection
   const handleImageSelect = (e: React.ChangeEvent<HTMLInputElement>) => {
@@ -115,69 +1754,647 @@ const PrepBoosterChat: React.FC = () => {
         alert('Image size should be less than 5MB');
         return;
       }
+      if (imagePreview) releaseImageUrls(imagePreview);
       setSelectedImage(file);
-      const reader = new FileReader();
-      reader.onload = () => {
-        setImagePreview(reader.result as string);
-      };
-      reader.readAsDataURL(file);
+      setImagePreview(null);
+      const job = ++imageJobRef.current;
+      const span = telemetry.begin();
+      processImage(file).then(urls => {
+        telemetry.end('image:process', span, `${Math.round(file.size / 1024)} KB`);
+        // A newer selection (or removal) supersedes this one
+        if (job === imageJobRef.current) {
+          setImagePreview(urls);
+        } else {
+          releaseImageUrls(urls);
+        }
+      });
     }
   };
 
   // Remove selected image
   const removeImage = () => {
+    imageJobRef.current++;
+    if (imagePreview) releaseImageUrls(imagePreview);
     setSelectedImage(null);
-    setImagePreview('');
+    setImagePreview(null);
   };
 
   // Send message function
   const handleSendMessage = () => {
-    if ((!currentMessage.trim() && !selectedImage) || bannedUsers.includes(userName.toLowerCase())) return;
+    if ((!currentMessage.trim() && !selectedImage) || isBanned) return;
+    // Wait for the image pipeline to finish before sending
+    if (selectedImage && !imagePreview) return;
 
     const messageContent = selectedImage ? 
       `📸 Image: ${currentMessage.trim() || 'Shared an image'}` : 
       currentMessage;
 
-    if (containsBlockedWord(messageContent)) {
+    if (!onSend(messageContent, imagePreview)) return;
+    setCurrentMessage('');
+    setSelectedImage(null);
+    setImagePreview(null);
+  };
+
+  // Handle key press for sending messages
+  const handleKeyPress = (e: React.KeyboardEvent) => {
+    if (e.key === 'Enter' && !e.shiftKey) {
+      e.preventDefault();
+      handleSendMessage();
+    }
+  };
+
+  return (
+    <div className="border-t p-4">
+      {imagePreview && (
+        <div className="mb-3 relative">
+          <img 
+            src={imagePreview.thumbnail} 
+            alt="Preview" 
+            className="rounded-lg max-h-32 object-cover"
+          />
+          <button
+            onClick={removeImage}
+            className="absolute top-2 right-2 bg-red-500 text-white rounded-full p-1 text-xs"
+          >
+            ✕
+          </button>
+        </div>
+      )}
+      <div className="flex space-x-3">
+        <div className="flex-1 flex flex-col">
+          <input
+            type="text"
+            value={currentMessage}
+            onChange={(e) => setCurrentMessage(e.target.value)}
+            onKeyPress={handleKeyPress}
+            placeholder="Type your message or share an image..."
+            className="w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500 focus:border-transparent mb-2"
+            maxLength={500}
+          />
+          <label className="flex items-center text-sm text-indigo-600 cursor-pointer">
+            <input
+              type="file"
+              accept="image/*"
+              onChange={handleImageSelect}
+              className="hidden"
+            />
+            <svg className="w-5 h-5 mr-1" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+              <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M4 16l4.586-4.586a2 2 0 012.828 0L16 16m-2-2l1.586-1.586a2 2 0 012.828 0L20 14m-6-6h.01M6 20h12a2 2 0 002-2V6a2 2 0 00-2-2H6a2 2 0 00-2 2v12a2 2 0 002 2z" />
+            </svg>
+            Add Image
+          </label>
+        </div>
+        <button
+          onClick={handleSendMessage}
+          disabled={(!currentMessage.trim() && !selectedImage) || (!!selectedImage && !imagePreview) || isBanned}
+          className="bg-indigo-600 text-white px-6 py-2 rounded-lg hover:bg-indigo-700 disabled:opacity-50 disabled:cursor-not-allowed transition-colors self-end"
+        >
+          Send
+        </button>
+      </div>
+      <p className="text-xs text-gray-500 mt-2">
+        {isBanned 
+          ? 'Your account has been banned from sending messages.'
+          : 'Messages containing inappropriate content will be flagged automatically.'
+        }
+      </p>
+    </div>
+  );
+});
+
+interface ChannelTabsProps {
+  store: CommunityStore;
+  onOpen: (channel: string) => void;
+}
+
+// General plus one tab per joined group, with unread badges
+const ChannelTabs = React.memo(({ store, onOpen }: ChannelTabsProps) => {
+  const studyGroups = useStoreSelector(store, state => state.studyGroups);
+  const activeChannel = useStoreSelector(store, state => state.activeChannel);
+  const unreadCounts = useStoreSelector(store, state => state.unreadCounts);
+  const channels = [
+    { id: GENERAL_CHANNEL, name: 'General' },
+    ...studyGroups.filter(group => group.isJoined).map(group => ({ id: groupChannel(group.id), name: group.name }))
+  ];
+  return (
+    <div className="flex space-x-2 overflow-x-auto border-b p-3">
+      {channels.map(channel => {
+        const unread = unreadCounts.get(channel.id) ?? 0;
+        return (
+          <button
+            key={channel.id}
+            onClick={() => onOpen(channel.id)}
+            className={`px-3 py-1 rounded-full text-sm whitespace-nowrap ${
+              channel.id === activeChannel ? 'bg-indigo-600 text-white' : 'bg-gray-100 text-gray-700 hover:bg-gray-200'
+            }`}
+          >
+            {channel.name}
+            {unread > 0 && (
+              <span className="ml-2 bg-red-500 text-white text-xs rounded-full px-2">{unread}</span>
+            )}
+          </button>
+        );
+      })}
+    </div>
+  );
+});
+
+const SEARCH_RANGES_MS: Record<string, number> = { any: 0, hour: 60 * 60 * 1000, day: 24 * 60 * 60 * 1000, week: 7 * 24 * 60 * 60 * 1000 };
+const SEARCH_DEBOUNCE_MS = 120;
+
+// "from:name" anywhere in the query narrows results to one author
+const AUTHOR_FILTER = /(?:^|\s)from:(\S+)/;
+
+// Owns the query, so typing re-renders only this panel
+const SearchPanel = React.memo(() => {
+  const [query, setQuery] = useState('');
+  const [range, setRange] = useState('any');
+  const [results, setResults] = useState<SearchResult[]>([]);
+
+  useEffect(() => {
+    const author = query.match(AUTHOR_FILTER)?.[1];
+    const text = query.replace(AUTHOR_FILTER, ' ');
+    if (!text.trim() && !author) {
+      setResults([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      searchMessages({
+        text,
+        prefix: !/\s$/.test(text),
+        author: author && normalizeUserName(author),
+        from: SEARCH_RANGES_MS[range] ? Date.now() - SEARCH_RANGES_MS[range] : undefined
+      }).then(found => {
+        if (!cancelled) setResults(found);
+      });
+    }, SEARCH_DEBOUNCE_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [query, range]);
+
+  return (
+    <div className="mt-6">
+      <h3 className="font-semibold mb-2">Search Chat</h3>
+      <div className="flex space-x-2 mb-2">
+        <input
+          type="text"
+          value={query}
+          onChange={(e) => setQuery(e.target.value)}
+          placeholder="e.g. projectile from:rahul"
+          className="flex-1 min-w-0 p-2 border rounded-lg text-sm"
+        />
+        <select
+          value={range}
+          onChange={(e) => setRange(e.target.value)}
+          className="p-2 border rounded-lg text-sm"
+        >
+          <option value="any">Any time</option>
+          <option value="hour">Past hour</option>
+          <option value="day">Past day</option>
+          <option value="week">Past week</option>
+        </select>
+      </div>
+      {results.length > 0 && (
+        <ul className="space-y-2 max-h-64 overflow-y-auto">
+          {results.map(result => (
+            <li key={result.id} className="border rounded-lg p-2 text-sm">
+              <div className="flex justify-between text-xs text-gray-500 mb-1">
+                <span className="font-semibold text-indigo-600">{result.name}</span>
+                <span>{formatTime(new Date(result.time))}</span>
+              </div>
+              <p className="text-gray-800 break-words">{result.text}</p>
+            </li>
+          ))}
+        </ul>
+      )}
+    </div>
+  );
+});
+
+const ONLINE_LIST_LIMIT = 100;
+
+interface OnlineUsersProps {
+  store: CommunityStore;
+  open: boolean;
+  onToggle: () => void;
+}
+
+// Online count in the header, expandable to a (capped) list of names
+const OnlineUsers = React.memo(({ store, open, onToggle }: OnlineUsersProps) => {
+  const onlineUsers = useStoreSelector(store, state => state.onlineUsers);
+  const onlineCount = onlineUsers.size;
+  const names = open ? [...onlineUsers.values()].slice(0, ONLINE_LIST_LIMIT) : [];
+  return (
+    <div className="relative">
+      <button
+        onClick={onToggle}
+        className="text-sm text-green-700 bg-green-50 px-3 py-1 rounded-full hover:bg-green-100"
+      >
+        ● {onlineCount} online
+      </button>
+      {open && (
+        <ul className="absolute right-0 mt-2 w-56 max-h-64 overflow-y-auto bg-white border rounded-lg shadow-lg p-2 text-sm z-10">
+          {names.map(name => (
+            <li key={name} className="py-1 px-2 truncate">{name}</li>
+          ))}
+          {onlineCount > names.length && (
+            <li className="py-1 px-2 text-gray-500">and {onlineCount - names.length} more</li>
+          )}
+        </ul>
+      )}
+    </div>
+  );
+});
+
+const APP_TABS = [
+  { id: 'chat', label: 'Chat', prefetch: undefined },
+  { id: 'resources', label: 'JEE Resources', prefetch: ResourcesTab.prefetch },
+  { id: 'groups', label: 'Study Groups', prefetch: GroupsTab.prefetch }
+];
+
+const PrepBoosterChat: React.FC = () => {
+  // State management
+  const [communityStore] = useState<CommunityStore>(() => createStore(communityReducer, createCommunityState()));
+  const activeChannel = useStoreSelector(communityStore, state => state.activeChannel);
+  // One history store per channel, created when a channel is first used
+  const [channelStores] = useState(() => new Map<string, HistoryStore>());
+  const getChannelStore = (channel: string) => {
+    let store = channelStores.get(channel);
+    if (!store) {
+      store = createHistoryStore(channel);
+      channelStores.set(channel, store);
+    }
+    return store;
+  };
+  const historyStore = getChannelStore(activeChannel);
+  const chatHistory = useMessageHistory(historyStore);
+  const messages = chatHistory.messages;
+  const [userName, setUserName] = useState('');
+  const [isNameSet, setIsNameSet] = useState(false);
+  const [adminMode, setAdminMode] = useState(false);
+  const [adminPassword, setAdminPassword] = useState('');
+  const [showAdminLogin, setShowAdminLogin] = useState(false);
+  const [showOnlineUsers, setShowOnlineUsers] = useState(false);
+  const [activeTab, setActiveTab] = useState('chat');
+  
+  // Refs
+  const messagesRef = useRef(messages);
+  messagesRef.current = messages;
+  const transportRef = useRef<ChatTransport | null>(null);
+  const floodGuardRef = useRef(new FloodGuard());
+  const adminPasswordRef = useRef('prepboosters0909');
+
+  // Blocked words list (editable by admins, recompiled on change)
+  const [blockedWords, setBlockedWords] = useState<string[]>(DEFAULT_BLOCKED_WORDS);
+
+  // Windowed chat list (sticks to the bottom while the user is there)
+  const messageWindow = useWindowedMessages(messages);
+
+  // Page older/newer history in as the user scrolls towards either edge
+  useEffect(() => {
+    if (messageWindow.nearTop && chatHistory.hasOlder) chatHistory.loadOlder();
+  }, [messageWindow.nearTop, chatHistory.hasOlder, messages]);
+
+  useEffect(() => {
+    if (messageWindow.nearBottom && chatHistory.hasNewer) chatHistory.loadNewer();
+  }, [messageWindow.nearBottom, chatHistory.hasNewer, messages]);
+
+  useEffect(() => {
+    chatHistory.markVisible(messageWindow.start, messageWindow.end);
+  }, [messageWindow.start, messageWindow.end, messages]);
+
+  // The name screen doesn't need the previous session, so restoring it (and
+  // spinning up the search index) waits until the browser is idle, or until
+  // the user heads for the name field or join button, so first paint and
+  // first input don't compete with it
+  const [restoreStarted, setRestoreStarted] = useState(false);
+  const startRestore = useCallback(() => setRestoreStarted(true), []);
+  useEffect(() => (restoreStarted ? undefined : whenIdle(startRestore)), [restoreStarted]);
+
+  // Restore the previous session: the newest page of chat first (older pages
+  // load on scroll), with bans, flags and groups alongside
+  useEffect(() => {
+    if (!restoreStarted) return;
+    performance.mark('chat:hydrate-start');
+    chatHistory.jumpToLatest().then(() => {
+      performance.measure('chat:time-to-first-message', 'chat:hydrate-start');
+      indexStoredHistory(historyStore);
+    });
+    if (!(historyStore instanceof IndexedDbHistoryStore)) return;
+    loadCommunitySnapshot().then(snapshot => {
+      if (!snapshot) return;
+      communityStore.dispatch({ type: 'hydrate', snapshot });
+      snapshot.joinedGroups.forEach(groupId => indexStoredHistory(getChannelStore(groupChannel(groupId))));
+    });
+    return persistCommunityState(communityStore);
+  }, [restoreStarted]);
+
+  // The tabs are likely next once the chat is up
+  useEffect(() => {
+    if (!isNameSet) return;
+    return whenIdle(() => {
+      ResourcesTab.prefetch();
+      GroupsTab.prefetch();
+    });
+  }, [isNameSet]);
+
+  // Moderation selectors
+  const isBanned = useStoreSelector(communityStore, state => state.bannedUsers.has(normalizeUserName(userName)));
+
+  // Handle user name setup
+  const handleSetName = () => {
+    if (userName.trim() && !isBanned) {
+      startRestore();
+      setIsNameSet(true);
+      communityStore.dispatch({ type: 'userJoined', name: userName });
+    } else if (isBanned) {
+      alert('This username has been banned. Please choose a different name.');
+    }
+  };
+
+  // Messages for the open channel go through the resident window; the rest
+  // only reach their own channel's store
+  const handleIncoming = (incoming: Message[]) => {
+    groupByChannel(incoming, message => message.channel).forEach((batch, channel) => {
+      if (channel === activeChannel) {
+        chatHistory.appendMessages(batch);
+      } else {
+        getChannelStore(channel).append(batch);
+      }
+    });
+    indexMessages(incoming);
+    communityStore.dispatch({ type: 'messagesAdded', messages: incoming, at: Date.now() });
+  };
+  const incomingHandlerRef = useRef(handleIncoming);
+  incomingHandlerRef.current = handleIncoming;
+
+  // Own messages awaiting an ack, by client id
+  const outgoingRef = useRef(new Map<string, Message>());
+
+  const applyUpdates = (updates: MessageUpdate[]) => {
+    groupByChannel(updates, update => update.message.channel).forEach((batch, channel) => {
+      if (channel === activeChannel) {
+        chatHistory.reconcileMessages(batch);
+      } else {
+        getChannelStore(channel).replace(batch);
+      }
+    });
+    unindexMessages(updates.map(update => update.previousId));
+    indexMessages(updates.filter(update => !update.message.status).map(update => update.message));
+    communityStore.dispatch({ type: 'messagesReconciled', updates, at: Date.now() });
+  };
+
+  // Acks can arrive in any order and more than once (after a retry); each
+  // settles its own message and repeats are ignored
+  const handleAcks = (acks: WireAck[]) => {
+    const updates: MessageUpdate[] = [];
+    acks.forEach(ack => {
+      const local = outgoingRef.current.get(ack.clientId);
+      if (!local) return;
+      outgoingRef.current.delete(ack.clientId);
+      if (ack.rejected === 'banned') communityStore.dispatch({ type: 'banUser', name: local.name });
+      const message: Message = ack.rejected
+        ? { ...local, status: 'failed' }
+        : { ...local, id: ack.id, timestamp: new Date(ack.timestamp), isFlagged: ack.isFlagged || undefined, status: undefined };
+      updates.push({ previousId: local.id, message });
+    });
+    if (updates.length) applyUpdates(updates);
+  };
+  const ackHandlerRef = useRef(handleAcks);
+  ackHandlerRef.current = handleAcks;
+
+  // The message never reached the transport (upload failed or too many unacked)
+  const handleUndelivered = (message: Message) => {
+    if (!outgoingRef.current.delete(message.id)) return;
+    applyUpdates([{ previousId: message.id, message: { ...message, status: 'failed' } }]);
+  };
+  const undeliveredHandlerRef = useRef(handleUndelivered);
+  undeliveredHandlerRef.current = handleUndelivered;
+
+  // The transport gave up waiting for these acks. A late ack is ignored;
+  // retrying gets the same ack again, so the message isn't posted twice.
+  const handleAckTimeout = (clientIds: string[]) => {
+    const updates: MessageUpdate[] = [];
+    clientIds.forEach(clientId => {
+      const local = outgoingRef.current.get(clientId);
+      if (!local) return;
+      outgoingRef.current.delete(clientId);
+      updates.push({ previousId: local.id, message: { ...local, status: 'failed' } });
+    });
+    if (updates.length) applyUpdates(updates);
+  };
+  const ackTimeoutHandlerRef = useRef(handleAckTimeout);
+  ackTimeoutHandlerRef.current = handleAckTimeout;
+
+  // Connect to the chat server once the user has joined
+  useEffect(() => {
+    if (!isNameSet) return;
+    const transport = new ChatTransport(CHAT_SOCKET_URL, userName, {
+      onMessages: incoming => incomingHandlerRef.current(incoming),
+      onPresence: online => communityStore.dispatch({ type: 'setOnlineUsers', users: online }),
+      onPresenceDelta: delta => communityStore.dispatch({ type: 'presenceDelta', delta }),
+      onGroupMembers: members => communityStore.dispatch({ type: 'setGroupMembers', members }),
+      onAcks: acks => ackHandlerRef.current(acks),
+      onAckTimeout: clientIds => ackTimeoutHandlerRef.current(clientIds)
+    });
+    // Before connecting, so hello already lists the groups
+    const unfollowGroups = followJoinedGroups(communityStore, transport);
+    transport.connect();
+    transportRef.current = transport;
+    return () => {
+      unfollowGroups();
+      transport.close();
+      transportRef.current = null;
+    };
+  }, [isNameSet]);
+
+  // Handle join/leave group
+  const handleJoinGroup = useCallback((groupId: number) => {
+    communityStore.dispatch({ type: 'joinGroup', groupId });
+    // Earlier history from this device becomes searchable again
+    indexStoredHistory(getChannelStore(groupChannel(groupId)));
+    alert('Successfully joined the study group!');
+  }, [communityStore]);
+
+  // Memory held for a channel is released on leave; persisted history stays
+  // on disk for a later rejoin
+  const handleLeaveGroup = useCallback((groupId: number) => {
+    communityStore.dispatch({ type: 'leaveGroup', groupId });
+    const channel = groupChannel(groupId);
+    const store = channelStores.get(channel);
+    channelStores.delete(channel);
+    if (store instanceof IndexedDbHistoryStore) {
+      store.flush();
+    } else {
+      store?.clear().then(releaseMessageImages);
+    }
+    alert('Left the study group successfully.');
+  }, [communityStore]);
+
+  const handleOpenChannel = useCallback((channel: string) => {
+    communityStore.dispatch({ type: 'openChannel', channel });
+    setActiveTab('chat');
+    messageWindow.scrollToBottom();
+  }, [communityStore]);
+
+  // Check for blocked words
+  const containsBlockedWord = useMemo(() => compileBlockedWords(blockedWords), [blockedWords]);
+
+  // Replace the blocked word list without a rebuild
+  const handleEditBlockedWords = () => {
+    const next = prompt('Blocked words (comma separated, * as wildcard)', blockedWords.join(', '));
+    if (next === null) return;
+    setBlockedWords(next.split(',').map(word => word.trim()).filter(Boolean));
+  };
+
+  // Revoke object URLs still held by messages, and drop the search index,
+  // when the chat unmounts
+  useEffect(() => () => {
+    releaseMessageImages(messagesRef.current);
+    clearSearchIndex();
+  }, []);
+
+  // Image messages go out once their blobs are on the server, so receivers
+  // never get a hash they can't fetch
+  // Messages show immediately as pending and settle when the server acks them
+  const sendToServer = (message: Message, image: ImageUrls | null) => {
+    outgoingRef.current.set(message.id, message);
+    const deliver = () => {
+      if (!transportRef.current?.send(message)) undeliveredHandlerRef.current(message);
+    };
+    if (!image) {
+      deliver();
+      return;
+    }
+    const span = telemetry.begin();
+    uploadImage(image).then(
+      () => {
+        telemetry.end('image:upload', span);
+        deliver();
+      },
+      () => {
+        alert('Your image could not be uploaded, so only you can see it.');
+        undeliveredHandlerRef.current(message);
+      }
+    );
+  };
+
+  // Send message function; returns false when the message was not accepted
+  const handleSendMessage = (messageContent: string, image: ImageUrls | null) => {
+    if (communityStore.getState().bannedUsers.has(normalizeUserName(userName))) return false;
+    const sendSpan = telemetry.begin();
+
+    // Throttle bursts (holding Enter) and auto-flag repeated messages
+    const moderationSpan = telemetry.begin();
+    const floodVerdict = floodGuardRef.current.check(normalizeUserName(userName), messageContent);
+    if (floodVerdict === 'throttled') {
+      alert('You are sending messages too quickly. Please wait a moment.');
+      return false;
+    }
+    const shouldFlag = floodVerdict === 'duplicate' || containsBlockedWord(messageContent);
+    telemetry.end('send:moderation', moderationSpan);
+
+    // Own sends always jump back to the newest message
+    messageWindow.scrollToBottom();
+
+    if (shouldFlag) {
       const newMessage: Message = {
-        id: Date.now().toString(),
+        id: createMessageId(),
         name: userName,
         text: messageContent,
         timestamp: new Date(),
+        channel: activeChannel,
         isFlagged: true,
-        image: selectedImage ? imagePreview : undefined
+        status: 'pending',
+        image: image?.display,
+        thumbnail: image?.thumbnail,
+        imageRefs: image?.refs
       };
 
-      setMessages(prev => [...prev, newMessage]);
-      setFlaggedMessages(prev => [...prev, newMessage.id]);
-      setCurrentMessage('');
-      setSelectedImage(null);
-      setImagePreview('');
-      return;
+      chatHistory.appendMessages([newMessage], true);
+      indexMessages([newMessage]);
+      sendToServer(newMessage, image);
+      communityStore.dispatch({ type: 'messagesAdded', messages: [newMessage], at: Date.now() });
+      telemetry.end('send', sendSpan, 'flagged');
+      return true;
     }
 
     const newMessage: Message = {
-      id: Date.now().toString(),
+      id: createMessageId(),
       name: userName,
       text: messageContent,
       timestamp: new Date(),
-      image: selectedImage ? imagePreview : undefined
+      channel: activeChannel,
+      status: 'pending',
+      image: image?.display,
+      thumbnail: image?.thumbnail,
+      imageRefs: image?.refs
     };
 
-    setMessages(prev => [...prev, newMessage]);
-    setCurrentMessage('');
-    setSelectedImage(null);
-    setImagePreview('');
+    chatHistory.appendMessages([newMessage], true);
+    indexMessages([newMessage]);
+    sendToServer(newMessage, image);
+    communityStore.dispatch({ type: 'messagesAdded', messages: [newMessage], at: Date.now() });
+    telemetry.end('send', sendSpan);
+    return true;
   };
 
-  // Handle key press for sending messages
-  const handleKeyPress = (e: React.KeyboardEvent) => {
-    if (e.key === 'Enter' && !e.shiftKey) {
-      e.preventDefault();
-      handleSendMessage();
-    }
+  // Sends a failed message again under its original id, which the server
+  // uses to ack rather than repost it if the first attempt got through
+  const handleRetryMessage = (message: Message) => {
+    if (communityStore.getState().bannedUsers.has(normalizeUserName(userName))) return;
+    if (outgoingRef.current.has(message.id)) return;
+    const pending: Message = { ...message, status: 'pending' };
+    applyUpdates([{ previousId: message.id, message: pending }]);
+    const image = message.image && message.thumbnail
+      ? { display: message.image, thumbnail: message.thumbnail, refs: message.imageRefs }
+      : null;
+    sendToServer(pending, image);
+  };
+
+  // Stable identity for the memoized composer, always calling the latest handler
+  const sendHandlerRef = useRef(handleSendMessage);
+  sendHandlerRef.current = handleSendMessage;
+  const sendMessage = useCallback(
+    (messageContent: string, image: ImageUrls | null) => sendHandlerRef.current(messageContent, image),
+    []
+  );
+  const retryHandlerRef = useRef(handleRetryMessage);
+  retryHandlerRef.current = handleRetryMessage;
+  const retryMessage = useCallback((message: Message) => retryHandlerRef.current(message), []);
+
+  // Drop every queued flagged message and its flag entry in one batched
+  // update; cost scales with the number of flags, not the history size
+  const handleRemoveAllFlagged = () => {
+    const { flagQueue } = communityStore.getState();
+    if (!flagQueue.length) return;
+    chatHistory.removeMessages(flagQueue).then(releaseMessageImages);
+    // Flags can be queued from any joined channel
+    channelStores.forEach(store => {
+      if (store !== historyStore) store.remove(flagQueue).then(releaseMessageImages);
+    });
+    unindexMessages(flagQueue);
+    communityStore.dispatch({ type: 'clearFlags' });
   };
 
+  // Clears the open channel
+  const handleClearChat = () => {
+    chatHistory.clearMessages().then(removed => {
+      releaseMessageImages(removed);
+      unindexMessages(removed.map(message => message.id));
+    });
+  };
+
+  // Stable identities for the memoized admin panel
+  const adminHandlersRef = useRef({ handleRemoveAllFlagged, handleClearChat, handleEditBlockedWords });
+  adminHandlersRef.current = { handleRemoveAllFlagged, handleClearChat, handleEditBlockedWords };
+  const removeAllFlagged = useCallback(() => adminHandlersRef.current.handleRemoveAllFlagged(), []);
+  const clearChat = useCallback(() => adminHandlersRef.current.handleClearChat(), []);
+  const editBlockedWords = useCallback(() => adminHandlersRef.current.handleEditBlockedWords(), []);
+
   // Admin login function
   const handleAdminLogin = () => {
     if (adminPassword === adminPasswordRef.current) {
@@ -190,74 +2407,49 @@ const PrepBoosterChat: React.FC = () => {
     setAdminPassword('');
   };
 
-  // Format time for messages
-  const formatTime = (date: Date) => {
-    return date.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
+  const openAdminLogin = () => {
+    AdminPanel.prefetch();
+    setShowAdminLogin(true);
   };
-                <span className="font-semibold text-green-600">{onlineUsers.length}</span>
-              </div>
-              <div className="flex justify-between">
-                <span>Banned Users:</span>
-                <span className="font-semibold">{bannedUsers.length}</span>
-              </div>
-              <div className="flex justify-between">
-                <span>Active Groups:</span>
-                <span className="font-semibold">{studyGroups.length}</span>
-              </div>
-            </div>
 
-            <h4 className="font-semibold mt-4 mb-2 text-blue-600">System Info</h4>
-            <div className="text-xs text-gray-600 space-y-1">
-              <div>App Version: 2.0.0</div>
-              <div>Last Updated: {new Date().toLocaleDateString()}</div>
-              <div>Admin Access: Full Permissions</div>
-            </div>
-          </div>
-        </div>
+  const toggleOnlineUsers = useCallback(() => setShowOnlineUsers(open => !open), []);
 
-        {/* Advanced Controls */}
-        <div className="bg-white p-4 rounded-lg shadow mt-4">
-          <h4 className="font-semibold mb-3 text-blue-600">⚙️ Advanced Controls</h4>
-          <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
-            <div>
-              <h5 className="font-medium mb-2">Message Management</h5>
-              <div className="space-y-2 text-sm">
-                <button 
-                  onClick={() => setMessages(prev => prev.filter(msg => !msg.isFlagged))}
-                  className="w-full bg-orange-500 text-white px-3 py-1 rounded hover:bg-orange-600"
-                >
-                  Remove All Flagged
-                </button>
-                <button 
-                  onClick={() => setMessages([])}
-                  className="w-full bg-red-500 text-white px-3 py-1 rounded hover:bg-red-600"
-                >
-                  Clear Chat History
-                </button>
-              </div>
-            </div>
-            <div>
-              <h5 className="font-medium mb-2">User Controls</h5>
-              <div className="space-y-2 text-sm">
-                <button 
-                  onClick={() => setOnlineUsers([])}
-                  className="w-full bg-blue-500 text-white px-3 py-1 rounded hover:bg-blue-600"
-                >
-                  Kick All Users
-                </button>
-                <button 
-                  onClick={() => setBannedUsers([])}
-                  className="w-full bg-green-500 text-white px-3 py-1 rounded hover:bg-green-600"
-                >
-                  Unban All Users
-                </button>
-              </div>
-            </div>
-          </div>
+  // Reachable from the name screen and the header
+  const adminLoginDialog = showAdminLogin && (
+    <div className="fixed inset-0 bg-black bg-opacity-50 flex items-center justify-center p-4 z-50">
+      <div className="bg-white rounded-lg shadow-lg p-6 max-w-sm w-full">
+        <h2 className="text-xl font-bold text-indigo-600 mb-4">Admin Login</h2>
+        <input
+          type="password"
+          value={adminPassword}
+          onChange={(e) => setAdminPassword(e.target.value)}
+          onKeyDown={(e) => {
+            if (e.key === 'Enter') handleAdminLogin();
+          }}
+          className="w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500 focus:border-transparent mb-4"
+          placeholder="Admin password"
+          autoFocus
+        />
+        <div className="flex space-x-2">
+          <button
+            onClick={handleAdminLogin}
+            className="flex-1 bg-indigo-600 text-white py-2 rounded-lg hover:bg-indigo-700"
+          >
+            Login
+          </button>
+          <button
+            onClick={() => {
+              setShowAdminLogin(false);
+              setAdminPassword('');
+            }}
+            className="flex-1 bg-gray-200 text-gray-700 py-2 rounded-lg hover:bg-gray-300"
+          >
+            Cancel
+          </button>
         </div>
       </div>
-    );
-  };
+    </div>
+  );
 
   // Name input screen
   if (!isNameSet) {
@@ -279,6 +2471,7 @@ const PrepBoosterChat: React.FC = () => {
                 type="text"
                 value={userName}
                 onChange={(e) => setUserName(e.target.value)}
+                onFocus={startRestore}
                 className="w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500 focus:border-transparent"
                 placeholder="Your name"
                 maxLength={50}
@@ -287,6 +2480,7 @@ const PrepBoosterChat: React.FC = () => {
             
             <button
               onClick={handleSetName}
+              onMouseEnter={startRestore}
               disabled={!userName.trim()}
               className="w-full bg-indigo-600 text-white py-3 px-4 rounded-lg hover:bg-indigo-700 disabled:opacity-50 disabled:cursor-not-allowed transition-colors"
             >
@@ -298,218 +2492,182 @@ const PrepBoosterChat: React.FC = () => {
             </div>
             
             <button
-              onClick={() => setShowAdminLogin(true)}
+              onClick={openAdminLogin}
+              onMouseEnter={AdminPanel.prefetch}
               className="w-full text-indigo-600 py-2 px-4 rounded-lg hover:bg-indigo-50 transition-colors border border-indigo-200"
             >
               Admin Login
             </button>
           </div>
-                    </button>
         </div>
+        {adminLoginDialog}
+      </div>
+    );
+  }
 
-        {activeTab === 'chat' && (
-        <div className="flex flex-col md:flex-row gap-6">
-          {/* Chat Container */}
-          <div className="bg-white rounded-lg shadow-lg flex-1 flex flex-col">
-            {/* Messages Area */}
-            <div className="flex-1 overflow-y-auto p-4 space-y-4">
-              {messages.length === 0 ? (
-                <div className="text-center text-gray-500 py-8">
-                  <div className="w-16 h-16 mx-auto mb-4 bg-indigo-100 rounded-full flex items-center justify-center">
-                    <svg className="w-8 h-8 text-indigo-400" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                      <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M8 12h.01M12 12h.极 01M16 12h.01M21 12c0 4.418-4.03 8-9 8a9.863 9.863 极 01-4.255-.949L3 20l1.395-3.72C3.512 15.042 3 13.574 3 12c0-4.418 4.03-8 9-8s9 3.582 9 8z" />
-                    </svg>
-                  </div>
-                  <p>Start the conversation! Send your first message.</p>
-                </div>
-              ) : (
-                messages.map((message) => (
-                  <div key={message.id} className={`flex flex-col ${message.name === userName ? 'items-end' : ''}`}>
-                    <div className="flex items-center space极 2 mb-1">
-                      <span className="font-semibold text-indigo-600 text-sm">{message.name}</span>
-                      <span className="text-xs text-gray-500">{formatTime(message.timestamp)}</span>
-                      {message.isFlagged && (
-                        <span className="text-xs bg-red-100 text-red-700 px-2 py-0.5 rounded">Flagged</span>
-                      )}
-                    </div>
-                    <div className={`rounded-lg px-4 py-2 max-w-md ${message.name === userName ? 'bg-indigo-100' : 'bg-blue-50'} ${message.isFlagged ? 'border border-red-300' : ''}`}>
-                      {message.image && (
-                        <div className="mb-2">
-                          <img 
-                            src={message.image} 
-                            alt="Shared content" 
-                            className="rounded-lg max-w-full max-h-48 object-cover"
-                          />
-                        </div>
-                      )}
-                      <p className="text-gray-800 break-words">{message.text}</p>
+  return (
+    <div className="min-h-screen bg-gray-50 flex flex-col">
+      {/* Header */}
+      <header className="bg-white shadow-sm">
+        <div className="max-w-6xl mx-auto px-4 py-4 flex flex-wrap items-center justify-between gap-3">
+          <div>
+            <h1 className="text-2xl font-bold text-indigo-600">PrepBooster</h1>
+            <p className="text-sm text-gray-600">
+              Welcome, {userName}{adminMode ? ' (Admin)' : ''}
+            </p>
+          </div>
+          <div className="flex items-center space-x-3">
+            <OnlineUsers store={communityStore} open={showOnlineUsers} onToggle={toggleOnlineUsers} />
+            {!adminMode && (
+              <button
+                onClick={openAdminLogin}
+                onMouseEnter={AdminPanel.prefetch}
+                className="text-sm text-indigo-600 px-3 py-1 rounded-lg border border-indigo-200 hover:bg-indigo-50"
+              >
+                Admin Login
+              </button>
+            )}
+          </div>
+        </div>
+        <nav className="max-w-6xl mx-auto px-4 flex space-x-6">
+          {APP_TABS.map(tab => (
+            <button
+              key={tab.id}
+              onClick={() => setActiveTab(tab.id)}
+              onMouseEnter={tab.prefetch}
+              onFocus={tab.prefetch}
+              className={`py-3 text-sm font-medium border-b-2 ${
+                activeTab === tab.id ? 'border-indigo-600 text-indigo-600' : 'border-transparent text-gray-600 hover:text-indigo-600'
+              }`}
+            >
+              {tab.label}
+            </button>
+          ))}
+        </nav>
+      </header>
+      {adminLoginDialog}
+
+      <div className="max-w-6xl mx-auto p-4 w-full">
+        {/* Render timings per tab */}
+        <React.Profiler id={`tab:${activeTab}`} onRender={telemetry.onRender}>
+          {/* Hidden rather than unmounted on other tabs, so the draft, a picked
+              image and the scroll position survive switching tabs */}
+          <div className={activeTab === 'chat' ? 'flex flex-col md:flex-row gap-6' : 'hidden'}>
+            {/* Chat Container */}
+            <div className="bg-white rounded-lg shadow-lg flex-1 flex flex-col">
+              <ChannelTabs store={communityStore} onOpen={handleOpenChannel} />
+
+              {/* Messages Area */}
+              <div
+                ref={messageWindow.setContainer}
+                onScroll={messageWindow.handleScroll}
+                className="flex-1 overflow-y-auto p-4 max-h-[70vh]"
+                style={{ overflowAnchor: 'none' }}
+              >
+                {messages.length === 0 ? (
+                  <div className="text-center text-gray-500 py-8">
+                    <div className="w-16 h-16 mx-auto mb-4 bg-indigo-100 rounded-full flex items-center justify-center">
+                      <svg className="w-8 h-8 text-indigo-400" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                        <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M8 12h.01M12 12h.01M16 12h.01M21 12c0 4.418-4.03 8-9 8a9.863 9.863 0 01-4.255-.949L3 20l1.395-3.72C3.512 15.042 3 13.574 3 12c0-4.418 4.03-8 9-8s9 3.582 9 8z" />
+                      </svg>
                     </div>
+                    <p>Start the conversation! Send your first message.</p>
                   </div>
-                ))
-              )}
-              <div ref={messagesEndRef} />
+                ) : (
+                  <div style={{ paddingTop: messageWindow.padTop, paddingBottom: messageWindow.padBottom }}>
+                    {messageWindow.visibleMessages.map((message) => (
+                      <MessageRow
+                        key={message.id}
+                        message={message}
+                        isOwn={message.name === userName}
+                        measureRef={messageWindow.measureRow}
+                        onRetry={retryMessage}
+                      />
+                    ))}
+                  </div>
+                )}
+              </div>
+
+              {/* Input Area */}
+              <Composer store={communityStore} userName={userName} onSend={sendMessage} />
             </div>
 
-            {/* Input Area */}
-            <div className="border-t p-4">
-              {imagePreview && (
-                <div className="mb-3 relative">
-                  <img 
-                    src={imagePreview} 
-                    alt="Preview" 
-                    className="rounded-lg max-h-32 object-cover"
-                  />
+            {/* Info Panel */}
+            <div className="bg-white rounded-lg shadow-lg p-6 w-full md:w-80">
+              <h2 className="font-bold text-lg mb-4 text-indigo-600">JEE Prep Guidelines</h2>
+              <ul className="space-y-3 text-sm">
+                <li className="flex items-start">
+                  <span className="text-green-500 mr-2">✓</span>
+                  <span>Ask specific doubts with question details</span>
+                </li>
+                <li className="flex items-start">
+                  <span className="text-green-500 mr-2">✓</span>
+                  <span>Share useful study resources and tips</span>
+                </li>
+                <li className="flex items-start">
+                  <span className="text-green-500 mr-2">✓</span>
+                  <span>Help others with their doubts</span>
+                </li>
+                <li className="flex items-start">
+                  <span className="text-red-500 mr-2">✗</span>
+                  <span>No abusive language or harassment</span>
+                </li>
+                <li className="flex items-start">
+                  <span className="text-red-500 mr-2">✗</span>
+                  <span>No sharing of irrelevant content</span>
+                </li>
+              </ul>
+          
+              <div className="mt-6 p-4 bg-blue-50 rounded-lg">
+                <h3 className="font-semibold mb-2">JEE Help Resources</h3>
+                <p className="text-sm text-gray-600">
+                  Get study materials at: <span className="text-indigo-600">resources@prepbooster.com</span>
+                </p>
+              </div>
+
+              <SearchPanel />
+          
+              {adminMode && (
+                <div className="mt-6 p-4 bg-red-50 rounded-lg">
+                  <h3 className="font-semibold mb-2 text-red-700">Admin Mode Active</h3>
+                  <p className="text-sm text-red-600">
+                    You have full administrative control over the chat.
+                  </p>
                   <button
-                    onClick={removeImage}
-                    className="absolute top-2 right-2 bg-red-500 text-white rounded-full p-1 text-xs"
+                    onClick={() => setAdminMode(false)}
+                    className="mt-2 text-sm text-red-700 underline"
                   >
-                    ✕
+                    Exit Admin Mode
                   </button>
                 </div>
               )}
-              <div className="flex space-x-3">
-                <div className="flex-1 flex flex-col">
-                  <input
-                    type="text"
-                    value={currentMessage}
-                    onChange={(e) => setCurrentMessage(e.target.value)}
-                    onKeyPress={handleKeyPress}
-                    placeholder="Type your message or share an image..."
-                    className="w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500 focus:border-transparent mb-2"
-                    maxLength={500}
-                  />
-                  <label className="flex items-center text-sm text-indigo-600 cursor-pointer">
-                    <input
-                      type="file"
-                      accept="image/*"
-                      onChange={handleImageSelect}
-                      className="hidden"
-                    />
-                    <svg className="w-5 h-5 mr-1" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                      <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M4 16l4.586-4.586a2 2 0 012.828 0L16 16m-2-2l1.586-1.586a2 2 0 012.828 0L20 14m-6-6h.01M6 20h12a2 2 0 002-2V6a2 2 0 00-2-2H6a2 2 0 00-2 2v12a2 2 0 002 2z" />
-                    </svg>
-                    Add Image
-                  </label>
-                </div>
-                <button
-                  onClick={handleSendMessage}
-                  disabled={(!currentMessage.trim() && !selectedImage) || bannedUsers.includes(userName.toLowerCase())}
-                  className="bg-indigo-极 text-white px-6 py-2 rounded-lg hover:bg-indigo-700 disabled:opacity-50 disabled:cursor-not-allowed transition-colors self-end"
-                >
-                  Send
-                </button>
-              </div>
-              <p className="text-xs text-gray-500 mt-2">
-                {bannedUsers.includes(userName.toLowerCase()) 
-                  ? 'Your account has been banned from sending messages.'
-                  : 'Messages containing inappropriate content will be flagged automatically.'
-                }
-              </p>
             </div>
           </div>
 
-          {/* Info Panel */}
-          <div className="bg-white rounded-lg shadow-lg p-6 w-full md:w-80">
-            <h2 className="font-bold text-lg mb-4 text-indigo-600">JEE Prep Guidelines</h2>
-            <ul className="space-y-3 text-sm">
-              <li className="flex items-start">
-                <span className="text-green-500 mr-2">✓</span>
-                <span>Ask specific doubts with question details</span>
-              </li>
-              <li className="flex items-start">
-                <span className="text-green-500 mr-2">✓</span>
-                <span>Share useful study resources and tips</span>
-              </li>
-              <li className="flex items-start">
-                <span className="text-green-500 mr-2">✓</span>
-                <span>Help others with their doubts</span>
-              </li>
-              <li className="flex items-start">
-                <span className="text-red-500 mr-2">✗</span>
-                <span>No abusive language or harassment</span>
-              </li>
-              <li className="flex items-start">
-                <span className="text-red-500 mr-2">✗</span>
-                <span>No sharing of irrelevant content</span>
-              </li>
-            </ul>
-            
-            <div className="mt-6 p-4 bg-blue-50 rounded-lg">
-              <h3 className="font-semibold mb-2">JEE Help Resources</h3>
-              <p className="text-sm text-gray-600">
-                Get study materials at: <span className="text-indigo-600">resources@prepbooster.com</span>
-              </p>
-            </div>
-            
-            {adminMode && (
-              <div className="mt-6 p-4 bg-red-50 rounded-lg">
-                <h3 className="font-semibold mb-2 text-red-700">Admin Mode Active</h3>
-                <p className="text-sm text-red-600">
-                  You have full administrative control over the chat.
-                </p>
-                <button
-                  onClick={() => setAdminMode(false)}
-                  className="mt-2 text-sm text-red-700 underline"
-                >
-                  Exit Admin Mode
-                </button>
-              </div>
+          <React.Suspense fallback={CHUNK_FALLBACK}>
+            {/* JEE Resources Tab */}
+            {activeTab === 'resources' && <ResourcesTab />}
+
+            {/* Study Groups Tab */}
+            {activeTab === 'groups' && (
+              <GroupsTab store={communityStore} onJoin={handleJoinGroup} onLeave={handleLeaveGroup} onOpen={handleOpenChannel} />
             )}
-          </div>
-        </div>
-        )}
-
-        {/* JEE Resources Tab */}
-        {activeTab === 'resources' && (
-          <div className="bg-white rounded-lg shadow-lg p-6">
-            <h2 className="font-bold text-2xl mb-6 text-indigo-600">JEE Preparation Resources</h2>
-            <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-              {jeeResources.map(resource => (
-                <div key={resource.id} className="border rounded-lg p-4 hover:shadow-md transition-shadow">
-                  <h3 className="font-semibold text-lg mb-2 text-indigo-700">{resource.title}</h3>
-                  <p className="text-gray-600 text-sm mb-3">{resource.description}</p>
-                  <button className="bg-indigo-600 text-white px-4 py-2 rounded-lg text-sm hover:bg-indigo-700">
-                    Download
-                  </button>
-                </div>
-              ))}
-            </div>
-          </div>
-        )}
-
-        {/* Study Groups Tab */}
-        {activeTab === 'groups' && (
-          <div className="bg-white rounded-lg shadow-lg p-6">
-            <h2 className="font-bold text-2xl mb-6 text-indigo-600">Study Groups</h2>
-            <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
-              {studyGroups.map(group => (
-                <div key={group.id} className="border rounded-lg p-4">
-                  <h3 className="font-semibold text-lg mb-2">{group.name}</h3>
-                  <p className="text-gray-600 text-sm mb-3">{group.members} members active</p>
-                  {group.isJoined ? (
-                    <button 
-                      onClick={() => handleLeaveGroup(group.id)}
-                      className="bg-red-600 text-white px-4 py-2 rounded-lg text-sm hover:bg-red-700"
-                    >
-                      Leave Group
-                    </button>
-                  ) : (
-                    <button 
-                      onClick={() => handleJoinGroup(group.id)}
-                      className="bg-green-600 text-white px-4 py-2 rounded-lg text-sm hover:bg-green-700"
-                    >
-                      Join Group
-                    </button>
-                  )}
-                </div>
-              ))}
-            </div>
-          </div>
-        )}
+          </React.Suspense>
+        </React.Profiler>
       </div>
 
       {/* Admin Panel */}
-      {renderAdminPanel()}
+      {adminMode && (
+        <React.Suspense fallback={CHUNK_FALLBACK}>
+          <AdminPanel
+            store={communityStore}
+            blockedWordCount={blockedWords.length}
+            onRemoveAllFlagged={removeAllFlagged}
+            onClearChat={clearChat}
+            onEditBlockedWords={editBlockedWords}
+          />
+        </React.Suspense>
+      )}
 
       {/* Footer */}
       <footer className="bg-white border-t mt-auto">
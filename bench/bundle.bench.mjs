@@ -0,0 +1,131 @@
+// @ts-check
+// What the name screen costs to load. Builds Prep.py minified twice, as one
+// bundle and with esbuild's code splitting, and lists each output's raw and
+// gzipped size. The initial payload is the entry chunk plus every chunk it
+// imports statically (with splitting, code the entry shares with the ui/
+// chunks, such as core.tsx, moves into such a chunk); the ui/ chunks behind
+// dynamic import() load later. For each build it also times importing the entry and
+// rendering the name screen in jsdom, a stand-in for time-to-interactive
+// (one cold sample each, so expect noise). React stays external in both
+// builds, so the sizes are the app's own code.
+//
+//   npm install && node bench/bundle.bench.mjs
+import { build } from 'esbuild';
+import { readFile, rm } from 'node:fs/promises';
+import { fileURLToPath, pathToFileURL } from 'node:url';
+import { gzipSync } from 'node:zlib';
+import { render, setupDom } from '../test/support/dom.mjs';
+import { isMain, measure, printResults } from './support/measure.mjs';
+
+const root = fileURLToPath(new URL('..', import.meta.url));
+
+/**
+ * @typedef {{ build: string, chunk: string, initial: boolean, bytes: number, gzipBytes: number }} ChunkSize
+ */
+
+/**
+ * The entry and the outputs it reaches through static imports, which the
+ * browser fetches before the entry runs
+ * @param {import('esbuild').Metafile} metafile
+ * @param {string} entry output path
+ */
+const initialOutputs = (metafile, entry) => {
+  const seen = new Set([entry]);
+  const pending = [entry];
+  while (pending.length) {
+    const file = /** @type {string} */ (pending.pop());
+    for (const { path, kind, external } of metafile.outputs[file].imports) {
+      if (kind !== 'import-statement' || external || seen.has(path)) continue;
+      seen.add(path);
+      pending.push(path);
+    }
+  }
+  return seen;
+};
+
+/** @param {boolean} splitting */
+const buildApp = async splitting => {
+  const label = splitting ? 'split' : 'single';
+  const outdir = `${root}node_modules/.cache/prepbooster/bundle/${label}`;
+  await rm(outdir, { recursive: true, force: true });
+  const { metafile } = await build({
+    absWorkingDir: root,
+    entryPoints: [`${root}Prep.py`],
+    outdir,
+    bundle: true,
+    splitting,
+    minify: true,
+    format: 'esm',
+    platform: 'browser',
+    loader: { '.py': 'tsx' },
+    // .mjs, so Node imports the chunks as modules
+    outExtension: { '.js': '.mjs' },
+    external: ['react', 'react-dom'],
+    metafile: true,
+    logLevel: 'error'
+  });
+  const outputs = Object.entries(metafile.outputs);
+  const entryFile = /** @type {string} */ (outputs.find(([, output]) => output.entryPoint)?.[0]);
+  const initial = initialOutputs(metafile, entryFile);
+  /** @type {ChunkSize[]} */
+  const chunks = [];
+  for (const [file, output] of outputs) {
+    const code = await readFile(`${root}${file}`);
+    // Named after the ui/ module a lazy chunk carries
+    const lazy = Object.keys(output.inputs).find(input => input.startsWith('ui/'));
+    chunks.push({
+      build: label,
+      chunk: output.entryPoint ? 'entry' : lazy ?? 'shared',
+      initial: initial.has(file),
+      bytes: code.length,
+      gzipBytes: gzipSync(code).length
+    });
+  }
+  const entry = `${root}${entryFile}`;
+  return { label, entry, chunks };
+};
+
+export const run = async () => {
+  const window = setupDom();
+  const { default: React } = await import('react');
+  const builds = [await buildApp(false), await buildApp(true)];
+  const results = [];
+  for (const { label, entry, chunks } of builds) {
+    /** @type {Awaited<ReturnType<typeof render>> | undefined} */
+    let view;
+    const result = await measure(`name-screen-${label}`, 1, async () => {
+      const app = await import(pathToFileURL(entry).href);
+      view = await render(React.createElement(app.default));
+    });
+    await view?.unmount();
+    const loaded = chunks.filter(chunk => chunk.initial);
+    results.push({
+      ...result,
+      initialBytes: loaded.reduce((sum, chunk) => sum + chunk.bytes, 0),
+      initialGzipBytes: loaded.reduce((sum, chunk) => sum + chunk.gzipBytes, 0),
+      chunks
+    });
+  }
+  window.close();
+  return results;
+};
+
+if (isMain(import.meta.url)) {
+  const results = await run();
+  printResults(results);
+  const kb = (/** @type {number} */ bytes) => Number((bytes / 1024).toFixed(1));
+  console.table(
+    results.flatMap(result =>
+      /** @type {ChunkSize[]} */ (result.chunks).map(({ build, chunk, initial, bytes, gzipBytes }) => ({
+        build,
+        chunk,
+        initial,
+        KB: kb(bytes),
+        'gzip KB': kb(gzipBytes)
+      }))
+    )
+  );
+  const [single, split] = results;
+  const saved = 1 - Number(split.initialGzipBytes) / Number(single.initialGzipBytes);
+  console.log(`initial payload is ${Math.round(saved * 100)}% smaller gzipped with splitting`);
+}
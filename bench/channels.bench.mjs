@@ -0,0 +1,83 @@
+// @ts-check
+// 500 study groups through the chat server. Clients join a few random groups
+// each and post to them; what each client receives (and so stores) should
+// track the traffic of the groups it joined, not the total. Runs with 1, 5
+// and 20 joined groups per client at the same total traffic, and once with
+// twice the traffic, and compares received messages with the expected share,
+// total × joined / groups.
+//
+//   npm install && node bench/channels.bench.mjs
+import { startServer } from '../server/index.mjs';
+import { connectChatClient, connectMany, sleep } from './support/chat-clients.mjs';
+import { isMain, measure, printResults } from './support/measure.mjs';
+
+const GROUPS = 500;
+const CLIENTS = 2000;
+const SENDERS_PER_ROUND = 100;
+const ROUND_MS = 100;
+
+/**
+ * @param {number} joinedPerClient
+ * @param {number} rounds
+ */
+const simulate = async (joinedPerClient, rounds) => {
+  const server = await startServer();
+  const url = `ws://127.0.0.1:${server.port}/chat`;
+  /** @type {string[][]} */
+  const memberships = Array.from({ length: CLIENTS }, () => {
+    const groups = new Set();
+    while (groups.size < joinedPerClient) groups.add(`group:${Math.floor(Math.random() * GROUPS)}`);
+    return [...groups];
+  });
+  const clients = await connectMany(CLIENTS, i =>
+    connectChatClient(url, `student${i}`, { channels: ['general', ...memberships[i]] })
+  );
+  await sleep(1000);
+  // Only count traffic from here on
+  clients.forEach(client => {
+    client.received = 0;
+    client.bytes = 0;
+  });
+
+  // Senders rotate, so nobody posts often enough to be throttled
+  const messages = rounds * SENDERS_PER_ROUND;
+  for (let round = 0; round < rounds; round++) {
+    for (let j = 0; j < SENDERS_PER_ROUND; j++) {
+      const sender = (round * SENDERS_PER_ROUND + j) % CLIENTS;
+      const groups = memberships[sender];
+      clients[sender].send(`Round ${round} doubt from ${sender}`, groups[j % groups.length]);
+    }
+    await sleep(ROUND_MS);
+  }
+  await sleep(500);
+
+  const received = clients.reduce((sum, client) => sum + client.received, 0) / CLIENTS;
+  const bytes = clients.reduce((sum, client) => sum + client.bytes, 0) / CLIENTS;
+  clients.forEach(client => client.socket.terminate());
+  await server.close();
+  return { messages, received, bytes, expected: (messages * joinedPerClient) / GROUPS };
+};
+
+export const run = async () => {
+  const results = [];
+  for (const [joined, rounds] of [[1, 20], [5, 20], [20, 20], [5, 40]]) {
+    /** @type {Awaited<ReturnType<typeof simulate>> | undefined} */
+    let stats;
+    const result = await measure(`${GROUPS}-groups-${joined}-joined-${rounds * SENDERS_PER_ROUND}-msgs`, CLIENTS, async () => {
+      stats = await simulate(joined, rounds);
+    });
+    results.push({ ...result, ...stats });
+  }
+  return results;
+};
+
+if (isMain(import.meta.url)) {
+  const results = await run();
+  printResults(results);
+  results.forEach(({ name, messages, received, expected, bytes }) =>
+    console.log(
+      `${name}: each client got ${Number(received).toFixed(1)} of ${messages} ` +
+        `(expected ${Number(expected).toFixed(1)}), ${(Number(bytes) / 1024).toFixed(1)} KB`
+    )
+  );
+}
@@ -0,0 +1,271 @@
+// @ts-check
+// The chat as people use it: the real PrepBoosterChat rendered in jsdom and
+// connected to the stand-in chat server. Covers mount, each keystroke in the
+// composer, switching tabs, sending 1k messages through the composer, taking
+// in 10k messages of live traffic (with the heap they leave behind) and an
+// admin's Remove All Flagged through its button, first on the backlog and
+// then over repeated flag-and-remove cycles. Each row has wall-clock time and
+// the commit time React's Profiler reports (without jsdom's own work), with
+// p50/p99 of the per-step commits where a row has many steps. Results are
+// always written to bench/results/chat.json and compared with the committed
+// baseline; a regression past the threshold, or no baseline to compare
+// with, fails the run.
+//
+//   npm install && node --expose-gc bench/chat.bench.mjs [--threshold 0.15] [--update-baseline]
+import { parseArgs } from 'node:util';
+import { startServer } from '../server/index.mjs';
+import { createModerationPipeline } from '../shared/moderation-pipeline.mjs';
+import { buttonLabelled, click, loadApp, render, setupDom, stubLayout, typeInto, waitFor } from '../test/support/dom.mjs';
+import { connectChatClient } from './support/chat-clients.mjs';
+import {
+  compareResults,
+  isMain,
+  measure,
+  percentile,
+  printResults,
+  readBaseline,
+  writeBaseline,
+  writeResults
+} from './support/measure.mjs';
+
+const BASELINE_FILE = new URL('./chat.baseline.json', import.meta.url);
+const RESULTS_FILE = new URL('./results/chat.json', import.meta.url);
+const DEFAULT_THRESHOLD = 0.15;
+const ADMIN_PASSWORD = 'prepboosters0909';
+// The server flags this instead of a real blocked word, so the bench
+// carries no offensive text
+const FLAG_WORD = 'benchflag';
+const FLAG_EVERY = 10;
+const FLAG_CYCLE_MESSAGES = 50;
+// The composer's flood guard refills one send a second
+const SEND_SPACING_MS = 1000;
+const DRAFT = 'Why does the normal force do no work on a block sliding down an incline?';
+const TEXTS = [
+  'Can someone explain projectile motion at 45 degrees?',
+  'Is H2SO4 + 2NaOH -> Na2SO4 + 2H2O balanced?',
+  'What is the integral of x^2 sin x dx',
+  'Thanks, got it!',
+  'Which chapters carry the most weight in JEE Main physics?',
+  'Ideal gas: PV = nRT, so doubling T at constant V doubles P'
+];
+const TABS = ['JEE Resources', 'Study Groups', 'Chat'];
+
+/** @param {number[]} values */
+const spread = values => {
+  const sorted = [...values].sort((a, b) => a - b);
+  return { commitP50Ms: percentile(sorted, 0.5), commitP99Ms: percentile(sorted, 0.99) };
+};
+
+export const run = async ({ sends = 1000, messages = 10000, tabSwitches = 30, flagCycles = 20 } = {}) => {
+  const server = await startServer({
+    chat: {
+      moderation: createModerationPipeline(undefined, { blockedWords: [FLAG_WORD] }),
+      // All traffic comes from one feeder connection
+      flood: { check: () => 'ok' }
+    }
+  });
+  const window = setupDom(`${server.origin}/`);
+  stubLayout(window);
+  window.alert = () => {};
+
+  const { default: React } = await import('react');
+  const app = await loadApp();
+  const h = React.createElement;
+
+  let commitMs = 0;
+  /** @type {import('react').ProfilerOnRenderCallback} */
+  const onRender = (_id, _phase, actualDuration) => {
+    commitMs += actualDuration;
+  };
+  /**
+   * Commit time caused by step
+   * @param {() => Promise<unknown>} step
+   */
+  const commitsDuring = async step => {
+    const before = commitMs;
+    await step();
+    return commitMs - before;
+  };
+  /**
+   * measure() plus the commit time of the whole run
+   * @param {string} name
+   * @param {number} ops
+   * @param {() => Promise<unknown>} step
+   * @param {{ heap?: boolean }} [options]
+   */
+  const profiled = async (name, ops, step, options) => {
+    const before = commitMs;
+    const result = await measure(name, ops, step, options);
+    return { ...result, commitMs: commitMs - before };
+  };
+
+  const results = [];
+  /** @type {Awaited<ReturnType<typeof render>> | undefined} */
+  let view;
+  results.push(
+    await profiled('mount', 1, async () => {
+      view = await render(h(React.Profiler, { id: 'app', onRender }, h(app.default)));
+    })
+  );
+  const { container } = /** @type {NonNullable<typeof view>} */ (view);
+  /** @param {string} selector */
+  const input = selector => /** @type {HTMLInputElement} */ (container.querySelector(selector));
+  // Value next to a label in the admin panel's statistics
+  /** @param {string} label */
+  const stat = label => {
+    const row = [...container.querySelectorAll('span')].find(span => span.textContent === label);
+    return Number(row?.nextElementSibling?.textContent);
+  };
+
+  await typeInto(input('#name'), 'asha');
+  await click(buttonLabelled(container, 'Join JEE Prep Community'));
+  await waitFor(() => server.chat.clientCount === 1);
+  await click(buttonLabelled(container, 'Admin Login'));
+  await typeInto(input('input[type="password"]'), ADMIN_PASSWORD);
+  await click(buttonLabelled(container, 'Login'));
+  // The admin panel is its own chunk
+  await waitFor(() => !Number.isNaN(stat('Flag Queue:')));
+
+  // One character at a time, as typed
+  /** @type {number[]} */
+  const keystrokes = [];
+  const composer = input('input[placeholder^="Type your message"]');
+  const typing = await profiled('keystroke', DRAFT.length, async () => {
+    for (let i = 1; i <= DRAFT.length; i++) keystrokes.push(await commitsDuring(() => typeInto(composer, DRAFT.slice(0, i))));
+  });
+  results.push({ ...typing, ...spread(keystrokes) });
+  await typeInto(composer, '');
+
+  /** @type {number[]} */
+  const switches = [];
+  const tabs = await profiled('tab-switch', tabSwitches, async () => {
+    for (let i = 0; i < tabSwitches; i++) {
+      switches.push(await commitsDuring(() => click(buttonLabelled(container, TABS[i % TABS.length]))));
+    }
+  });
+  results.push({ ...tabs, ...spread(switches) });
+  await click(buttonLabelled(container, 'Chat'));
+
+  // Another student, who receives what the app sends and feeds it traffic
+  const feeder = await connectChatClient(`ws://127.0.0.1:${server.port}/chat`, 'feeder');
+
+  // Typed and sent through the composer. The flood guard allows a burst and
+  // then one send a second, so the clock moves on a second per send, as if
+  // typed at a human pace (and stays ahead until the end, so the app never
+  // sees it run backwards); done once the other student has them all.
+  const sent = feeder.received;
+  const realNow = Date.now;
+  let skew = 0;
+  Date.now = () => realNow() + skew;
+  /** @type {number[]} */
+  const sendCommits = [];
+  const sending = await profiled(`send-${sends}`, sends, async () => {
+    for (let i = 0; i < sends; i++) {
+      skew += SEND_SPACING_MS;
+      sendCommits.push(
+        await commitsDuring(async () => {
+          await typeInto(composer, `${TEXTS[i % TEXTS.length]} (${i})`);
+          await click(buttonLabelled(container, 'Send'));
+        })
+      );
+    }
+    await waitFor(() => feeder.received - sent >= sends, 60000);
+  });
+  results.push({ ...sending, ...spread(sendCommits) });
+
+  // Live traffic, every FLAG_EVERY-th message flagged by the server; the
+  // heap delta is what the app holds on to for it
+  const received = stat('Messages (session):');
+  results.push(
+    await profiled(
+      `ingest-${messages}`,
+      messages,
+      async () => {
+        for (let i = 0; i < messages; i++) {
+          const text = `${TEXTS[i % TEXTS.length]} #${i}`;
+          feeder.send(i % FLAG_EVERY === 0 ? `${text} ${FLAG_WORD}` : text);
+        }
+        await waitFor(() => stat('Messages (session):') >= received + messages, 120000);
+      },
+      { heap: true }
+    )
+  );
+
+  // The name keeps the count out, so it matches the baseline run to run
+  const flagged = stat('Flag Queue:');
+  results.push(
+    await profiled('remove-all-flagged', flagged, async () => {
+      await click(buttonLabelled(container, 'Remove All Flagged'));
+      await waitFor(() => stat('Flag Queue:') === 0);
+    })
+  );
+
+  // Moderation as it goes on: a burst of flagged messages, then a sweep
+  /** @type {number[]} */
+  const cycleCommits = [];
+  const cycles = await profiled('flag-remove-cycle', flagCycles, async () => {
+    for (let cycle = 0; cycle < flagCycles; cycle++) {
+      for (let i = 0; i < FLAG_CYCLE_MESSAGES; i++) feeder.send(`${TEXTS[i % TEXTS.length]} ${FLAG_WORD} ${cycle}.${i}`);
+      await waitFor(() => stat('Flag Queue:') === FLAG_CYCLE_MESSAGES, 10000);
+      cycleCommits.push(
+        await commitsDuring(async () => {
+          await click(buttonLabelled(container, 'Remove All Flagged'));
+          await waitFor(() => stat('Flag Queue:') === 0);
+        })
+      );
+    }
+  });
+  results.push({ ...cycles, ...spread(cycleCommits) });
+
+  feeder.socket.terminate();
+  Date.now = realNow;
+  await view?.unmount();
+  window.close();
+  await server.close();
+  return results;
+};
+
+if (isMain(import.meta.url)) {
+  const { values } = parseArgs({
+    options: {
+      threshold: { type: 'string', default: String(DEFAULT_THRESHOLD) },
+      'update-baseline': { type: 'boolean', default: false }
+    }
+  });
+  const results = await run();
+  printResults(results);
+  const ms = (/** @type {unknown} */ value) => (value === undefined ? '' : Number(value).toFixed(2));
+  console.table(
+    results.map(({ name, commitMs, commitP50Ms, commitP99Ms }) => ({
+      name,
+      'commit ms': ms(commitMs),
+      'commit p50 ms': ms(commitP50Ms),
+      'commit p99 ms': ms(commitP99Ms)
+    }))
+  );
+
+  await writeResults(RESULTS_FILE, results);
+  console.log(`Results written to ${RESULTS_FILE.pathname}`);
+
+  const baseline = await readBaseline(BASELINE_FILE);
+  if (values['update-baseline']) {
+    await writeBaseline(BASELINE_FILE, results);
+    console.log(`Baseline written to ${BASELINE_FILE.pathname}`);
+  } else if (!baseline?.length) {
+    console.log(`No baseline in ${BASELINE_FILE.pathname}; record one with --update-baseline.`);
+    process.exitCode = 1;
+  } else {
+    const known = new Set(baseline.map(entry => entry.name));
+    const missing = results.filter(result => !known.has(result.name)).map(result => result.name);
+    if (missing.length) console.log(`Not in the baseline (record it with --update-baseline): ${missing.join(', ')}`);
+    const threshold = Number(values.threshold);
+    const regressions = compareResults(results, baseline, threshold);
+    if (regressions.length) {
+      console.log(`Slower than the baseline by more than ${threshold * 100}%:`);
+      regressions.forEach(({ name, change }) => console.log(`  ${name}: +${Math.round(change * 100)}%`));
+      process.exitCode = 1;
+    } else {
+      console.log('No regressions against the baseline.');
+    }
+  }
+}
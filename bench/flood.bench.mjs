@@ -0,0 +1,40 @@
+// @ts-check
+// Cost of one FloodGuard check with 10k active users. Sends go round-robin
+// over the users with the clock advancing 0.1 ms per send, so each user
+// sends about once a second: buckets refill, stay warm in the map and the
+// periodic idle sweep runs over all of them.
+//
+//   node bench/flood.bench.mjs
+import { FloodGuard } from '../shared/flood.mjs';
+import { isMain, measure, printResults } from './support/measure.mjs';
+
+const USERS = 10000;
+const CHECKS = 1000000;
+
+const DOUBTS = [
+  'Can someone explain projectile motion at 45 degrees?',
+  'Is h2so4 + 2naoh -> na2so4 + 2h2o balanced?',
+  'What is the integral of x^2 sin x dx',
+  'Thanks, got it!',
+  'Which chapters carry the most weight in JEE Main physics?',
+  'pls help pls help'
+];
+// A prime count, so no user repeats a text within its window of recent hashes
+const TEXTS = Array.from({ length: 997 }, (_, i) => `${DOUBTS[i % DOUBTS.length]} (Q${i})`);
+
+export const run = async () => {
+  const guard = new FloodGuard();
+  const users = Array.from({ length: USERS }, (_, i) => `student${i}`);
+  // Every user's bucket and hash ring exists before timing starts
+  users.forEach((user, i) => guard.check(user, TEXTS[i % TEXTS.length], 0));
+
+  const verdicts = { ok: 0, throttled: 0, duplicate: 0 };
+  const result = await measure(`flood-check-${USERS / 1000}k-users`, CHECKS, () => {
+    for (let i = 0; i < CHECKS; i++) {
+      verdicts[guard.check(users[i % USERS], TEXTS[i % TEXTS.length], 1000 + i * 0.1)]++;
+    }
+  });
+  return [{ ...result, ...verdicts, users: guard.size }];
+};
+
+if (isMain(import.meta.url)) printResults(await run());
@@ -0,0 +1,91 @@
+// @ts-check
+// Time to first message from a 50k-message cache. Fills IndexedDB (the
+// fake-indexeddb implementation, in memory) through IndexedDbHistoryStore,
+// then loads a fresh copy of the app, so the database is opened cold, and
+// times its first latest(50), which is what the chat shows on startup.
+// Warm latest(50) and before(50) (scrolling up) follow, as p50/p99 over
+// repeats. A tenth of the cache sits in a group channel, so the [channel, id]
+// index has to skip it.
+//
+//   npm install && node bench/history.bench.mjs [messages]
+import 'fake-indexeddb/auto';
+import { loadApp, setupDom } from '../test/support/dom.mjs';
+import { isMain, measure, percentile, printResults } from './support/measure.mjs';
+
+const PAGE = 50;
+const SEED_BATCH = 1000;
+const REPEATS = 50;
+
+/** @param {number} i */
+const makeMessage = i => ({
+  id: String(i).padStart(18, '0'),
+  name: `student${i % 500}`,
+  text: `Message ${i}: how do I integrate x^2 sin x?`,
+  timestamp: new Date(1700000000000 + i * 1000),
+  channel: i % 10 === 9 ? 'group:1' : 'general',
+  ...(i % 50 === 0 ? { imageRefs: { thumbnail: 'a'.repeat(64), display: 'b'.repeat(64) } } : {})
+});
+
+/**
+ * @param {string} name
+ * @param {() => Promise<unknown>} step
+ */
+const repeated = async (name, step) => {
+  /** @type {number[]} */
+  const times = [];
+  const result = await measure(name, REPEATS, async () => {
+    for (let i = 0; i < REPEATS; i++) {
+      const start = performance.now();
+      await step();
+      times.push(performance.now() - start);
+    }
+  });
+  times.sort((a, b) => a - b);
+  return { ...result, p50Ms: percentile(times, 0.5), p99Ms: percentile(times, 0.99) };
+};
+
+export const run = async (messages = 50000) => {
+  setupDom();
+  const results = [];
+
+  const seeding = await loadApp();
+  const generalStore = new seeding.IndexedDbHistoryStore('general');
+  const groupStore = new seeding.IndexedDbHistoryStore('group:1');
+  results.push(
+    await measure(`seed-${messages}`, messages, async () => {
+      for (let i = 0; i < messages; i += SEED_BATCH) {
+        const batch = Array.from({ length: Math.min(SEED_BATCH, messages - i) }, (_, j) => makeMessage(i + j));
+        await generalStore.append(batch.filter(message => message.channel === 'general'));
+        await groupStore.append(batch.filter(message => message.channel !== 'general'));
+        await Promise.all([generalStore.flush(), groupStore.flush()]);
+      }
+    })
+  );
+
+  // A fresh module instance has no open database, as after a page load
+  const app = await loadApp();
+  const store = new app.IndexedDbHistoryStore('general');
+  /** @type {{ id: string }[]} */
+  let first = [];
+  results.push(
+    await measure(`first-message-${messages}`, 1, async () => {
+      first = await store.latest(PAGE);
+    })
+  );
+  if (first.length !== PAGE) throw new Error(`Expected ${PAGE} messages, got ${first.length}`);
+
+  results.push(await repeated(`latest-${PAGE}`, () => store.latest(PAGE)));
+  const oldest = first[0].id;
+  results.push(await repeated(`before-${PAGE}`, () => store.before(oldest, PAGE)));
+  return results;
+};
+
+if (isMain(import.meta.url)) {
+  const results = await run(Number(process.argv[2] ?? 50000));
+  printResults(results);
+  const ms = (/** @type {unknown} */ value) => `${Number(value).toFixed(1)} ms`;
+  console.log(`time to first message: ${ms(results[1].totalMs)}`);
+  results
+    .filter(result => result.p50Ms !== undefined)
+    .forEach(({ name, p50Ms, p99Ms }) => console.log(`${name}: p50 ${ms(p50Ms)}, p99 ${ms(p99Ms)}`));
+}
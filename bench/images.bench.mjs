@@ -0,0 +1,141 @@
+// @ts-check
+// Memory held by 200 image messages, before and after the image pipeline,
+// in headless Chrome through Puppeteer.
+// - before: each picked photo was read with FileReader.readAsDataURL and the
+//   base64 string kept in message state and rendered at full size
+// - after: shared/image-worker.mjs makes a thumbnail and a 1280px copy, kept
+//   as Blobs behind object URLs, and rows render the thumbnail
+// Each variant gets a fresh page, which draws one 12-megapixel test photo,
+// takes it in `messages` times and renders an <img> per message. Reported:
+// the JS heap after a forced GC (where state lives), bytes held in Blobs
+// (outside the heap), and the decoded size of the rendered images.
+//
+//   npm install && node bench/images.bench.mjs [messages]
+import { createServer } from 'node:http';
+import puppeteer from 'puppeteer';
+import { IMAGE_WORKER_SOURCE } from '../shared/image-worker.mjs';
+import { isMain, measure, printResults } from './support/measure.mjs';
+
+/**
+ * Runs in the page
+ * @param {{ variant: 'before' | 'after', count: number, workerSource: string }} options
+ */
+const takeInImages = async ({ variant, count, workerSource }) => {
+  // A gradient with grain, so it compresses like a photo rather than noise
+  const width = 4000;
+  const height = 3000;
+  const canvas = new OffscreenCanvas(width, height);
+  const context = /** @type {OffscreenCanvasRenderingContext2D} */ (canvas.getContext('2d'));
+  const pixels = context.createImageData(width, height);
+  let seed = 1;
+  for (let i = 0; i < pixels.data.length; i += 4) {
+    seed = (seed * 1103515245 + 12345) & 0x7fffffff;
+    const x = (i / 4) % width;
+    const y = Math.floor(i / 4 / width);
+    const grain = (seed & 31) - 16;
+    pixels.data[i] = (x / 16 + grain) & 255;
+    pixels.data[i + 1] = (y / 12 + grain) & 255;
+    pixels.data[i + 2] = ((x + y) / 28 + grain) & 255;
+    pixels.data[i + 3] = 255;
+  }
+  context.putImageData(pixels, 0, 0);
+  const file = await canvas.convertToBlob({ type: 'image/jpeg', quality: 0.9 });
+
+  /** @type {string[]} */
+  const shown = [];
+  let blobBytes = 0;
+  let stateChars = 0;
+  if (variant === 'before') {
+    for (let i = 0; i < count; i++) {
+      const dataUrl = await new Promise(resolve => {
+        const reader = new FileReader();
+        reader.onload = () => resolve(String(reader.result));
+        reader.readAsDataURL(file);
+      });
+      shown.push(dataUrl);
+      stateChars += dataUrl.length;
+    }
+  } else {
+    const source = URL.createObjectURL(new Blob([workerSource], { type: 'text/javascript' }));
+    const worker = new Worker(source);
+    for (let id = 0; id < count; id++) {
+      const result = await new Promise(resolve => {
+        worker.onmessage = event => resolve(event.data);
+        worker.postMessage({ id, file });
+      });
+      if (result.error) throw new Error(result.error);
+      const thumbnail = URL.createObjectURL(result.thumbnail);
+      const display = URL.createObjectURL(result.display);
+      shown.push(thumbnail);
+      stateChars += thumbnail.length + display.length;
+      blobBytes += result.thumbnail.size + result.display.size;
+    }
+    worker.terminate();
+  }
+  // Kept alive like message state
+  /** @type {any} */ (window).messages = shown;
+
+  let decodedBytes = 0;
+  await Promise.all(
+    shown.map(src => {
+      const image = new Image();
+      image.style.width = '240px';
+      document.body.append(image);
+      return new Promise(resolve => {
+        image.onload = () => {
+          decodedBytes += image.naturalWidth * image.naturalHeight * 4;
+          resolve(undefined);
+        };
+        image.src = src;
+      });
+    })
+  );
+  return { fileBytes: file.size, stateChars, blobBytes, decodedBytes };
+};
+
+export const run = async (messages = 200) => {
+  // Workers need a real origin, not about:blank
+  const http = createServer((_request, response) => {
+    response.writeHead(200, { 'Content-Type': 'text/html' }).end('<!doctype html><title>images</title>');
+  });
+  await new Promise(resolve => http.listen(0, '127.0.0.1', () => resolve(undefined)));
+  const { port } = /** @type {import('node:net').AddressInfo} */ (http.address());
+  const browser = await puppeteer.launch({ args: process.getuid?.() === 0 ? ['--no-sandbox'] : [] });
+
+  const results = [];
+  for (const variant of /** @type {const} */ (['before', 'after'])) {
+    const page = await browser.newPage();
+    await page.goto(`http://127.0.0.1:${port}/`);
+    const session = await page.createCDPSession();
+    /** @type {Awaited<ReturnType<typeof takeInImages>> | undefined} */
+    let stats;
+    const result = await measure(`${variant}-${messages}-images`, messages, async () => {
+      stats = await page.evaluate(takeInImages, { variant, count: messages, workerSource: IMAGE_WORKER_SOURCE });
+    });
+    await session.send('HeapProfiler.collectGarbage');
+    const { JSHeapUsedSize } = await page.metrics();
+    results.push({ ...result, ...stats, jsHeapBytes: JSHeapUsedSize });
+    await page.close();
+  }
+
+  await browser.close();
+  await new Promise(resolve => http.close(() => resolve(undefined)));
+  return results;
+};
+
+if (isMain(import.meta.url)) {
+  const results = await run(Number(process.argv[2] ?? 200));
+  printResults(results);
+  const mb = (/** @type {unknown} */ bytes) => Number((Number(bytes) / (1024 * 1024)).toFixed(1));
+  console.table(
+    results.map(({ name, fileBytes, stateChars, jsHeapBytes, blobBytes, decodedBytes }) => ({
+      name,
+      'photo MB': mb(fileBytes),
+      // One byte per char for base64 and URLs
+      'state MB': mb(stateChars),
+      'JS heap MB': mb(jsHeapBytes),
+      'Blob MB': mb(blobBytes),
+      'decoded MB': mb(decodedBytes)
+    }))
+  );
+}
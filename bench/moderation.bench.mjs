@@ -0,0 +1,56 @@
+// @ts-check
+// Moderation throughput by pool size, in-process against worker threads.
+// Texts are unique so the verdict cache stays out of it. In-process pools
+// overlap async checks but not the classifier's CPU work, so they flatten
+// out at one core; thread pools scale with the cores the machine has.
+//
+//   node bench/moderation.bench.mjs
+import { availableParallelism } from 'node:os';
+import { InProcessModerationWorkers, ModerationPipeline } from '../shared/moderation-pipeline.mjs';
+import { ThreadModerationWorkers } from '../server/moderation-workers.mjs';
+import { createBenchStages } from './support/moderation-stages.mjs';
+import { isMain, measure, printResults } from './support/measure.mjs';
+
+const STAGES_MODULE = new URL('./support/moderation-stages.mjs', import.meta.url);
+
+/**
+ * @param {string} name
+ * @param {ModerationPipeline} pipeline
+ * @param {number} messages
+ */
+const moderateAll = async (name, pipeline, messages) => {
+  let degraded = 0;
+  const result = await measure(name, messages, async () => {
+    const verdicts = await Promise.all(
+      Array.from({ length: messages }, (_, i) => pipeline.moderate({ text: `Which chapter covers rotational motion? #${i}` }))
+    );
+    degraded = verdicts.filter(verdict => verdict.degraded).length;
+  });
+  return { ...result, degraded };
+};
+
+export const run = async (messages = 400, sizes = [1, 4, 8]) => {
+  const results = [];
+  for (const size of sizes) {
+    const pipeline = new ModerationPipeline(createBenchStages(), new InProcessModerationWorkers(size));
+    results.push(await moderateAll(`in-process-${size}`, pipeline, messages));
+  }
+  for (const size of sizes) {
+    const workers = new ThreadModerationWorkers(size, { module: STAGES_MODULE, factory: 'createBenchStages' });
+    const pipeline = new ModerationPipeline(createBenchStages(), workers);
+    // Warm up, so thread start-up and module loading aren't timed
+    await Promise.all(Array.from({ length: size }, (_, i) => pipeline.moderate({ text: `warm-up ${i}` })));
+    results.push(await moderateAll(`threads-${size}`, pipeline, messages));
+    await workers.close();
+  }
+  return results;
+};
+
+if (isMain(import.meta.url)) {
+  const results = await run();
+  printResults(results);
+  console.log(`${availableParallelism()} core(s) available`);
+  results.forEach(({ name, ops, totalMs, degraded }) =>
+    console.log(`${name}: ${Math.round((ops * 1000) / totalMs)} msgs/s, ${degraded} degraded`)
+  );
+}
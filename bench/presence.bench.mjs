@@ -0,0 +1,74 @@
+// @ts-check
+// 20k users joining and leaving over ten simulated minutes, driven through
+// the same PresenceTracker the chat server runs. Users join at random over
+// the first half of the run and stay for a random stretch; half leave
+// cleanly and half just stop heartbeating and time out. Each broadcast is
+// counted once per online client, both as the delta that is sent and as the
+// full list it replaces.
+//
+//   node --expose-gc bench/presence.bench.mjs
+import {
+  PRESENCE_BROADCAST_MS,
+  PRESENCE_HEARTBEAT_MS,
+  PRESENCE_TTL_MS,
+  PresenceTracker
+} from '../shared/presence.mjs';
+import { heapUsed, isMain, measure, printResults } from './support/measure.mjs';
+
+/**
+ * @param {number} users
+ * @param {number} durationMs
+ */
+const simulate = (users, durationMs) => {
+  const tracker = new PresenceTracker(PRESENCE_TTL_MS, 0);
+  const sessions = Array.from({ length: users }, (_, i) => {
+    const start = Math.random() * durationMs * 0.5;
+    return { user: `student${i}`, start, end: start + Math.random() * durationMs * 0.5, nextBeat: start, clean: i % 2 === 0 };
+  });
+  const stats = { peakOnline: 0, broadcasts: 0, deltaBytes: 0, fullListBytes: 0, trackerHeapBytes: 0, onlineAtHalfway: 0 };
+  const heapBefore = heapUsed();
+  for (let now = 0; now <= durationMs; now += PRESENCE_BROADCAST_MS) {
+    sessions.forEach(session => {
+      if (now < session.start || session.nextBeat > durationMs) return;
+      if (now >= session.end) {
+        if (session.clean) tracker.leave(session.user);
+        session.nextBeat = Infinity;
+      } else if (now >= session.nextBeat) {
+        tracker.heartbeat(session.user, now);
+        session.nextBeat = now + PRESENCE_HEARTBEAT_MS;
+      }
+    });
+    tracker.expire(now);
+    stats.peakOnline = Math.max(stats.peakOnline, tracker.size);
+    // Joins stop at the halfway mark, which is about when the most are online
+    if (now === durationMs / 2) {
+      stats.trackerHeapBytes = heapUsed() - heapBefore;
+      stats.onlineAtHalfway = tracker.size;
+    }
+    const delta = tracker.takeDelta();
+    if (!delta) continue;
+    stats.broadcasts++;
+    stats.deltaBytes += JSON.stringify({ type: 'presenceDelta', ...delta }).length * tracker.size;
+    stats.fullListBytes += JSON.stringify({ type: 'presence', online: tracker.snapshot() }).length * tracker.size;
+  }
+  return stats;
+};
+
+export const run = async (users = 20000, durationMs = 10 * 60 * 1000) => {
+  /** @type {ReturnType<typeof simulate> | undefined} */
+  let stats;
+  const result = await measure(`presence-${users / 1000}k`, users, () => {
+    stats = simulate(users, durationMs);
+  });
+  return [{ ...result, ...stats }];
+};
+
+if (isMain(import.meta.url)) {
+  const results = await run();
+  printResults(results);
+  const [{ peakOnline, broadcasts, deltaBytes, fullListBytes, trackerHeapBytes, onlineAtHalfway }] = results;
+  const mb = (/** @type {unknown} */ bytes) => `${(Number(bytes) / 1024 / 1024).toFixed(1)} MB`;
+  console.log(`peak online ${peakOnline}, ${broadcasts} broadcasts`);
+  console.log(`sent as deltas ${mb(deltaBytes)}, as full lists ${mb(fullListBytes)}`);
+  console.log(`heap with ${onlineAtHalfway} online ${mb(trackerHeapBytes)}`);
+}
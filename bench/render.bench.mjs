@@ -0,0 +1,156 @@
+// @ts-check
+// Chat list commit time and heap at 10k and 100k messages. The windowed list
+// is measured on mount, on a run of live appends (one message each, with
+// p50/p99 of their commits) and on a jump to the middle of the history;
+// mounting every row, which is what the list did before it was windowed, is
+// measured at 10k only. React's Profiler reports the commit durations, so
+// they exclude the time jsdom itself spends; totalMs is wall time.
+//
+//   npm install && node --expose-gc bench/render.bench.mjs
+import { loadApp, render, setupDom, stubLayout } from '../test/support/dom.mjs';
+import { isMain, measure, percentile, printResults } from './support/measure.mjs';
+
+const VIEWPORT_PX = 600;
+const FULL_LIST_MAX = 10000;
+const APPENDS = 100;
+
+/** @param {number} i */
+const makeMessage = i => ({
+  id: String(i).padStart(18, '0'),
+  name: `student${i % 50}`,
+  text: `Message ${i}: how do I integrate x^2 sin x?`,
+  timestamp: new Date(1700000000000 + i * 1000),
+  channel: 'general'
+});
+
+/** @param {number} count */
+const makeMessages = count => Array.from({ length: count }, (_, i) => makeMessage(i));
+
+/** @param {number[]} values */
+const spread = values => {
+  const sorted = [...values].sort((a, b) => a - b);
+  return { commitP50Ms: percentile(sorted, 0.5), commitP99Ms: percentile(sorted, 0.99) };
+};
+
+/** @param {number} count */
+const label = count => (count >= 1000 ? `${count / 1000}k` : String(count));
+
+/**
+ * @param {number[]} [sizes]
+ * @returns {Promise<import('./support/measure.mjs').BenchmarkResult[]>}
+ */
+export const run = async (sizes = [10000, 100000]) => {
+  const window = setupDom();
+  stubLayout(window, VIEWPORT_PX);
+
+  const { default: React, act } = await import('react');
+  const app = await loadApp();
+  const h = React.createElement;
+  const noop = () => {};
+
+  let commitMs = 0;
+  /** @type {import('react').ProfilerOnRenderCallback} */
+  const onRender = (_id, _phase, actualDuration) => {
+    commitMs += actualDuration;
+  };
+
+  // The same markup as the chat tab's message area
+  /** @param {{ messages: ReturnType<typeof makeMessages> }} props */
+  const WindowedList = ({ messages }) => {
+    const list = app.useWindowedMessages(messages);
+    return h(
+      'div',
+      { ref: list.setContainer, onScroll: list.handleScroll, className: 'flex-1 overflow-y-auto p-4', style: { padding: '16px' } },
+      h(
+        'div',
+        { style: { paddingTop: list.padTop, paddingBottom: list.padBottom } },
+        list.visibleMessages.map(message => h(app.MessageRow, { key: message.id, message, isOwn: false, measureRef: list.measureRow }))
+      )
+    );
+  };
+
+  /** @param {{ messages: ReturnType<typeof makeMessages> }} props */
+  const FullList = ({ messages }) =>
+    h('div', null, messages.map(message => h(app.MessageRow, { key: message.id, message, isOwn: false, measureRef: noop })));
+
+  /**
+   * measure() plus the commit time of the whole run
+   * @param {string} name
+   * @param {number} ops
+   * @param {() => Promise<unknown>} step
+   * @param {{ heap?: boolean }} [options]
+   */
+  const profiled = async (name, ops, step, options) => {
+    const before = commitMs;
+    const result = await measure(name, ops, step, options);
+    return { ...result, commitMs: commitMs - before };
+  };
+
+  /** @type {import('./support/measure.mjs').BenchmarkResult[]} */
+  const results = [];
+  for (const size of sizes) {
+    let messages = makeMessages(size);
+    const tree = (/** @type {typeof messages} */ list) =>
+      h(React.Profiler, { id: 'list', onRender }, h(WindowedList, { messages: list }));
+
+    /** @type {Awaited<ReturnType<typeof render>>} */
+    let view = /** @type {any} */ (undefined);
+    // Returns the view, so the heap delta counts the mounted rows
+    const mount = await profiled(`list-windowed-${label(size)}-mount`, 1, async () => (view = await render(tree(messages))), {
+      heap: true
+    });
+    results.push({ ...mount, rows: view.container.querySelectorAll('[data-key]').length });
+
+    /** @type {number[]} */
+    const appendCommits = [];
+    const append = await profiled(`list-windowed-${label(size)}-append`, APPENDS, async () => {
+      for (let i = 0; i < APPENDS; i++) {
+        messages = [...messages, makeMessage(messages.length)];
+        const before = commitMs;
+        await view.rerender(tree(messages));
+        appendCommits.push(commitMs - before);
+      }
+    });
+    results.push({ ...append, ...spread(appendCommits) });
+
+    // Scroll events are handled on the next animation frame
+    const container = /** @type {HTMLElement} */ (view.container.firstElementChild);
+    results.push(
+      await profiled(`list-windowed-${label(size)}-scroll`, 1, () =>
+        act(async () => {
+          container.scrollTop = (size / 2) * 72;
+          container.dispatchEvent(new window.Event('scroll'));
+          await new Promise(resolve => setTimeout(resolve, 50));
+        })
+      )
+    );
+    await view.unmount();
+
+    if (size > FULL_LIST_MAX) continue;
+    /** @type {Awaited<ReturnType<typeof render>>} */
+    let full = /** @type {any} */ (undefined);
+    const fullMount = await profiled(
+      `list-full-${label(size)}-mount`,
+      1,
+      async () => (full = await render(h(React.Profiler, { id: 'list', onRender }, h(FullList, { messages })))),
+      { heap: true }
+    );
+    results.push({ ...fullMount, rows: full.container.querySelectorAll('[data-key]').length });
+    await full.unmount();
+  }
+  return results;
+};
+
+if (isMain(import.meta.url)) {
+  const results = await run();
+  printResults(results);
+  const ms = (/** @type {unknown} */ value) => (value === undefined ? '' : Number(value).toFixed(2));
+  console.table(
+    results.map(({ name, commitMs, commitP50Ms, commitP99Ms }) => ({
+      name,
+      'commit ms': ms(commitMs),
+      'commit p50 ms': ms(commitP50Ms),
+      'commit p99 ms': ms(commitP99Ms)
+    }))
+  );
+}
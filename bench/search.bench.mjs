@@ -0,0 +1,96 @@
+// @ts-check
+// Chat search at 100k messages. Indexes a history of JEE-style doubts in the
+// search worker (run under worker_threads), then times queries from send to
+// answer: single words, phrases, search-as-you-type prefixes, author and
+// date filters. Then removes 30% of the history, which compacts the index,
+// and times the same queries again. The target is p99 under 50 ms.
+//
+//   node bench/search.bench.mjs [messages]
+import { startSearchWorker } from '../test/support/search-worker.mjs';
+import { isMain, measure, percentile, printResults } from './support/measure.mjs';
+
+const TARGET_MS = 50;
+const BATCH = 500;
+const AUTHORS = 2000;
+const SUBJECTS = ['kinematics', 'projectile', 'thermodynamics', 'entropy', 'stoichiometry', 'mole', 'integration', 'matrices', 'x²', 'h2so4'];
+const FILLER = ['doubt', 'question', 'help', 'please', 'explain', 'solution', 'pyq', 'chapter', 'formula', 'mistake'];
+const QUERIES = [
+  { text: 'doubt' },
+  { text: 'projectile solution' },
+  { text: 'kinematics doubt explain' },
+  { text: 'thermo', prefix: true },
+  { text: 'entropy for', prefix: true },
+  { text: 'x^2' },
+  { text: 'question', author: 'student7' },
+  { text: 'mole', from: 1000 + 40000, to: 1000 + 60000 }
+];
+const ROUNDS = 25;
+
+/** @param {number} i */
+const message = i => {
+  const author = `student${(i * 7919) % AUTHORS}`;
+  return {
+    id: String(i).padStart(8, '0'),
+    name: author,
+    author,
+    text: `${FILLER[i % FILLER.length]} on ${SUBJECTS[(i * 31) % SUBJECTS.length]} ${FILLER[(i * 13) % FILLER.length]} #${i}`,
+    time: 1000 + i
+  };
+};
+
+/**
+ * @param {ReturnType<typeof startSearchWorker>} worker
+ * @param {string} name
+ */
+const timeQueries = async (worker, name) => {
+  /** @type {number[]} */
+  const latencies = [];
+  const result = await measure(name, ROUNDS * QUERIES.length, async () => {
+    for (let round = 0; round < ROUNDS; round++) {
+      for (const query of QUERIES) {
+        const start = performance.now();
+        await worker.query(query);
+        latencies.push(performance.now() - start);
+      }
+    }
+  });
+  latencies.sort((a, b) => a - b);
+  return { ...result, p50Ms: percentile(latencies, 0.5), p99Ms: percentile(latencies, 0.99), maxMs: latencies[latencies.length - 1] };
+};
+
+export const run = async (messages = 100000) => {
+  const worker = startSearchWorker();
+  const history = Array.from({ length: messages }, (_, i) => message(i));
+  const results = [];
+
+  // The app backfills in batches of 500, too
+  results.push(
+    await measure(`index-${messages}`, messages, async () => {
+      for (let i = 0; i < messages; i += BATCH) worker.add(history.slice(i, i + BATCH));
+      await worker.query({ text: 'doubt', limit: 1 });
+    })
+  );
+  results.push(await timeQueries(worker, `query-${messages}`));
+
+  const removed = history.filter((_, i) => i % 10 < 3).map(doc => doc.id);
+  results.push(
+    await measure(`remove-${removed.length}`, removed.length, async () => {
+      for (let i = 0; i < removed.length; i += BATCH) worker.remove(removed.slice(i, i + BATCH));
+      await worker.query({ text: 'doubt', limit: 1 });
+    })
+  );
+  results.push(await timeQueries(worker, `query-after-compaction`));
+
+  await worker.close();
+  return results;
+};
+
+if (isMain(import.meta.url)) {
+  const results = await run(Number(process.argv[2] ?? 100000));
+  printResults(results);
+  for (const { name, p50Ms, p99Ms, maxMs } of results.filter(result => result.p99Ms !== undefined)) {
+    const ms = (/** @type {unknown} */ value) => `${Number(value).toFixed(1)} ms`;
+    const verdict = Number(p99Ms) < TARGET_MS ? 'under' : 'OVER';
+    console.log(`${name}: p50 ${ms(p50Ms)}, p99 ${ms(p99Ms)}, max ${ms(maxMs)} (${verdict} ${TARGET_MS} ms)`);
+  }
+}
@@ -0,0 +1,80 @@
+// @ts-check
+// Bare protocol clients for benches against server/index.mjs: each says
+// hello, then counts what it receives. Much lighter than the app's own
+// transport, so thousands fit in one process.
+import WebSocket from 'ws';
+
+/**
+ * @typedef {{ id: string, name: string, text: string, channel: string }} ReceivedMessage
+ * @typedef {{ clientId: string, id: string, rejected?: string }} ReceivedAck
+ * @typedef {{
+ *   socket: WebSocket,
+ *   received: number,
+ *   bytes: number,
+ *   send: (text: string, channel?: string) => string
+ * }} ChatClient
+ */
+
+/**
+ * Resolves once the socket is open and hello has been sent
+ * @param {string} url
+ * @param {string} name
+ * @param {{
+ *   channels?: string[],
+ *   onMessage?: (message: ReceivedMessage, receivedAt: number) => void,
+ *   onAck?: (ack: ReceivedAck, receivedAt: number) => void
+ * }} [options]
+ * @returns {Promise<ChatClient>}
+ */
+export const connectChatClient = (url, name, { channels = ['general'], onMessage, onAck } = {}) =>
+  new Promise((resolve, reject) => {
+    const socket = new WebSocket(url);
+    let sent = 0;
+    /** @type {ChatClient} */
+    const client = {
+      socket,
+      received: 0,
+      bytes: 0,
+      send: (text, channel = 'general') => {
+        const clientId = `${name}-${sent++}`;
+        const message = { id: clientId, clientId, name, text, timestamp: Date.now(), channel };
+        socket.send(JSON.stringify({ type: 'messages', messages: [message] }));
+        return clientId;
+      }
+    };
+    socket.on('open', () => {
+      socket.send(JSON.stringify({ type: 'hello', name, resumeAfter: null, channels }));
+      resolve(client);
+    });
+    socket.on('error', reject);
+    socket.on('message', raw => {
+      const receivedAt = performance.now();
+      const frame = String(raw);
+      client.bytes += frame.length;
+      const data = JSON.parse(frame);
+      if (data.type === 'messages') {
+        client.received += data.messages.length;
+        if (onMessage) data.messages.forEach((/** @type {ReceivedMessage} */ message) => onMessage(message, receivedAt));
+      } else if (data.type === 'acks' && onAck) {
+        data.acks.forEach((/** @type {ReceivedAck} */ ack) => onAck(ack, receivedAt));
+      }
+    });
+  });
+
+/**
+ * Connects clients a batch at a time, so the server isn't sent thousands of
+ * handshakes at once
+ * @param {number} count
+ * @param {(index: number) => Promise<ChatClient>} connect
+ */
+export const connectMany = async (count, connect, batchSize = 250) => {
+  /** @type {ChatClient[]} */
+  const clients = [];
+  for (let i = 0; i < count; i += batchSize) {
+    clients.push(...(await Promise.all(Array.from({ length: Math.min(batchSize, count - i) }, (_, j) => connect(i + j)))));
+  }
+  return clients;
+};
+
+/** @param {number} ms */
+export const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
@@ -0,0 +1,119 @@
+// @ts-check
+// Shared by the bench/ scripts. Each script exports run(), resolving with
+// BenchmarkResult rows, and prints them when executed directly. Heap figures
+// are only meaningful with `node --expose-gc`, which lets them collect
+// before reading.
+import { mkdir, readFile, writeFile } from 'node:fs/promises';
+import { fileURLToPath, pathToFileURL } from 'node:url';
+
+/**
+ * @typedef {{
+ *   name: string,
+ *   ops: number,
+ *   totalMs: number,
+ *   usPerOp: number,
+ *   heapDeltaBytes?: number,
+ *   [detail: string]: unknown
+ * }} BenchmarkResult
+ */
+
+/** Heap in use after a full collection, when gc is exposed */
+export const heapUsed = () => {
+  /** @type {{ gc?: () => void }} */ (globalThis).gc?.();
+  return process.memoryUsage().heapUsed;
+};
+
+/**
+ * Times run() once; with `heap`, also how much of what it returns stays alive
+ * @param {string} name
+ * @param {number} ops
+ * @param {() => unknown} run
+ * @param {{ heap?: boolean }} [options]
+ * @returns {Promise<BenchmarkResult>}
+ */
+export const measure = async (name, ops, run, { heap = false } = {}) => {
+  const before = heap ? heapUsed() : 0;
+  const start = performance.now();
+  const retained = [await run()];
+  const totalMs = performance.now() - start;
+  /** @type {BenchmarkResult} */
+  const result = { name, ops, totalMs, usPerOp: (totalMs * 1000) / ops };
+  if (heap) result.heapDeltaBytes = heapUsed() - before;
+  retained.length = 0;
+  return result;
+};
+
+/**
+ * @param {number[]} sorted ascending
+ * @param {number} q between 0 and 1
+ */
+export const percentile = (sorted, q) => sorted[Math.min(sorted.length - 1, Math.floor(q * sorted.length))];
+
+/**
+ * @typedef {{ name: string, baselineUsPerOp: number, usPerOp: number, change: number }} BenchmarkRegression
+ *   change is the fractional slowdown, e.g. 0.2 for 20% slower
+ */
+
+/**
+ * Results that got slower than the baseline by more than threshold; names
+ * missing from the baseline are skipped
+ * @param {BenchmarkResult[]} results
+ * @param {BenchmarkResult[]} baseline
+ * @param {number} threshold
+ * @returns {BenchmarkRegression[]}
+ */
+export const compareResults = (results, baseline, threshold) =>
+  results.flatMap(result => {
+    const base = baseline.find(entry => entry.name === result.name);
+    if (!base) return [];
+    const change = result.usPerOp / base.usPerOp - 1;
+    return change > threshold ? [{ name: result.name, baselineUsPerOp: base.usPerOp, usPerOp: result.usPerOp, change }] : [];
+  });
+
+/**
+ * @param {string | URL} file
+ * @returns {Promise<BenchmarkResult[] | undefined>} undefined when there is no baseline yet
+ */
+export const readBaseline = async file => {
+  try {
+    return JSON.parse(await readFile(file, 'utf8')).results;
+  } catch (error) {
+    if (/** @type {NodeJS.ErrnoException} */ (error).code === 'ENOENT') return undefined;
+    throw error;
+  }
+};
+
+/**
+ * Writes results as JSON, in the same shape as a baseline
+ * @param {string | URL} file
+ * @param {BenchmarkResult[]} results
+ */
+export const writeResults = async (file, results) => {
+  await mkdir(new URL('.', file instanceof URL ? file : pathToFileURL(file)), { recursive: true });
+  await writeFile(file, `${JSON.stringify({ createdAt: new Date().toISOString(), results }, null, 2)}\n`);
+};
+
+/**
+ * @param {string | URL} file
+ * @param {BenchmarkResult[]} results
+ */
+export const writeBaseline = writeResults;
+
+/** @param {BenchmarkResult[]} results */
+export const printResults = results => {
+  console.table(
+    results.map(({ name, ops, totalMs, usPerOp, heapDeltaBytes }) => ({
+      name,
+      ops,
+      'total ms': Number(totalMs.toFixed(1)),
+      'µs/op': Number(usPerOp.toFixed(3)),
+      'heap KB': heapDeltaBytes === undefined ? '' : Math.round(heapDeltaBytes / 1024)
+    }))
+  );
+};
+
+/**
+ * True when the module at url is the script node was started with
+ * @param {string} url
+ */
+export const isMain = url => process.argv[1] === fileURLToPath(url);
@@ -0,0 +1,21 @@
+// @ts-check
+// Stages for bench/moderation.bench.mjs, in their own module so worker
+// threads can build them too. The classifier stands in for a local model:
+// ~2ms of synchronous CPU per message, which an in-process pool can only run
+// one at a time.
+import { createClassifierStage, createLexicalStage, scoreSpam } from '../../shared/moderation-pipeline.mjs';
+
+/** @param {number} ms */
+const spin = ms => {
+  const until = performance.now() + ms;
+  while (performance.now() < until);
+};
+
+/** @param {{ classifierMs?: number }} [options] */
+export const createBenchStages = ({ classifierMs = 2 } = {}) => [
+  createLexicalStage(),
+  createClassifierStage(text => {
+    spin(classifierMs);
+    return scoreSpam(text);
+  })
+];
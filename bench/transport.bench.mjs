@@ -0,0 +1,87 @@
+// @ts-check
+// Delivery latency through the chat server with 5k connected clients. Every
+// client says hello and stays subscribed to the general channel; each round
+// a handful of different clients send one message (so the flood guard never
+// throttles), and every client records how long each message took from send
+// to arrival. Clients and server share this process and its clock, so the
+// figures include the clients' own parsing and, on few cores, queueing
+// behind each other; treat them as an upper bound.
+//
+//   npm install && node bench/transport.bench.mjs [clients]
+import { startServer } from '../server/index.mjs';
+import { connectChatClient, connectMany, sleep } from './support/chat-clients.mjs';
+import { isMain, measure, percentile, printResults } from './support/measure.mjs';
+
+const ROUND_MS = 200;
+
+export const run = async (clients = 5000, rounds = 20, sendersPerRound = 10) => {
+  const server = await startServer();
+  const url = `ws://127.0.0.1:${server.port}/chat`;
+  /** @type {number[]} */
+  const delivered = [];
+  /** @type {number[]} */
+  const acked = [];
+  /** @type {Map<string, number>} */
+  const sentAt = new Map();
+  /** @type {import('./support/chat-clients.mjs').ChatClient[]} */
+  let connected = [];
+
+  const connect = await measure(`connect-${clients}`, clients, async () => {
+    connected = await connectMany(clients, i =>
+      connectChatClient(url, `student${i}`, {
+        onMessage: (message, receivedAt) => {
+          if (message.text.startsWith('t=')) delivered.push(receivedAt - Number(message.text.slice(2)));
+        },
+        onAck: (ack, receivedAt) => {
+          const start = sentAt.get(ack.clientId);
+          if (start !== undefined) acked.push(receivedAt - start);
+        }
+      })
+    );
+  });
+  // Let the hello replies and first presence broadcast drain
+  await sleep(1500);
+
+  // The sender's own connection gets an ack instead of a copy
+  const messages = rounds * sendersPerRound;
+  const expected = messages * (clients - 1);
+  const deliver = await measure(`deliver-${messages}-to-${clients}`, expected, async () => {
+    for (let round = 0; round < rounds; round++) {
+      for (let j = 0; j < sendersPerRound; j++) {
+        const now = performance.now();
+        sentAt.set(connected[(round * sendersPerRound + j) % clients].send(`t=${now}`), now);
+      }
+      await sleep(ROUND_MS);
+    }
+    // Wait for stragglers, up to a few seconds
+    for (let waited = 0; delivered.length < expected && waited < 5000; waited += 100) await sleep(100);
+  });
+
+  connected.forEach(client => client.socket.terminate());
+  await server.close();
+
+  delivered.sort((a, b) => a - b);
+  acked.sort((a, b) => a - b);
+  return [
+    connect,
+    {
+      ...deliver,
+      delivered: delivered.length,
+      expected,
+      p50Ms: percentile(delivered, 0.5),
+      p99Ms: percentile(delivered, 0.99),
+      ackP50Ms: percentile(acked, 0.5),
+      ackP99Ms: percentile(acked, 0.99)
+    }
+  ];
+};
+
+if (isMain(import.meta.url)) {
+  const results = await run(Number(process.argv[2] ?? 5000));
+  printResults(results);
+  const { delivered, expected, p50Ms, p99Ms, ackP50Ms, ackP99Ms } = results[1];
+  const ms = (/** @type {unknown} */ value) => `${Number(value).toFixed(1)} ms`;
+  console.log(`delivered ${delivered}/${expected}`);
+  console.log(`delivery p50 ${ms(p50Ms)}, p99 ${ms(p99Ms)}`);
+  console.log(`ack p50 ${ms(ackP50Ms)}, p99 ${ms(ackP99Ms)}`);
+}
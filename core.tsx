@@ -0,0 +1,203 @@
+// Runtime shared by Prep.py and the lazily loaded ui/ modules: channel names,
+// rate windows, the store, telemetry and file saving. It imports nothing
+// from either, so the ui/ chunks never reach back into the app's entry.
+import { useSyncExternalStore } from 'react';
+
+// Each study group is its own channel
+export const groupChannel = (groupId: number | string) => `group:${groupId}`;
+
+// Rate windows
+// Message and flag rates for the admin panel, kept as a ring of 5-second
+// buckets covering one minute.
+export const RATE_BUCKET_MS = 5000;
+const RATE_BUCKETS = 12;
+
+export interface RateWindow {
+  latest: number;
+  counts: number[];
+}
+
+export const emptyRateWindow = (): RateWindow => ({ latest: 0, counts: new Array(RATE_BUCKETS).fill(0) });
+
+export const recordRate = (rate: RateWindow, at: number, count = 1): RateWindow => {
+  const bucket = Math.floor(at / RATE_BUCKET_MS);
+  if (bucket <= rate.latest - RATE_BUCKETS) return rate;
+  const counts = rate.counts.slice();
+  // Zero the buckets that rolled out of the window since the last event
+  for (let b = Math.max(rate.latest + 1, bucket - RATE_BUCKETS + 1); b <= bucket; b++) counts[b % RATE_BUCKETS] = 0;
+  counts[bucket % RATE_BUCKETS] += count;
+  return { latest: Math.max(rate.latest, bucket), counts };
+};
+
+export const ratePerMinute = (rate: RateWindow, now: number) => {
+  const current = Math.floor(now / RATE_BUCKET_MS);
+  let total = 0;
+  for (let b = Math.max(current - RATE_BUCKETS + 1, rate.latest - RATE_BUCKETS + 1); b <= Math.min(current, rate.latest); b++) {
+    total += rate.counts[b % RATE_BUCKETS];
+  }
+  return total;
+};
+
+// Store
+export interface Store<S, A> {
+  getState: () => S;
+  dispatch: (action: A) => void;
+  subscribe: (listener: () => void) => () => void;
+}
+
+export const createStore = <S, A>(reducer: (state: S, action: A) => S, initialState: S): Store<S, A> => {
+  let state = initialState;
+  const listeners = new Set<() => void>();
+  return {
+    getState: () => state,
+    dispatch: (action: A) => {
+      const next = reducer(state, action);
+      if (next === state) return;
+      state = next;
+      listeners.forEach(listener => listener());
+    },
+    subscribe: (listener: () => void) => {
+      listeners.add(listener);
+      return () => {
+        listeners.delete(listener);
+      };
+    }
+  };
+};
+
+// Re-renders only when the selected value changes; selectors must return
+// existing references or primitives
+export const useStoreSelector = <S, A, T>(store: Store<S, A>, selector: (state: S) => T) =>
+  useSyncExternalStore(store.subscribe, () => selector(store.getState()));
+
+// Performance telemetry
+// Spans, render timings, long tasks and dropped frames go into a fixed-size
+// ring buffer that admins can inspect and download. Off by default; while
+// off, or when a span isn't sampled, begin() is a single comparison and
+// end() returns immediately, so instrumented paths cost next to nothing.
+const TELEMETRY_CAPACITY = 1000;
+const FRAME_BUDGET_MS = 1000 / 60;
+const FRAME_DROP_THRESHOLD_MS = 50;
+// Longer gaps mean the tab was hidden, not that frames were dropped
+const FRAME_GAP_HIDDEN_MS = 1000;
+
+export interface TelemetryEntry {
+  name: string;
+  // performance.now() timebase
+  start: number;
+  duration: number;
+  detail?: string;
+}
+
+class Telemetry {
+  sampleRate = 0;
+  private entries: TelemetryEntry[] = [];
+  private next = 0;
+  private longTaskObserver: PerformanceObserver | null = null;
+  private frameRequest = 0;
+  private lastFrame = 0;
+
+  setSampleRate(rate: number) {
+    this.sampleRate = rate;
+    if (rate > 0) {
+      this.startObservers();
+    } else {
+      this.stopObservers();
+    }
+  }
+
+  // Returns -1 when the span is not sampled
+  begin() {
+    return this.sampled() ? performance.now() : -1;
+  }
+
+  // Also emits a User Timing measure so spans line up in DevTools traces
+  end(name: string, start: number, detail?: string) {
+    if (start < 0) return;
+    const end = performance.now();
+    performance.measure(name, { start, end });
+    performance.clearMeasures(name);
+    this.record({ name, start, duration: end - start, detail });
+  }
+
+  // React.Profiler onRender callback
+  onRender = (id: string, phase: string, actualDuration: number, baseDuration: number, startTime: number) => {
+    if (!this.sampled()) return;
+    this.record({ name: `render:${id}`, start: startTime, duration: actualDuration, detail: phase });
+  };
+
+  // Oldest first
+  snapshot() {
+    return [...this.entries.slice(this.next), ...this.entries.slice(0, this.next)];
+  }
+
+  clear() {
+    this.entries = [];
+    this.next = 0;
+  }
+
+  private sampled() {
+    return this.sampleRate > 0 && Math.random() < this.sampleRate;
+  }
+
+  private record(entry: TelemetryEntry) {
+    if (this.entries.length < TELEMETRY_CAPACITY) {
+      this.entries.push(entry);
+    } else {
+      this.entries[this.next] = entry;
+    }
+    this.next = (this.next + 1) % TELEMETRY_CAPACITY;
+  }
+
+  // Long tasks and frame gaps are rare and always recorded while enabled
+  private startObservers() {
+    if (
+      !this.longTaskObserver &&
+      typeof PerformanceObserver !== 'undefined' &&
+      PerformanceObserver.supportedEntryTypes?.includes('longtask')
+    ) {
+      this.longTaskObserver = new PerformanceObserver(list => {
+        list.getEntries().forEach(entry => {
+          this.record({ name: 'longtask', start: entry.startTime, duration: entry.duration });
+        });
+      });
+      this.longTaskObserver.observe({ type: 'longtask' });
+    }
+    if (!this.frameRequest && typeof requestAnimationFrame === 'function') {
+      this.lastFrame = performance.now();
+      const tick = (now: number) => {
+        const gap = now - this.lastFrame;
+        if (gap > FRAME_DROP_THRESHOLD_MS && gap < FRAME_GAP_HIDDEN_MS) {
+          this.record({
+            name: 'frame-drop',
+            start: this.lastFrame,
+            duration: gap,
+            detail: `${Math.round(gap / FRAME_BUDGET_MS) - 1} frames`
+          });
+        }
+        this.lastFrame = now;
+        this.frameRequest = requestAnimationFrame(tick);
+      };
+      this.frameRequest = requestAnimationFrame(tick);
+    }
+  }
+
+  private stopObservers() {
+    this.longTaskObserver?.disconnect();
+    this.longTaskObserver = null;
+    if (this.frameRequest) cancelAnimationFrame(this.frameRequest);
+    this.frameRequest = 0;
+  }
+}
+
+export const telemetry = new Telemetry();
+
+// Offers blob as a file download
+export const saveBlob = (fileName: string, blob: Blob) => {
+  const url = URL.createObjectURL(blob);
+  const link = document.createElement('a');
+  link.href = url;
+  link.download = fileName;
+  link.click();
+  setTimeout(() => URL.revokeObjectURL(url), 0);
+};
@@ -0,0 +1,112 @@
+// @ts-check
+// Blob server
+// A stand-in for the production blob store that speaks the app's resumable
+// upload protocol (shared/blobs.mjs). Blobs live in memory under their hex
+// SHA-256:
+//   HEAD  /blobs/:hash  200 when complete, else 404 with Upload-Offset
+//   PATCH /blobs/:hash  appends the body at Upload-Offset (of Upload-Length
+//                       in all); 409 with the current offset on a mismatch
+//   GET   /blobs/:hash  the blob, cacheable for good
+// A completed upload whose bytes don't hash to its address is dropped.
+import { createHash } from 'node:crypto';
+import { BLOB_BASE_URL } from '../shared/blobs.mjs';
+
+export const BLOB_PATH = BLOB_BASE_URL;
+const MAX_BLOB_BYTES = 20 * 1024 * 1024;
+const HASH_PATTERN = /^[0-9a-f]{64}$/;
+
+/**
+ * @typedef {{ length: number, chunks: Buffer[], offset: number, complete: boolean }} StoredBlob
+ */
+
+export class BlobServer {
+  /** @type {Map<string, StoredBlob>} */
+  #blobs = new Map();
+  // Upload body bytes taken in, for tests and benches
+  bytesReceived = 0;
+
+  /**
+   * Handles requests under BLOB_PATH; false for anything else
+   * @param {import('node:http').IncomingMessage} request
+   * @param {import('node:http').ServerResponse} response
+   */
+  handle(request, response) {
+    const { pathname } = new URL(request.url ?? '/', 'http://localhost');
+    if (!pathname.startsWith(`${BLOB_PATH}/`)) return false;
+    const hash = pathname.slice(BLOB_PATH.length + 1);
+    if (!HASH_PATTERN.test(hash)) {
+      response.writeHead(404).end();
+    } else if (request.method === 'HEAD' || request.method === 'GET') {
+      this.#read(hash, request.method === 'GET', response);
+    } else if (request.method === 'PATCH') {
+      this.#append(hash, request, response).catch(() => response.writeHead(400).end());
+    } else {
+      response.writeHead(405, { Allow: 'GET, HEAD, PATCH' }).end();
+    }
+    return true;
+  }
+
+  /**
+   * @param {string} hash
+   * @param {boolean} withBody
+   * @param {import('node:http').ServerResponse} response
+   */
+  #read(hash, withBody, response) {
+    const blob = this.#blobs.get(hash);
+    if (!blob?.complete) {
+      response.writeHead(404, { 'Upload-Offset': String(blob?.offset ?? 0) }).end();
+      return;
+    }
+    response.writeHead(200, {
+      'Content-Type': 'application/octet-stream',
+      'Content-Length': String(blob.length),
+      // Content-addressed, so it never changes
+      'Cache-Control': 'public, max-age=31536000, immutable'
+    });
+    response.end(withBody ? blob.chunks[0] : undefined);
+  }
+
+  /**
+   * @param {string} hash
+   * @param {import('node:http').IncomingMessage} request
+   * @param {import('node:http').ServerResponse} response
+   */
+  async #append(hash, request, response) {
+    const offset = Number(request.headers['upload-offset']);
+    const length = Number(request.headers['upload-length']);
+    if (!Number.isInteger(offset) || !Number.isInteger(length) || length < 0 || length > MAX_BLOB_BYTES) {
+      request.resume();
+      response.writeHead(400).end();
+      return;
+    }
+    let blob = this.#blobs.get(hash);
+    if (!blob) {
+      blob = { length, chunks: [], offset: 0, complete: false };
+      this.#blobs.set(hash, blob);
+    }
+    if (blob.complete || offset !== blob.offset || length !== blob.length) {
+      request.resume();
+      response.writeHead(409, { 'Upload-Offset': String(blob.offset) }).end();
+      return;
+    }
+    // Taken as far as it got, so a dropped request resumes from there
+    for await (const chunk of request) {
+      const room = blob.length - blob.offset;
+      const part = chunk.length > room ? chunk.subarray(0, room) : chunk;
+      blob.chunks.push(part);
+      blob.offset += part.length;
+      this.bytesReceived += chunk.length;
+    }
+    if (blob.offset === blob.length) {
+      const bytes = Buffer.concat(blob.chunks);
+      if (createHash('sha256').update(bytes).digest('hex') !== hash) {
+        this.#blobs.delete(hash);
+        response.writeHead(400, { 'Upload-Offset': '0' }).end();
+        return;
+      }
+      blob.chunks = [bytes];
+      blob.complete = true;
+    }
+    response.writeHead(204, { 'Upload-Offset': String(blob.offset) }).end();
+  }
+}
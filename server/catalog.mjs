@@ -0,0 +1,215 @@
+// @ts-check
+// Catalog server
+// A stand-in for the production resource catalog (shared/catalog.mjs is the
+// client), generated rather than stored: 10k PYQ papers, NCERT solutions and
+// formula sheets across the three subjects.
+//   GET /catalog?limit&subject&year&type&cursor
+//       { items, total, nextCursor } for the filtered catalog, newest papers
+//       first; with an ETag of the body and Cache-Control max-age and
+//       stale-while-revalidate, and 304 when If-None-Match still matches
+//   GET /resources/:id/:file
+//       the resource's file, filler bytes of its sizeBytes, written in chunks
+import { createHash } from 'node:crypto';
+import { Readable } from 'node:stream';
+import { pipeline } from 'node:stream/promises';
+import { CATALOG_BASE_URL, FIRST_EXAM_YEAR, RESOURCE_SUBJECTS, RESOURCE_TYPES } from '../shared/catalog.mjs';
+
+export const CATALOG_PATH = CATALOG_BASE_URL;
+export const RESOURCE_PATH = '/resources';
+const CATALOG_ITEMS = 10000;
+const MAX_PAGE_SIZE = 100;
+const FILE_CHUNK_BYTES = 64 * 1024;
+
+/** @typedef {import('../shared/catalog.mjs').JeeResource} JeeResource */
+/** @typedef {import('../shared/catalog.mjs').ResourceSubject} ResourceSubject */
+/** @typedef {import('../shared/catalog.mjs').ResourceType} ResourceType */
+
+/**
+ * @typedef {object} CatalogServerOptions
+ * @property {number} [items] catalog size
+ * @property {number} [maxAgeS] Cache-Control max-age
+ * @property {number} [staleS] Cache-Control stale-while-revalidate
+ */
+
+const SUBJECTS = /** @type {ResourceSubject[]} */ (Object.keys(RESOURCE_SUBJECTS));
+const TYPES = /** @type {ResourceType[]} */ (Object.keys(RESOURCE_TYPES));
+const LAST_EXAM_YEAR = new Date().getFullYear();
+
+/** @param {string} text */
+const slug = text => text.toLowerCase().replace(/[^a-z0-9]+/g, '-').replace(/^-|-$/g, '');
+
+/**
+ * The same catalog on every start, so cursors and ETags survive restarts
+ * @param {number} id
+ * @returns {JeeResource}
+ */
+const makeResource = id => {
+  const subject = SUBJECTS[id % SUBJECTS.length];
+  const type = TYPES[Math.floor(id / SUBJECTS.length) % TYPES.length];
+  const series = Math.floor(id / (SUBJECTS.length * TYPES.length));
+  const label = RESOURCE_SUBJECTS[subject];
+  /** @type {number | undefined} */
+  let year;
+  let title;
+  let description;
+  if (type === 'pyq') {
+    year = LAST_EXAM_YEAR - (series % (LAST_EXAM_YEAR - FIRST_EXAM_YEAR + 1));
+    title = `JEE ${year} ${label} paper ${Math.floor(series / 32) + 1}`;
+    description = `${label} questions from a ${year} shift, with an answer key and worked solutions.`;
+  } else if (type === 'ncert') {
+    title = `NCERT Class ${11 + (series % 2)} ${label}, chapter ${(Math.floor(series / 2) % 15) + 1} set ${Math.floor(series / 30) + 1}`;
+    description = `Step-by-step solutions to the in-text and exercise questions.`;
+  } else {
+    title = `${label} formula sheet ${series + 1}`;
+    description = `Every formula for one ${label.toLowerCase()} topic on two pages, with units and common traps.`;
+  }
+  return {
+    id,
+    title,
+    url: `${RESOURCE_PATH}/${id}/${slug(title)}.pdf`,
+    description,
+    subject,
+    type,
+    ...(year ? { year } : {}),
+    // 100 KB to about 4 MB
+    sizeBytes: 100 * 1024 + ((id * 7919) % (4 * 1024 * 1024))
+  };
+};
+
+// Offsets into the filtered list, opaque to clients
+/** @param {number} offset */
+const encodeCursor = offset => Buffer.from(`o:${offset}`).toString('base64url');
+/** @param {string} cursor */
+const decodeCursor = cursor => {
+  const match = Buffer.from(cursor, 'base64url').toString().match(/^o:(\d+)$/);
+  return match ? Number(match[1]) : undefined;
+};
+
+/**
+ * @param {string | undefined} header
+ * @param {string} etag
+ */
+const etagMatches = (header, etag) =>
+  !!header && (header.trim() === '*' || header.split(',').some(tag => tag.trim().replace(/^W\//, '') === etag));
+
+export class CatalogServer {
+  /** @type {JeeResource[]} */
+  #items;
+  #cacheControl;
+  // Catalog requests, and those answered 304, for tests and benches
+  requests = 0;
+  notModified = 0;
+
+  /** @param {CatalogServerOptions} [options] */
+  constructor({ items = CATALOG_ITEMS, maxAgeS = 60, staleS = 600 } = {}) {
+    this.#items = Array.from({ length: items }, (_, id) => makeResource(id)).sort(
+      (a, b) => (b.year ?? 0) - (a.year ?? 0) || a.id - b.id
+    );
+    this.#cacheControl = `public, max-age=${maxAgeS}, stale-while-revalidate=${staleS}`;
+  }
+
+  /**
+   * Edits a resource in place, as a catalog correction would
+   * @param {number} id
+   * @param {Partial<Omit<JeeResource, 'id'>>} changes
+   */
+  update(id, changes) {
+    const item = this.#items.find(resource => resource.id === id);
+    if (!item) throw new Error(`No resource ${id}`);
+    Object.assign(item, changes);
+  }
+
+  /**
+   * Handles requests under CATALOG_PATH and RESOURCE_PATH; false for
+   * anything else
+   * @param {import('node:http').IncomingMessage} request
+   * @param {import('node:http').ServerResponse} response
+   */
+  handle(request, response) {
+    const url = new URL(request.url ?? '/', 'http://localhost');
+    const isCatalog = url.pathname === CATALOG_PATH;
+    if (!isCatalog && !url.pathname.startsWith(`${RESOURCE_PATH}/`)) return false;
+    if (request.method !== 'GET' && request.method !== 'HEAD') {
+      response.writeHead(405, { Allow: 'GET, HEAD' }).end();
+    } else if (isCatalog) {
+      this.#page(url.searchParams, request, response);
+    } else {
+      this.#file(url.pathname, request.method === 'GET', response).catch(() => response.destroy());
+    }
+    return true;
+  }
+
+  /**
+   * @param {URLSearchParams} params
+   * @param {import('node:http').IncomingMessage} request
+   * @param {import('node:http').ServerResponse} response
+   */
+  #page(params, request, response) {
+    this.requests++;
+    const limit = Math.min(MAX_PAGE_SIZE, Math.max(1, Number(params.get('limit')) || MAX_PAGE_SIZE));
+    const cursor = params.get('cursor');
+    const offset = cursor ? decodeCursor(cursor) : 0;
+    if (offset === undefined) {
+      response.writeHead(400, { 'Content-Type': 'application/json' }).end(JSON.stringify({ error: 'Bad cursor' }));
+      return;
+    }
+    const subject = params.get('subject');
+    const type = params.get('type');
+    const year = Number(params.get('year')) || undefined;
+    const matches = this.#items.filter(
+      item => (!subject || item.subject === subject) && (!type || item.type === type) && (!year || item.year === year)
+    );
+    const end = offset + limit;
+    const body = JSON.stringify({
+      items: matches.slice(offset, end),
+      total: matches.length,
+      nextCursor: end < matches.length ? encodeCursor(end) : null
+    });
+    const etag = `"${createHash('sha1').update(body).digest('base64url')}"`;
+    const headers = { ETag: etag, 'Cache-Control': this.#cacheControl };
+    if (etagMatches(request.headers['if-none-match'], etag)) {
+      this.notModified++;
+      response.writeHead(304, headers).end();
+      return;
+    }
+    response.writeHead(200, {
+      ...headers,
+      'Content-Type': 'application/json',
+      'Content-Length': String(Buffer.byteLength(body))
+    });
+    response.end(request.method === 'GET' ? body : undefined);
+  }
+
+  /**
+   * @param {string} pathname
+   * @param {boolean} withBody
+   * @param {import('node:http').ServerResponse} response
+   */
+  async #file(pathname, withBody, response) {
+    const [, id, file] = pathname.slice(RESOURCE_PATH.length).split('/');
+    const item = this.#items.find(resource => String(resource.id) === id);
+    if (!item || item.url !== `${RESOURCE_PATH}/${id}/${file}`) {
+      response.writeHead(404).end();
+      return;
+    }
+    const size = item.sizeBytes ?? 0;
+    response.writeHead(200, {
+      'Content-Type': 'application/pdf',
+      'Content-Length': String(size),
+      'Cache-Control': 'public, max-age=86400'
+    });
+    if (!withBody) {
+      response.end();
+      return;
+    }
+    // Written a chunk at a time with backpressure, so clients see the body
+    // arrive in parts as they would over a real network
+    const chunk = Buffer.alloc(FILE_CHUNK_BYTES, `%PDF-1.4 ${item.title}\n`);
+    const parts = function* () {
+      for (let sent = 0; sent < size; sent += chunk.length) {
+        yield size - sent < chunk.length ? chunk.subarray(0, size - sent) : chunk;
+      }
+    };
+    await pipeline(Readable.from(parts()), response);
+  }
+}
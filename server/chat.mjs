@@ -0,0 +1,446 @@
+// @ts-check
+// Chat server
+// A stand-in for the production chat service that speaks the app's wire
+// protocol: hello, batched messages and acks, presence and group membership.
+// It assigns ids with shared/ids.mjs and runs the same flood guard, presence
+// tracker and moderation pipeline, so the client, tests and benches talk to
+// real server logic. Outgoing messages are fanned out once per event-loop
+// turn, one frame per client, serialized once per distinct channel set.
+import { WebSocketServer } from 'ws';
+import { FloodGuard, normalizeUserName } from '../shared/flood.mjs';
+import { createIdGenerator } from '../shared/ids.mjs';
+import { createModerationPipeline } from '../shared/moderation-pipeline.mjs';
+import { PRESENCE_BROADCAST_MS, PresenceTracker } from '../shared/presence.mjs';
+
+export const CHAT_PATH = '/chat';
+const GENERAL_CHANNEL = 'general';
+// Kept for clients resuming after a reconnect
+const HISTORY_LIMIT = 10000;
+// Sent on a first connect, when the client has nothing to resume from
+const HISTORY_ON_CONNECT = 50;
+// Remembered acks, so re-sent messages are acked again instead of reposted
+const ACK_MEMORY = 100000;
+
+/** @param {number | string} groupId */
+const groupChannel = groupId => `group:${groupId}`;
+
+/**
+ * @typedef {{ thumbnail: string, display: string }} ImageRefs
+ * @typedef {{
+ *   id: string,
+ *   name: string,
+ *   text: string,
+ *   timestamp: number,
+ *   channel: string,
+ *   isFlagged?: boolean,
+ *   image?: ImageRefs,
+ *   clientId?: string
+ * }} WireMessage
+ * @typedef {{
+ *   clientId: string,
+ *   id: string,
+ *   timestamp: number,
+ *   isFlagged?: boolean,
+ *   rejected?: 'banned' | 'blocked'
+ * }} WireAck
+ * @typedef {import('../shared/moderation-pipeline.mjs').ModerationPipeline} ModerationPipeline
+ */
+
+/**
+ * @typedef {object} ChatServerOptions
+ * @property {number | ((message: WireMessage) => number)} [ackDelayMs]
+ *   how long acks are held back, per message; lets tests deliver them late
+ *   and out of order
+ * @property {ModerationPipeline} [moderation]
+ * @property {Pick<FloodGuard, 'check'>} [flood] benches that feed traffic
+ *   from one connection swap in one that lets everything through
+ * @property {() => number} [now]
+ */
+
+/**
+ * @typedef {{
+ *   socket: import('ws').WebSocket,
+ *   name: string,
+ *   user: string,
+ *   channels: Set<string>,
+ *   channelKey: string,
+ *   outgoing: WireMessage[],
+ *   published: Promise<void>
+ * }} Client
+ */
+
+export class ChatServer {
+  #sockets = new WebSocketServer({ noServer: true });
+  /** @type {Set<Client>} */
+  #clients = new Set();
+  /** @type {WireMessage[]} */
+  #history = [];
+  // `${user}:${clientId}` to its ack, insertion-ordered so the oldest go first
+  /** @type {Map<string, Promise<WireAck>>} */
+  #acks = new Map();
+  /** @type {Set<string>} */
+  #banned = new Set();
+  // Open connections per user, who stays online until the last one closes
+  /** @type {Map<string, number>} */
+  #connections = new Map();
+  // Group id to the users in it, counted per connection
+  /** @type {Map<string, Map<string, number>>} */
+  #groups = new Map();
+  /** @type {Set<string>} */
+  #changedGroups = new Set();
+  /** @type {Set<Client>} */
+  #pendingFanout = new Set();
+  #fanoutScheduled = false;
+  #presence;
+  #flood;
+  #createId = createIdGenerator();
+  #moderation;
+  #ackDelayMs;
+  #now;
+  #broadcastTimer;
+  // Acks held back by ackDelayMs, cleared on close
+  /** @type {Set<ReturnType<typeof setTimeout>>} */
+  #ackTimers = new Set();
+
+  /** @param {ChatServerOptions} [options] */
+  constructor({ ackDelayMs = 0, moderation = createModerationPipeline(), flood = new FloodGuard(), now = Date.now } = {}) {
+    this.#ackDelayMs = typeof ackDelayMs === 'function' ? ackDelayMs : () => ackDelayMs;
+    this.#moderation = moderation;
+    this.#flood = flood;
+    this.#now = now;
+    this.#presence = new PresenceTracker(undefined, now());
+    this.#broadcastTimer = setInterval(() => this.#broadcast(), PRESENCE_BROADCAST_MS);
+    this.#broadcastTimer.unref();
+    this.#sockets.on('connection', socket => this.#accept(socket));
+  }
+
+  get clientCount() {
+    return this.#clients.size;
+  }
+
+  /**
+   * Takes over an HTTP upgrade request for CHAT_PATH; false for other paths
+   * @param {import('node:http').IncomingMessage} request
+   * @param {import('node:stream').Duplex} socket
+   * @param {Buffer} head
+   */
+  handleUpgrade(request, socket, head) {
+    if (new URL(request.url ?? '/', 'http://localhost').pathname !== CHAT_PATH) return false;
+    this.#sockets.handleUpgrade(request, socket, head, ws => this.#sockets.emit('connection', ws, request));
+    return true;
+  }
+
+  /**
+   * Later messages from this user are rejected as banned
+   * @param {string} name
+   */
+  ban(name) {
+    this.#banned.add(normalizeUserName(name));
+  }
+
+  close() {
+    clearInterval(this.#broadcastTimer);
+    this.#ackTimers.forEach(clearTimeout);
+    this.#ackTimers.clear();
+    this.#clients.forEach(client => client.socket.terminate());
+    this.#clients.clear();
+    return new Promise(resolve => this.#sockets.close(() => resolve(undefined)));
+  }
+
+  /** @param {import('ws').WebSocket} socket */
+  #accept(socket) {
+    /** @type {Client | null} */
+    let client = null;
+    socket.on('message', raw => {
+      /** @type {any} */
+      let data;
+      try {
+        data = JSON.parse(String(raw));
+      } catch {
+        return;
+      }
+      if (data.type === 'hello' && !client) {
+        client = this.#hello(socket, data);
+      } else if (!client) {
+        return;
+      } else if (data.type === 'messages' && Array.isArray(data.messages)) {
+        this.#receive(client, data.messages);
+      } else if (data.type === 'heartbeat' || (data.type === 'presence' && data.online)) {
+        this.#presence.heartbeat(client.user, this.#now());
+      } else if (data.type === 'presence') {
+        this.#presence.leave(client.user);
+      } else if (data.type === 'groups' && data.membership) {
+        this.#setMembership(client, data.membership);
+      }
+    });
+    socket.on('close', () => {
+      if (!client) return;
+      this.#clients.delete(client);
+      this.#pendingFanout.delete(client);
+      const current = client;
+      current.channels.forEach(channel => {
+        if (channel.startsWith('group:')) this.#countMember(channel.slice(6), current.user, -1);
+      });
+      const connections = (this.#connections.get(current.user) ?? 1) - 1;
+      if (connections > 0) {
+        this.#connections.set(current.user, connections);
+      } else {
+        this.#connections.delete(current.user);
+        this.#presence.leave(current.user);
+      }
+    });
+  }
+
+  /**
+   * @param {import('ws').WebSocket} socket
+   * @param {{ name?: unknown, resumeAfter?: unknown, channels?: unknown }} hello
+   */
+  #hello(socket, { name, resumeAfter, channels }) {
+    const displayName = String(name ?? '').slice(0, 50) || 'anonymous';
+    /** @type {Client} */
+    const client = {
+      socket,
+      name: displayName,
+      user: normalizeUserName(displayName),
+      channels: new Set([GENERAL_CHANNEL]),
+      channelKey: GENERAL_CHANNEL,
+      outgoing: [],
+      published: Promise.resolve()
+    };
+    this.#clients.add(client);
+    this.#connections.set(client.user, (this.#connections.get(client.user) ?? 0) + 1);
+    if (Array.isArray(channels)) {
+      const membership = Object.fromEntries(
+        channels.filter(channel => String(channel).startsWith('group:')).map(channel => [String(channel).slice(6), true])
+      );
+      this.#setMembership(client, membership);
+    }
+    this.#presence.heartbeat(client.user, this.#now());
+    this.#send(client, { type: 'presence', online: this.#presence.snapshot() });
+    if (this.#groups.size) {
+      this.#send(client, { type: 'groups', members: Object.fromEntries([...this.#groups].map(([id, users]) => [id, users.size])) });
+    }
+    const missed = this.#history.filter(message => client.channels.has(message.channel));
+    const start = typeof resumeAfter === 'string'
+      ? missed.findIndex(message => message.id > resumeAfter)
+      : Math.max(0, missed.length - HISTORY_ON_CONNECT);
+    if (start !== -1 && start < missed.length) this.#send(client, { type: 'messages', messages: missed.slice(start) });
+    return client;
+  }
+
+  /**
+   * @param {Client} client
+   * @param {Record<string, boolean>} membership
+   */
+  #setMembership(client, membership) {
+    Object.entries(membership).forEach(([groupId, joined]) => {
+      const channel = groupChannel(groupId);
+      if (!!joined === client.channels.has(channel)) return;
+      if (joined) {
+        client.channels.add(channel);
+      } else {
+        client.channels.delete(channel);
+      }
+      this.#countMember(groupId, client.user, joined ? 1 : -1);
+    });
+    client.channelKey = [...client.channels].sort().join(',');
+  }
+
+  /**
+   * @param {string} groupId
+   * @param {string} user
+   * @param {1 | -1} change
+   */
+  #countMember(groupId, user, change) {
+    let users = this.#groups.get(groupId);
+    if (!users) {
+      users = new Map();
+      this.#groups.set(groupId, users);
+    }
+    const connections = (users.get(user) ?? 0) + change;
+    if (connections > 0) {
+      users.set(user, connections);
+    } else {
+      users.delete(user);
+    }
+    this.#changedGroups.add(groupId);
+  }
+
+  /**
+   * Moderates a batch concurrently; #post still publishes the messages in
+   * the order they arrived
+   * @param {Client} client
+   * @param {unknown[]} batch
+   */
+  async #receive(client, batch) {
+    const acks = await Promise.all(batch.filter(isWireMessage).map(message => this.#ackFor(client, message)));
+    /** @type {Map<number, WireAck[]>} */
+    const byDelay = new Map();
+    acks.forEach(({ ack, message }) => {
+      const delay = this.#ackDelayMs(message);
+      const group = byDelay.get(delay);
+      if (group) {
+        group.push(ack);
+      } else {
+        byDelay.set(delay, [ack]);
+      }
+    });
+    byDelay.forEach((group, delay) => {
+      const sendAcks = () => {
+        if (this.#clients.has(client)) this.#send(client, { type: 'acks', acks: group });
+      };
+      if (delay > 0) {
+        const timer = setTimeout(() => {
+          this.#ackTimers.delete(timer);
+          sendAcks();
+        }, delay);
+        this.#ackTimers.add(timer);
+      } else {
+        sendAcks();
+      }
+    });
+  }
+
+  /**
+   * The ack for one message; a repeat of an already-seen client id gets the
+   * original ack and isn't posted again
+   * @param {Client} client
+   * @param {WireMessage} message
+   * @returns {Promise<{ ack: WireAck, message: WireMessage }>}
+   */
+  async #ackFor(client, message) {
+    const key = `${client.user}:${message.clientId}`;
+    let ack = this.#acks.get(key);
+    if (!ack) {
+      ack = this.#post(client, message);
+      if (this.#acks.size >= ACK_MEMORY) this.#acks.delete(/** @type {string} */ (this.#acks.keys().next().value));
+      this.#acks.set(key, ack);
+    }
+    return { ack: await ack, message };
+  }
+
+  /**
+   * @param {Client} client
+   * @param {WireMessage} message
+   * @returns {Promise<WireAck>}
+   */
+  async #post(client, message) {
+    const clientId = /** @type {string} */ (message.clientId);
+    const now = this.#now();
+    if (this.#banned.has(client.user)) return { clientId, id: message.id, timestamp: now, rejected: 'banned' };
+    if (message.channel !== GENERAL_CHANNEL && !client.channels.has(message.channel)) {
+      return { clientId, id: message.id, timestamp: now, rejected: 'blocked' };
+    }
+    const flood = this.#flood.check(client.user, message.text, now);
+    if (flood === 'throttled') return { clientId, id: message.id, timestamp: now, rejected: 'blocked' };
+    // A slow check holds back this connection's later messages rather than
+    // letting them overtake it
+    const previous = client.published;
+    /** @type {() => void} */
+    let done = () => {};
+    client.published = new Promise(resolve => {
+      done = () => resolve(undefined);
+    });
+    try {
+      const verdict = await this.#moderation.moderate({ text: message.text, imageHash: message.image?.display });
+      await previous;
+      if (verdict.action === 'block') return { clientId, id: message.id, timestamp: now, rejected: 'blocked' };
+      const isFlagged = flood === 'duplicate' || verdict.action === 'flag' || undefined;
+      /** @type {WireMessage} */
+      const accepted = {
+        id: this.#createId(),
+        name: client.name,
+        text: message.text,
+        timestamp: this.#now(),
+        channel: message.channel,
+        isFlagged,
+        image: message.image
+      };
+      this.#publish(accepted, client);
+      return { clientId, id: accepted.id, timestamp: accepted.timestamp, isFlagged };
+    } finally {
+      done();
+    }
+  }
+
+  /**
+   * The sending connection is skipped: its ack turns the optimistic copy
+   * into this message. The sender's other tabs get it like anyone else.
+   * @param {WireMessage} message
+   * @param {Client} sender
+   */
+  #publish(message, sender) {
+    this.#history.push(message);
+    if (this.#history.length > HISTORY_LIMIT * 1.5) this.#history.splice(0, this.#history.length - HISTORY_LIMIT);
+    this.#clients.forEach(client => {
+      if (client === sender || !client.channels.has(message.channel)) return;
+      client.outgoing.push(message);
+      this.#pendingFanout.add(client);
+    });
+    if (this.#fanoutScheduled) return;
+    this.#fanoutScheduled = true;
+    setImmediate(() => this.#fanout());
+  }
+
+  // One frame per client; clients on the same channels get the same string
+  #fanout() {
+    this.#fanoutScheduled = false;
+    /** @type {Map<string, { messages: WireMessage[], frame: string }>} */
+    const frames = new Map();
+    this.#pendingFanout.forEach(client => {
+      const cached = frames.get(client.channelKey);
+      let frame;
+      if (cached && sameMessages(cached.messages, client.outgoing)) {
+        frame = cached.frame;
+      } else {
+        frame = JSON.stringify({ type: 'messages', messages: client.outgoing });
+        frames.set(client.channelKey, { messages: client.outgoing, frame });
+      }
+      client.outgoing = [];
+      if (client.socket.readyState === client.socket.OPEN) client.socket.send(frame);
+    });
+    this.#pendingFanout.clear();
+  }
+
+  // Expires silent users and sends presence and member-count changes to all
+  #broadcast() {
+    this.#presence.expire(this.#now());
+    const delta = this.#presence.takeDelta();
+    /** @type {string[]} */
+    const frames = [];
+    if (delta) frames.push(JSON.stringify({ type: 'presenceDelta', ...delta }));
+    if (this.#changedGroups.size) {
+      const members = Object.fromEntries([...this.#changedGroups].map(id => [id, this.#groups.get(id)?.size ?? 0]));
+      frames.push(JSON.stringify({ type: 'groups', members }));
+      this.#changedGroups.clear();
+    }
+    if (!frames.length) return;
+    this.#clients.forEach(client => {
+      if (client.socket.readyState === client.socket.OPEN) frames.forEach(frame => client.socket.send(frame));
+    });
+  }
+
+  /**
+   * @param {Client} client
+   * @param {object} event
+   */
+  #send(client, event) {
+    if (client.socket.readyState === client.socket.OPEN) client.socket.send(JSON.stringify(event));
+  }
+}
+
+/**
+ * @param {WireMessage[]} a
+ * @param {WireMessage[]} b
+ */
+const sameMessages = (a, b) => a.length === b.length && a.every((message, i) => message === b[i]);
+
+/**
+ * @param {any} message
+ * @returns {message is WireMessage}
+ */
+const isWireMessage = message =>
+  !!message &&
+  typeof message.clientId === 'string' &&
+  typeof message.text === 'string' &&
+  typeof message.channel === 'string';
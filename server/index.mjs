@@ -0,0 +1,65 @@
+// @ts-check
+// Stand-in backend for development, tests and benches: one HTTP server with
+// the chat socket at /chat, the blob store at /blobs and the resource
+// catalog at /catalog (files under /resources).
+//
+//   node server/index.mjs [--port 8080] [--ack-delay 0]
+import { createServer } from 'node:http';
+import { parseArgs } from 'node:util';
+import { fileURLToPath } from 'node:url';
+import { BlobServer } from './blobs.mjs';
+import { CatalogServer } from './catalog.mjs';
+import { ChatServer } from './chat.mjs';
+
+/**
+ * @typedef {object} ServerOptions
+ * @property {number} [port] 0 picks a free port
+ * @property {string} [host]
+ * @property {import('./chat.mjs').ChatServerOptions} [chat]
+ * @property {import('./catalog.mjs').CatalogServerOptions} [catalog]
+ */
+
+/** @param {ServerOptions} [options] */
+export const startServer = async ({ port = 0, host = '127.0.0.1', chat: chatOptions, catalog: catalogOptions } = {}) => {
+  const chat = new ChatServer(chatOptions);
+  const blobs = new BlobServer();
+  const catalog = new CatalogServer(catalogOptions);
+  const http = createServer((request, response) => {
+    if (!blobs.handle(request, response) && !catalog.handle(request, response)) response.writeHead(404).end();
+  });
+  http.on('upgrade', (request, socket, head) => {
+    if (!chat.handleUpgrade(request, socket, head)) socket.destroy();
+  });
+  await new Promise(resolve => http.listen(port, host, () => resolve(undefined)));
+  const address = /** @type {import('node:net').AddressInfo} */ (http.address());
+  return {
+    chat,
+    blobs,
+    catalog,
+    port: address.port,
+    origin: `http://${host}:${address.port}`,
+    close: async () => {
+      await chat.close();
+      http.closeAllConnections();
+      await new Promise(resolve => http.close(() => resolve(undefined)));
+    }
+  };
+};
+
+if (process.argv[1] === fileURLToPath(import.meta.url)) {
+  const { values } = parseArgs({
+    options: {
+      port: { type: 'string', default: '8080' },
+      host: { type: 'string', default: '127.0.0.1' },
+      'ack-delay': { type: 'string', default: '0' }
+    }
+  });
+  const server = await startServer({
+    port: Number(values.port),
+    host: values.host,
+    chat: { ackDelayMs: Number(values['ack-delay']) }
+  });
+  console.log(
+    `chat on ws://${values.host}:${server.port}/chat, blobs on ${server.origin}/blobs, catalog on ${server.origin}/catalog`
+  );
+}
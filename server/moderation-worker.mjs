@@ -0,0 +1,21 @@
+// @ts-check
+// Thread entry for ThreadModerationWorkers: builds the stages once, then
+// answers one check at a time
+import { parentPort, workerData } from 'node:worker_threads';
+
+/** @type {{ module: string, factory: string, options: unknown }} */
+const { module, factory, options } = workerData;
+const stages = new Map(
+  (await import(module))[factory](options).map((/** @type {{ name: string }} */ stage) => [stage.name, stage])
+);
+
+parentPort?.postMessage({ ready: true });
+parentPort?.on('message', async ({ id, stage, input }) => {
+  try {
+    const found = stages.get(stage);
+    if (!found) throw new Error(`Unknown moderation stage "${stage}"`);
+    parentPort?.postMessage({ id, verdict: await found.check(input) });
+  } catch (error) {
+    parentPort?.postMessage({ id, error: String(error) });
+  }
+});
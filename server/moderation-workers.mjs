@@ -0,0 +1,164 @@
+// @ts-check
+// Moderation stages on worker threads
+// Each thread builds the pipeline's stages from the same factory and runs
+// one check at a time, looked up by stage name, so synchronous CPU work runs
+// in parallel. A check that overruns its timeout resolves undefined but keeps
+// its thread until it answers, as in-process; one that is still running at
+// HUNG_TIMEOUT_FACTOR times its timeout has its thread terminated and
+// replaced, and that slot takes work again once the new thread is up.
+// Replacing on every overrun would make things worse under load,
+// since a new thread costs more CPU than most checks.
+import { Worker } from 'node:worker_threads';
+
+const WORKER_URL = new URL('./moderation-worker.mjs', import.meta.url);
+const HUNG_TIMEOUT_FACTOR = 10;
+
+/**
+ * @typedef {import('../shared/moderation-pipeline.mjs').ModerationStage} ModerationStage
+ * @typedef {import('../shared/moderation-pipeline.mjs').ModerationInput} ModerationInput
+ * @typedef {import('../shared/moderation-pipeline.mjs').StageVerdict} StageVerdict
+ */
+
+/**
+ * Where the threads get their stages: `module` exports `factory`, which is
+ * called with `options` and returns the same stages the pipeline was given
+ * @typedef {{ module: string | URL, factory?: string, options?: unknown }} StageSource
+ */
+
+/**
+ * @typedef {{
+ *   resolve: (verdict: StageVerdict | undefined) => void,
+ *   reject: (error: Error) => void,
+ *   timers: ReturnType<typeof setTimeout>[]
+ * }} Job
+ */
+
+/** @implements {import('../shared/moderation-pipeline.mjs').ModerationWorkers} */
+export class ThreadModerationWorkers {
+  #source;
+  /** @type {Set<Worker>} */
+  #threads = new Set();
+  /** @type {Worker[]} */
+  #idle = [];
+  /** @type {Map<Worker, Job>} */
+  #busy = new Map();
+  /** @type {{ resolve: (worker: Worker) => void, reject: (error: Error) => void }[]} */
+  #waiting = [];
+  #nextJob = 0;
+  /** @type {Error | null} */
+  #failure = null;
+
+  /**
+   * @param {number} size
+   * @param {StageSource} [source] defaults to createDefaultStages
+   */
+  constructor(size, source = { module: new URL('../shared/moderation-pipeline.mjs', import.meta.url) }) {
+    this.#source = {
+      module: String(source.module),
+      factory: source.factory ?? 'createDefaultStages',
+      options: source.options ?? {}
+    };
+    for (let i = 0; i < size; i++) this.#spawn();
+  }
+
+  /**
+   * @param {ModerationStage} stage
+   * @param {ModerationInput} input
+   * @returns {Promise<StageVerdict | undefined>}
+   */
+  async run(stage, input) {
+    if (this.#failure) throw this.#failure;
+    /** @type {Worker} */
+    const worker = this.#idle.pop() ?? (await new Promise((resolve, reject) => this.#waiting.push({ resolve, reject })));
+    return new Promise((resolve, reject) => {
+      const id = this.#nextJob++;
+      const timers = [
+        setTimeout(() => resolve(undefined), stage.timeoutMs),
+        setTimeout(() => this.#replace(worker), stage.timeoutMs * HUNG_TIMEOUT_FACTOR)
+      ];
+      this.#busy.set(worker, { resolve, reject, timers });
+      worker.postMessage({ id, stage: stage.name, input });
+    });
+  }
+
+  /** Terminates every thread; checks in flight fail */
+  async close() {
+    const workers = [...this.#threads];
+    this.#fail(new Error('Moderation workers are closed'));
+    await Promise.all(workers.map(worker => worker.terminate()));
+  }
+
+  #spawn() {
+    const worker = new Worker(WORKER_URL, { workerData: this.#source });
+    this.#threads.add(worker);
+    let started = false;
+    worker.on('message', (/** @type {{ ready?: true, verdict?: StageVerdict, error?: string }} */ { ready, verdict, error }) => {
+      // Threads take work once their stages are built, so start-up doesn't
+      // count against anyone's timeout
+      if (ready) {
+        started = true;
+        this.#release(worker);
+        return;
+      }
+      const job = this.#busy.get(worker);
+      if (!job) return;
+      job.timers.forEach(clearTimeout);
+      this.#busy.delete(worker);
+      if (error === undefined) {
+        job.resolve(verdict);
+      } else {
+        job.reject(new Error(error));
+      }
+      this.#release(worker);
+    });
+    // A crashed thread takes its check down with it and is replaced. One
+    // that can't even build its stages won't do better on a retry, so that
+    // fails the pool.
+    worker.on('error', error => {
+      if (!started) {
+        this.#fail(error);
+        return;
+      }
+      const job = this.#busy.get(worker);
+      if (job) job.timers.forEach(clearTimeout);
+      job?.reject(error);
+      this.#replace(worker);
+    });
+  }
+
+  /** @param {Error} error */
+  #fail(error) {
+    this.#failure ??= error;
+    this.#busy.forEach(job => {
+      job.timers.forEach(clearTimeout);
+      job.reject(error);
+    });
+    this.#busy.clear();
+    this.#threads.forEach(worker => worker.terminate());
+    this.#threads.clear();
+    this.#idle = [];
+    this.#waiting.forEach(waiter => waiter.reject(error));
+    this.#waiting = [];
+  }
+
+  /** @param {Worker} worker */
+  #replace(worker) {
+    if (!this.#threads.delete(worker)) return;
+    this.#busy.delete(worker);
+    this.#idle = this.#idle.filter(other => other !== worker);
+    worker.removeAllListeners();
+    worker.terminate();
+    if (!this.#failure) this.#spawn();
+  }
+
+  /** @param {Worker} worker */
+  #release(worker) {
+    if (this.#failure) return;
+    const next = this.#waiting.shift();
+    if (next) {
+      next.resolve(worker);
+    } else {
+      this.#idle.push(worker);
+    }
+  }
+}
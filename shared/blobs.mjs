@@ -0,0 +1,114 @@
+// @ts-check
+// Content-addressed blob uploads
+// Blobs are addressed by their SHA-256, so a screenshot shared by many
+// students is stored and uploaded once: the server is asked how much of a
+// blob it already holds, and only the rest goes up, in chunks from the last
+// acknowledged offset. A dropped connection resumes instead of restarting.
+// Plain JS with fetch, Blob and Web Crypto only, so the app and Node tests
+// share it; server/blobs.mjs is the stand-in server.
+export const BLOB_BASE_URL = '/blobs';
+export const UPLOAD_CHUNK_BYTES = 256 * 1024;
+const UPLOAD_MAX_ATTEMPTS = 6;
+const UPLOAD_RETRY_DELAY_MS = 500;
+
+/** @param {string} hash */
+export const blobUrl = hash => `${BLOB_BASE_URL}/${hash}`;
+
+/**
+ * Hex SHA-256 of blob; the image worker hashes its own renditions, this is
+ * the main-thread fallback
+ * @param {Blob} blob
+ */
+export const hashBlob = async blob => {
+  const digest = new Uint8Array(await crypto.subtle.digest('SHA-256', await blob.arrayBuffer()));
+  return Array.from(digest, byte => byte.toString(16).padStart(2, '0')).join('');
+};
+
+/**
+ * @typedef {object} BlobUploaderOptions
+ * @property {(hash: string) => string} [url] where a blob lives
+ * @property {() => Promise<void>} [whenOnline] waited on before each retry
+ * @property {number} [retryDelayMs] base of the exponential backoff
+ */
+
+// One upload per hash; failed uploads are forgotten so a later send retries
+export class BlobUploader {
+  /** @type {Map<string, Promise<void>>} */
+  #uploads = new Map();
+  #url;
+  #whenOnline;
+  #retryDelayMs;
+
+  /** @param {BlobUploaderOptions} [options] */
+  constructor({ url = blobUrl, whenOnline = async () => {}, retryDelayMs = UPLOAD_RETRY_DELAY_MS } = {}) {
+    this.#url = url;
+    this.#whenOnline = whenOnline;
+    this.#retryDelayMs = retryDelayMs;
+  }
+
+  /**
+   * The upload of hash already under way (or done), if any
+   * @param {string} hash
+   */
+  pending(hash) {
+    return this.#uploads.get(hash);
+  }
+
+  /**
+   * @param {string} hash
+   * @param {Blob} blob
+   */
+  upload(hash, blob) {
+    let upload = this.#uploads.get(hash);
+    if (!upload) {
+      upload = this.#uploadChunks(hash, blob);
+      this.#uploads.set(hash, upload);
+      upload.catch(() => this.#uploads.delete(hash));
+    }
+    return upload;
+  }
+
+  // HEAD answers 200 for a complete blob, otherwise 404 with the offset of
+  // any partial upload
+  /**
+   * @param {string} hash
+   * @param {number} size
+   */
+  async #uploadedOffset(hash, size) {
+    const response = await fetch(this.#url(hash), { method: 'HEAD' });
+    if (response.ok) return size;
+    return Number(response.headers.get('Upload-Offset')) || 0;
+  }
+
+  /**
+   * @param {string} hash
+   * @param {Blob} blob
+   */
+  async #uploadChunks(hash, blob) {
+    for (let attempt = 1; ; attempt++) {
+      try {
+        let offset = await this.#uploadedOffset(hash, blob.size);
+        while (offset < blob.size) {
+          const response = await fetch(this.#url(hash), {
+            method: 'PATCH',
+            headers: {
+              'Content-Type': 'application/offset+octet-stream',
+              'Upload-Offset': String(offset),
+              'Upload-Length': String(blob.size)
+            },
+            body: blob.slice(offset, offset + UPLOAD_CHUNK_BYTES)
+          });
+          const next = Number(response.headers.get('Upload-Offset'));
+          // A 409 (offset mismatch) also lands here and re-reads the offset
+          if (!response.ok || !(next > offset)) throw new Error(`Blob upload failed (${response.status})`);
+          offset = next;
+        }
+        return;
+      } catch (error) {
+        if (attempt >= UPLOAD_MAX_ATTEMPTS) throw error;
+        await new Promise(resolve => setTimeout(resolve, this.#retryDelayMs * 2 ** attempt * (0.5 + Math.random())));
+        await this.#whenOnline();
+      }
+    }
+  }
+}
@@ -0,0 +1,211 @@
+// @ts-check
+// Resource catalog client
+// Thousands of PYQ papers, NCERT solutions and formula sheets, served a page
+// at a time from CATALOG_BASE_URL and filtered on the server. Pages go
+// through a small HTTP cache: within max-age they come from memory; after
+// that, for up to stale-while-revalidate, the cached page is shown at once
+// while an If-None-Match request checks it in the background, so an
+// unchanged page costs a bodiless 304. Past both, the request waits.
+// Plain JS with fetch and streams only, so the Resources tab and Node tests
+// share it; server/catalog.mjs is the stand-in server.
+export const CATALOG_BASE_URL = '/catalog';
+export const CATALOG_PAGE_SIZE = 24;
+const CATALOG_CACHE_ENTRIES = 200;
+// For responses without a Cache-Control header
+const CATALOG_DEFAULT_MAX_AGE_MS = 60 * 1000;
+const CATALOG_DEFAULT_STALE_MS = 10 * 60 * 1000;
+
+/** @typedef {'physics' | 'chemistry' | 'math'} ResourceSubject */
+/** @typedef {'pyq' | 'ncert' | 'formulas'} ResourceType */
+
+/** @type {Record<ResourceSubject, string>} */
+export const RESOURCE_SUBJECTS = { physics: 'Physics', chemistry: 'Chemistry', math: 'Math' };
+/** @type {Record<ResourceType, string>} */
+export const RESOURCE_TYPES = {
+  pyq: 'Previous Year Papers',
+  ncert: 'NCERT Solutions',
+  formulas: 'Formula Sheets'
+};
+
+// AIEEE, JEE Main's predecessor, was first held in 2002
+export const FIRST_EXAM_YEAR = 2002;
+
+/**
+ * @typedef {object} JeeResource
+ * @property {number} id
+ * @property {string} title
+ * @property {string} url
+ * @property {string} description
+ * @property {ResourceSubject} subject
+ * @property {ResourceType} type
+ * @property {number} [year] exam year, for papers
+ * @property {number} [sizeBytes]
+ */
+
+/**
+ * @typedef {object} CatalogQuery
+ * @property {ResourceSubject} [subject]
+ * @property {number} [year]
+ * @property {ResourceType} [type]
+ */
+
+/**
+ * @typedef {object} CatalogPage
+ * @property {JeeResource[]} items
+ * @property {number} total matches for the whole query, not just this page
+ * @property {string | null} nextCursor opaque; null on the last page
+ */
+
+/**
+ * Parameters go in a fixed order, so equal queries share a cache entry
+ * @param {CatalogQuery} query
+ * @param {string} [cursor]
+ */
+export const catalogUrl = ({ subject, year, type }, cursor) => {
+  const params = new URLSearchParams({ limit: String(CATALOG_PAGE_SIZE) });
+  if (subject) params.set('subject', subject);
+  if (year) params.set('year', String(year));
+  if (type) params.set('type', type);
+  if (cursor) params.set('cursor', cursor);
+  return `${CATALOG_BASE_URL}?${params}`;
+};
+
+/**
+ * @typedef {{ data: unknown, etag: string | null, fetchedAt: number, maxAgeMs: number, staleMs: number }} CacheEntry
+ */
+
+/** @param {string | null} cacheControl */
+const cacheLifetime = cacheControl => {
+  /** @param {string} directive */
+  const seconds = directive => {
+    const match = cacheControl?.match(new RegExp(`(?:^|,)\\s*${directive}=(\\d+)`));
+    return match ? Number(match[1]) * 1000 : undefined;
+  };
+  return {
+    maxAgeMs: seconds('max-age') ?? CATALOG_DEFAULT_MAX_AGE_MS,
+    staleMs: seconds('stale-while-revalidate') ?? CATALOG_DEFAULT_STALE_MS
+  };
+};
+
+/**
+ * @typedef {object} HttpCacheOptions
+ * @property {number} [capacity] entries kept, least recently used dropped
+ * @property {() => number} [now] clock, for tests
+ */
+
+export class HttpCache {
+  // Insertion-ordered, so the first key is the least recently used
+  /** @type {Map<string, CacheEntry>} */
+  #entries = new Map();
+  // One request per URL at a time
+  /** @type {Map<string, Promise<CacheEntry>>} */
+  #inflight = new Map();
+  #capacity;
+  #now;
+
+  /** @param {HttpCacheOptions} [options] */
+  constructor({ capacity = CATALOG_CACHE_ENTRIES, now = Date.now } = {}) {
+    this.#capacity = capacity;
+    this.#now = now;
+  }
+
+  /**
+   * `onUpdate` gets the new body when a background revalidation finds the
+   * stale copy it returned has changed
+   * @template T
+   * @param {string} url
+   * @param {(data: T) => void} [onUpdate]
+   * @returns {Promise<T>}
+   */
+  async get(url, onUpdate) {
+    const entry = this.#entries.get(url);
+    if (entry) {
+      this.#touch(url, entry);
+      const age = this.#now() - entry.fetchedAt;
+      if (age < entry.maxAgeMs) return /** @type {T} */ (entry.data);
+      if (age < entry.maxAgeMs + entry.staleMs) {
+        this.#revalidate(url).then(
+          fresh => {
+            if (fresh.data !== entry.data) onUpdate?.(/** @type {T} */ (fresh.data));
+          },
+          () => {}
+        );
+        return /** @type {T} */ (entry.data);
+      }
+    }
+    try {
+      return /** @type {T} */ ((await this.#revalidate(url)).data);
+    } catch (error) {
+      // Offline, an expired page beats none
+      if (entry) return /** @type {T} */ (entry.data);
+      throw error;
+    }
+  }
+
+  /** @param {string} url */
+  #revalidate(url) {
+    let request = this.#inflight.get(url);
+    if (!request) {
+      request = this.#fetchEntry(url).finally(() => this.#inflight.delete(url));
+      this.#inflight.set(url, request);
+    }
+    return request;
+  }
+
+  /** @param {string} url */
+  async #fetchEntry(url) {
+    const cached = this.#entries.get(url);
+    const response = await fetch(url, {
+      // This layer is the cache; keep the browser's out of the way
+      cache: 'no-store',
+      headers: cached?.etag ? { 'If-None-Match': cached.etag } : undefined
+    });
+    const notModified = response.status === 304 && cached;
+    if (!notModified && !response.ok) throw new Error(`Catalog request failed (${response.status})`);
+    /** @type {CacheEntry} */
+    const entry = {
+      data: notModified ? notModified.data : await response.json(),
+      etag: response.headers.get('ETag') ?? (notModified ? notModified.etag : null),
+      fetchedAt: this.#now(),
+      ...cacheLifetime(response.headers.get('Cache-Control'))
+    };
+    this.#touch(url, entry);
+    if (this.#entries.size > this.#capacity) this.#entries.delete(/** @type {string} */ (this.#entries.keys().next().value));
+    return entry;
+  }
+
+  /**
+   * @param {string} url
+   * @param {CacheEntry} entry
+   */
+  #touch(url, entry) {
+    this.#entries.delete(url);
+    this.#entries.set(url, entry);
+  }
+}
+
+/**
+ * Reads the body as a stream so progress (a fraction, or null when the size
+ * is unknown) can be shown; resolves to the whole file
+ * @param {JeeResource} resource
+ * @param {(fraction: number | null) => void} onProgress
+ * @param {AbortSignal} [signal]
+ */
+export const downloadResource = async (resource, onProgress, signal) => {
+  const response = await fetch(resource.url, { signal });
+  if (!response.ok || !response.body) throw new Error(`Download failed (${response.status})`);
+  // Content-Length counts compressed bytes when the response is encoded
+  const total = Number(response.headers.get('Content-Length')) || resource.sizeBytes || 0;
+  const reader = response.body.getReader();
+  /** @type {Uint8Array[]} */
+  const chunks = [];
+  let received = 0;
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    chunks.push(value);
+    received += value.length;
+    onProgress(total ? Math.min(1, received / total) : null);
+  }
+  return new Blob(chunks, { type: response.headers.get('Content-Type') ?? undefined });
+};
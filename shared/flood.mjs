@@ -0,0 +1,96 @@
+// @ts-check
+// Flood control
+// Per-user token bucket plus a small ring of recent message hashes. Plain JS
+// with no browser dependencies, so the chat server runs the same checks as
+// the app.
+const FLOOD_BURST = 5;
+const FLOOD_REFILL_PER_SEC = 1;
+const FLOOD_RECENT_HASHES = 8;
+const FLOOD_DUPLICATE_LIMIT = 3;
+const FLOOD_IDLE_MS = 5 * 60 * 1000;
+const FLOOD_SWEEP_EVERY = 4096;
+
+/** @typedef {'ok' | 'throttled' | 'duplicate'} FloodVerdict */
+
+/**
+ * @typedef {{
+ *   tokens: number,
+ *   updatedAt: number,
+ *   recent: Uint32Array,
+ *   cursor: number
+ * }} FloodState
+ */
+
+// Ban lists, flood state and presence are keyed by the trimmed, lowercased username
+/** @param {string} name */
+export const normalizeUserName = name => name.trim().toLowerCase();
+
+// Single-pass FNV-1a that folds case and skips punctuation, spacing and
+// repeated characters, so "Pls help!!" and "pls   heeelp" hash the same.
+// No allocation: this runs on every send.
+/** @param {string} text */
+export const hashForFlood = text => {
+  let hash = 0x811c9dc5;
+  let previous = -1;
+  for (let i = 0; i < text.length; i++) {
+    let code = text.charCodeAt(i);
+    if (code >= 65 && code <= 90) {
+      code += 32;
+    } else if (code < 128 && !((code >= 97 && code <= 122) || (code >= 48 && code <= 57))) {
+      continue;
+    }
+    if (code === previous) continue;
+    previous = code;
+    hash ^= code;
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return hash >>> 0;
+};
+
+export class FloodGuard {
+  /** @type {Map<string, FloodState>} */
+  #users = new Map();
+  #checks = 0;
+
+  get size() {
+    return this.#users.size;
+  }
+
+  /**
+   * @param {string} user normalized (see normalizeUserName)
+   * @param {string} text
+   * @param {number} [now]
+   * @returns {FloodVerdict}
+   */
+  check(user, text, now = Date.now()) {
+    if (++this.#checks % FLOOD_SWEEP_EVERY === 0) this.#sweep(now);
+
+    let state = this.#users.get(user);
+    if (!state) {
+      state = { tokens: FLOOD_BURST, updatedAt: now, recent: new Uint32Array(FLOOD_RECENT_HASHES), cursor: 0 };
+      this.#users.set(user, state);
+    }
+
+    state.tokens = Math.min(FLOOD_BURST, state.tokens + ((now - state.updatedAt) / 1000) * FLOOD_REFILL_PER_SEC);
+    state.updatedAt = now;
+    if (state.tokens < 1) return 'throttled';
+    state.tokens -= 1;
+
+    const hash = hashForFlood(text);
+    let repeats = 0;
+    for (let i = 0; i < FLOOD_RECENT_HASHES; i++) {
+      if (state.recent[i] === hash) repeats++;
+    }
+    state.recent[state.cursor] = hash;
+    state.cursor = (state.cursor + 1) % FLOOD_RECENT_HASHES;
+    return repeats + 1 >= FLOOD_DUPLICATE_LIMIT ? 'duplicate' : 'ok';
+  }
+
+  // Forgets users idle long enough for their bucket to have refilled
+  /** @param {number} now */
+  #sweep(now) {
+    this.#users.forEach((state, user) => {
+      if (now - state.updatedAt > FLOOD_IDLE_MS) this.#users.delete(user);
+    });
+  }
+}
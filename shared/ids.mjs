@@ -0,0 +1,49 @@
+// @ts-check
+// Message ids
+// 10 chars of millisecond timestamp, 4 chars of node id and 4 chars of
+// sequence, all Crockford base32, so ids are unique across clients and sort
+// lexicographically in time order. The app uses one generator per tab and
+// the chat server one per process.
+const CROCKFORD_BASE32 = '0123456789ABCDEFGHJKMNPQRSTVWXYZ';
+export const ID_SEQUENCE_LIMIT = 32 ** 4;
+
+/**
+ * @param {number} value
+ * @param {number} length
+ */
+const encodeBase32 = (value, length) => {
+  let out = '';
+  for (let i = 0; i < length; i++) {
+    out = CROCKFORD_BASE32[value % 32] + out;
+    value = Math.floor(value / 32);
+  }
+  return out;
+};
+
+const randomNodeId = () => encodeBase32(crypto.getRandomValues(new Uint32Array(1))[0] % ID_SEQUENCE_LIMIT, 4);
+
+/**
+ * @param {{ node?: string, now?: () => number }} [options] `node` is four
+ *   base32 chars; `now` is the clock, in epoch milliseconds
+ * @returns {() => string}
+ */
+export const createIdGenerator = ({ node = randomNodeId(), now = Date.now } = {}) => {
+  let lastTime = 0;
+  let sequence = 0;
+  return () => {
+    // Never step backwards if the wall clock does
+    const time = Math.max(now(), lastTime);
+    if (time === lastTime) {
+      sequence++;
+      // A full sequence borrows the next millisecond
+      if (sequence >= ID_SEQUENCE_LIMIT) {
+        lastTime++;
+        sequence = 0;
+      }
+    } else {
+      lastTime = time;
+      sequence = 0;
+    }
+    return encodeBase32(lastTime, 10) + node + encodeBase32(sequence, 4);
+  };
+};
@@ -0,0 +1,43 @@
+// @ts-check
+// Image worker
+// Decodes a picked image, downscales it to a thumbnail (320px) and a
+// capped-resolution copy (1280px), re-encodes both as WebP (JPEG where the
+// browser can't encode WebP) and hashes them for content-addressed upload
+// (shared/blobs.mjs). Needs createImageBitmap and OffscreenCanvas.
+//
+// The worker is this source string, started from a Blob URL.
+// Messages: { id, file } in, { id, thumbnail, display, thumbnailHash,
+// displayHash } or { id, error } out.
+export const IMAGE_WORKER_SOURCE = `
+const encode = async (bitmap, maxPx, quality) => {
+  const scale = Math.min(1, maxPx / Math.max(bitmap.width, bitmap.height));
+  const canvas = new OffscreenCanvas(
+    Math.max(1, Math.round(bitmap.width * scale)),
+    Math.max(1, Math.round(bitmap.height * scale))
+  );
+  canvas.getContext('2d').drawImage(bitmap, 0, 0, canvas.width, canvas.height);
+  const webp = await canvas.convertToBlob({ type: 'image/webp', quality });
+  return webp.type === 'image/webp' ? webp : canvas.convertToBlob({ type: 'image/jpeg', quality });
+};
+
+const hash = async (blob) => {
+  const digest = new Uint8Array(await crypto.subtle.digest('SHA-256', await blob.arrayBuffer()));
+  return Array.from(digest, byte => byte.toString(16).padStart(2, '0')).join('');
+};
+
+self.onmessage = async (event) => {
+  const { id, file } = event.data;
+  try {
+    const bitmap = await createImageBitmap(file);
+    const [thumbnail, display] = await Promise.all([
+      encode(bitmap, 320, 0.7),
+      encode(bitmap, 1280, 0.82)
+    ]);
+    bitmap.close();
+    const [thumbnailHash, displayHash] = await Promise.all([hash(thumbnail), hash(display)]);
+    self.postMessage({ id, thumbnail, display, thumbnailHash, displayHash });
+  } catch (error) {
+    self.postMessage({ id, error: String(error) });
+  }
+};
+`;
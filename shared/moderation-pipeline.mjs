@@ -0,0 +1,271 @@
+// @ts-check
+// Moderation pipeline
+// The server-side counterpart to the in-browser checks, which clients can
+// skip. Every message runs through its stages concurrently: a lexical filter
+// (the same compiled blocked-word matcher), a pluggable CPU-only classifier
+// and an image check. Stages run on a pool of workers, and each has a
+// timeout and a fallback verdict for when it is slow or fails. Verdicts are
+// cached by content, so reposts and shared screenshots are checked once.
+// Plain JS with no browser or Node dependencies; server/moderation-workers.mjs
+// runs the same stages on worker threads.
+import { DEFAULT_BLOCKED_WORDS, compileBlockedWords } from './moderation.mjs';
+
+const MODERATION_CACHE_SIZE = 10000;
+const MODERATION_WORKERS = 4;
+
+/** @typedef {'allow' | 'flag' | 'block'} ModerationAction */
+
+/** @type {Record<ModerationAction, number>} */
+const MODERATION_SEVERITY = { allow: 0, flag: 1, block: 2 };
+
+/**
+ * @typedef {object} ModerationInput
+ * @property {string} text
+ * @property {string} [imageHash] SHA-256 of the display rendition
+ */
+
+/**
+ * @typedef {object} StageVerdict
+ * @property {ModerationAction} action
+ * @property {string} [reason]
+ */
+
+/**
+ * @typedef {object} ModerationStage
+ * @property {string} name unique within a pipeline; worker threads look stages up by it
+ * @property {number} timeoutMs
+ * @property {ModerationAction} fallback assumed when the stage times out or throws
+ * @property {(input: ModerationInput) => boolean} [applies]
+ * @property {(input: ModerationInput) => StageVerdict | Promise<StageVerdict>} check
+ */
+
+/**
+ * @typedef {object} ModerationVerdict
+ * @property {ModerationAction} action
+ * @property {string[]} reasons
+ * @property {boolean} degraded some stage timed out or failed; such verdicts aren't cached
+ */
+
+/**
+ * Where stages execute. `run` resolves with undefined once the stage has run
+ * for longer than its timeoutMs; time spent queued for a worker doesn't
+ * count.
+ * @typedef {object} ModerationWorkers
+ * @property {(stage: ModerationStage, input: ModerationInput) => Promise<StageVerdict | undefined>} run
+ */
+
+/**
+ * Runs stages on the calling thread with bounded concurrency. That overlaps
+ * async checks (a model behind a local socket) but can't interrupt or
+ * parallelize synchronous CPU work; use server/moderation-workers.mjs for
+ * that.
+ * @implements {ModerationWorkers}
+ */
+export class InProcessModerationWorkers {
+  #size;
+  #active = 0;
+  /** @type {(() => void)[]} */
+  #waiting = [];
+
+  constructor(size = MODERATION_WORKERS) {
+    this.#size = size;
+  }
+
+  /**
+   * @param {ModerationStage} stage
+   * @param {ModerationInput} input
+   * @returns {Promise<StageVerdict | undefined>}
+   */
+  async run(stage, input) {
+    if (this.#active < this.#size) {
+      this.#active++;
+    } else {
+      // The finishing run hands its slot straight over
+      await new Promise(resolve => this.#waiting.push(() => resolve(undefined)));
+    }
+    const check = Promise.resolve().then(() => stage.check(input));
+    // A timed-out check keeps its slot until it actually settles, so slow
+    // stages can't push more than `size` checks into flight
+    check.then(this.#release, this.#release);
+    /** @type {ReturnType<typeof setTimeout> | undefined} */
+    let timer;
+    try {
+      return await Promise.race([
+        check,
+        new Promise(resolve => {
+          timer = setTimeout(() => resolve(undefined), stage.timeoutMs);
+        })
+      ]);
+    } finally {
+      clearTimeout(timer);
+    }
+  }
+
+  #release = () => {
+    const next = this.#waiting.shift();
+    if (next) {
+      next();
+    } else {
+      this.#active--;
+    }
+  };
+}
+
+/**
+ * @param {string[]} [words]
+ * @returns {ModerationStage}
+ */
+export const createLexicalStage = (words = DEFAULT_BLOCKED_WORDS) => {
+  const containsBlockedWord = compileBlockedWords(words);
+  return {
+    name: 'lexical',
+    timeoutMs: 20,
+    fallback: 'flag',
+    check: ({ text }) => (containsBlockedWord(text) ? { action: 'flag', reason: 'blocked word' } : { action: 'allow' })
+  };
+};
+
+/**
+ * `score` returns 0 (fine) to 1 (abusive); any local model can be plugged in
+ * @param {(text: string) => number | Promise<number>} score
+ * @param {{ flagAt?: number, blockAt?: number, timeoutMs?: number }} [options]
+ * @returns {ModerationStage}
+ */
+export const createClassifierStage = (score, { flagAt = 0.7, blockAt = 0.95, timeoutMs = 100 } = {}) => ({
+  name: 'classifier',
+  timeoutMs,
+  // A slow classifier shouldn't hold up chat
+  fallback: 'allow',
+  check: async ({ text }) => {
+    const value = await score(text);
+    if (value >= blockAt) return { action: 'block', reason: `classifier ${value.toFixed(2)}` };
+    if (value >= flagAt) return { action: 'flag', reason: `classifier ${value.toFixed(2)}` };
+    return { action: 'allow' };
+  }
+});
+
+/**
+ * Default classifier: spam signals (shouting, stretched letters, link dumps)
+ * @param {string} text
+ */
+export const scoreSpam = text => {
+  const letters = text.replace(/[^a-z]/gi, '');
+  const shouting = letters.length >= 12 ? letters.replace(/[^A-Z]/g, '').length / letters.length : 0;
+  const stretched = /(.)\1{5,}/.test(text) ? 0.4 : 0;
+  const links = Math.min(1, (text.match(/https?:\/\//g)?.length ?? 0) / 3);
+  return Math.min(1, shouting * 0.6 + stretched + links * 0.6);
+};
+
+/**
+ * `check` gets the image's content hash, e.g. to look it up in a list of
+ * known-bad images or hand it to a local image model
+ * @param {(imageHash: string) => StageVerdict | Promise<StageVerdict>} check
+ * @param {number} [timeoutMs]
+ * @returns {ModerationStage}
+ */
+export const createImageStage = (check, timeoutMs = 2000) => ({
+  name: 'image',
+  timeoutMs,
+  // Unverified images are held for review rather than shown
+  fallback: 'flag',
+  applies: input => !!input.imageHash,
+  check: input => check(/** @type {string} */ (input.imageHash))
+});
+
+export class ModerationPipeline {
+  // Insertion-ordered, so the first key is the least recently used. Keys are
+  // the exact content rather than a short hash, which could collide and
+  // hand one message another's verdict.
+  /** @type {Map<string, Promise<ModerationVerdict>>} */
+  #cache = new Map();
+  #stages;
+  #workers;
+  #cacheSize;
+
+  /**
+   * @param {ModerationStage[]} stages
+   * @param {ModerationWorkers} [workers]
+   * @param {number} [cacheSize]
+   */
+  constructor(stages, workers = new InProcessModerationWorkers(), cacheSize = MODERATION_CACHE_SIZE) {
+    this.#stages = stages;
+    this.#workers = workers;
+    this.#cacheSize = cacheSize;
+  }
+
+  /** @param {ModerationInput} input */
+  moderate(input) {
+    const key = `${input.imageHash ?? ''}:${input.text}`;
+    let verdict = this.#cache.get(key);
+    if (verdict) {
+      this.#cache.delete(key);
+    } else {
+      // Cached as a promise, so identical messages in flight share one check
+      verdict = this.#evaluate(input);
+      verdict.then(result => {
+        if (result.degraded) this.#cache.delete(key);
+      });
+      if (this.#cache.size >= this.#cacheSize) this.#cache.delete(/** @type {string} */ (this.#cache.keys().next().value));
+    }
+    this.#cache.set(key, verdict);
+    return verdict;
+  }
+
+  /**
+   * @param {ModerationInput} input
+   * @returns {Promise<ModerationVerdict>}
+   */
+  async #evaluate(input) {
+    const results = await Promise.all(
+      this.#stages.filter(stage => !stage.applies || stage.applies(input)).map(stage => this.#runStage(stage, input))
+    );
+    /** @type {ModerationAction} */
+    let action = 'allow';
+    /** @type {string[]} */
+    const reasons = [];
+    let degraded = false;
+    results.forEach(([verdict, settled]) => {
+      degraded = degraded || !settled;
+      if (MODERATION_SEVERITY[verdict.action] > MODERATION_SEVERITY[action]) action = verdict.action;
+      if (verdict.action !== 'allow' && verdict.reason) reasons.push(verdict.reason);
+    });
+    return { action, reasons, degraded };
+  }
+
+  /**
+   * Resolves with the verdict and whether the stage actually answered
+   * @param {ModerationStage} stage
+   * @param {ModerationInput} input
+   * @returns {Promise<[StageVerdict, boolean]>}
+   */
+  #runStage(stage, input) {
+    return this.#workers.run(stage, input).then(
+      /** @returns {[StageVerdict, boolean]} */
+      verdict => (verdict ? [verdict, true] : [{ action: stage.fallback, reason: `${stage.name} timed out` }, false]),
+      /** @returns {[StageVerdict, boolean]} */
+      () => [{ action: stage.fallback, reason: `${stage.name} failed` }, false]
+    );
+  }
+}
+
+/**
+ * The standard three stages. Options must survive structured cloning, so a
+ * worker thread can build the same stages from them.
+ * @param {{ blockedWords?: string[], blockedImageHashes?: string[] }} [options]
+ * @returns {ModerationStage[]}
+ */
+export const createDefaultStages = ({ blockedWords = DEFAULT_BLOCKED_WORDS, blockedImageHashes = [] } = {}) => {
+  const blockedImages = new Set(blockedImageHashes);
+  return [
+    createLexicalStage(blockedWords),
+    createClassifierStage(scoreSpam),
+    createImageStage(hash => (blockedImages.has(hash) ? { action: 'block', reason: 'blocked image' } : { action: 'allow' }))
+  ];
+};
+
+/**
+ * @param {ModerationWorkers} [workers]
+ * @param {Parameters<typeof createDefaultStages>[0]} [options]
+ */
+export const createModerationPipeline = (workers = new InProcessModerationWorkers(), options = {}) =>
+  new ModerationPipeline(createDefaultStages(options), workers);
@@ -0,0 +1,83 @@
+// @ts-check
+// Blocked-word matching
+// Entries match whole words by default; a trailing `*` also matches longer
+// words ("abuse*" catches "abusive") and a leading `*` matches inside words.
+// The long, unambiguous stems match anywhere, so compounds ("motherfucker",
+// "behenchod", "bullshit") are caught; short ones that turn up inside
+// ordinary words ("mc" in "mcq", "bc" in "abc") stay whole words.
+// Plain JS with no browser dependencies, so the chat server and the Node
+// tests use the same matcher as the app.
+export const DEFAULT_BLOCKED_WORDS = [
+  'gaali*',
+  'abuse*',
+  'curse*',
+  '*fuck*',
+  '*shit*',
+  '*asshole*',
+  '*bastard*',
+  '*chod*',
+  'mc',
+  'bc'
+];
+
+/** @type {Record<string, string>} */
+const LEET_MAP = {
+  '0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '7': 't', '8': 'b', '9': 'g', '@': 'a', '$': 's'
+};
+
+/** @param {string} ch */
+const unleet = ch => LEET_MAP[ch] ?? ch;
+
+// Folds case, accents, leetspeak, aspirated Hinglish spellings ("chodh",
+// "bhai") and stretched letters ("shiiit") so variants compare equal. Only
+// runs of three or more collapse: doubled letters are ordinary spelling
+// ("bcc", "moon") and are matched against the word list as written.
+// Digits are only read as letters between letters ("sh1t"): next to a
+// bracket, an operator or a space they are numbers ("Q 8c", "f(x)=8c+1").
+/** @param {string} text */
+export const normalizeForModeration = text =>
+  text
+    .toLowerCase()
+    .normalize('NFKD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .replace(/[@$]/g, unleet)
+    .replace(/([a-z])([0-9]+)(?=[a-z])/g, (_, before, digits) => before + digits.replace(/[0-9]/g, unleet))
+    .replace(/([bdgjkpt])h/g, '$1')
+    .replace(/([a-z])\1{2,}/g, '$1');
+
+/** @param {string} text */
+const escapeRegExp = text => text.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+
+// A doubled letter in a blocked word also matches one stretched past two,
+// which normalization has collapsed to a single letter ("asssshole")
+/** @param {string} word normalized */
+const wordPattern = word => word.replace(/([a-z])\1|[^a-z]/g, run => (run.length === 2 ? `${run[0]}{1,2}` : escapeRegExp(run)));
+
+/**
+ * Compiles the whole word list into one regex so a check is a single pass
+ * over the message instead of one scan per blocked word.
+ * @param {string[]} words
+ * @returns {(text: string) => boolean}
+ */
+export const compileBlockedWords = words => {
+  /** @type {string[]} */
+  const bounded = [];
+  /** @type {string[]} */
+  const anywhere = [];
+  for (const raw of words) {
+    const entry = raw.trim();
+    const word = normalizeForModeration(entry.replace(/^\*|\*$/g, ''));
+    if (!word) continue;
+    const pattern = wordPattern(word) + (entry.endsWith('*') ? '' : '(?![a-z])');
+    (entry.startsWith('*') ? anywhere : bounded).push(pattern);
+  }
+
+  /** @type {string[]} */
+  const parts = [];
+  if (bounded.length) parts.push(`(?:^|[^a-z])(?:${bounded.join('|')})`);
+  if (anywhere.length) parts.push(anywhere.join('|'));
+  if (!parts.length) return () => false;
+
+  const matcher = new RegExp(parts.join('|'));
+  return text => matcher.test(normalizeForModeration(text));
+};
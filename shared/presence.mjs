@@ -0,0 +1,113 @@
+// @ts-check
+// Presence
+// Users stay online while heartbeats keep arriving. Each heartbeat moves the
+// user's expiry into a slot of a timer wheel (one slot per second, one lap
+// per TTL), so heartbeats and expiries are O(1) per user and a tick only
+// looks at the slots that have come due. Joins and leaves are collected and
+// taken as one delta per broadcast instead of re-sending the full list.
+// Plain JS like shared/flood.mjs: the chat server runs the tracker, and the
+// app uses the same heartbeat interval.
+export const PRESENCE_HEARTBEAT_MS = 15000;
+export const PRESENCE_TTL_MS = 45000;
+export const PRESENCE_BROADCAST_MS = 1000;
+const PRESENCE_SLOT_MS = 1000;
+
+/** @typedef {{ joined: string[], left: string[] }} PresenceDelta */
+
+export class PresenceTracker {
+  // User to the absolute slot number of their expiry
+  /** @type {Map<string, number>} */
+  #slotOf = new Map();
+  /** @type {Set<string>[]} */
+  #wheel;
+  // Next slot to expire
+  #cursor;
+  #ttlMs;
+  /** @type {Set<string>} */
+  #joined = new Set();
+  /** @type {Set<string>} */
+  #left = new Set();
+
+  constructor(ttlMs = PRESENCE_TTL_MS, now = Date.now()) {
+    this.#ttlMs = ttlMs;
+    this.#wheel = Array.from({ length: Math.ceil(ttlMs / PRESENCE_SLOT_MS) + 1 }, () => new Set());
+    this.#cursor = Math.floor(now / PRESENCE_SLOT_MS);
+  }
+
+  get size() {
+    return this.#slotOf.size;
+  }
+
+  /**
+   * @param {string} user
+   * @param {number} [now]
+   */
+  heartbeat(user, now = Date.now()) {
+    this.expire(now);
+    const slot = Math.floor((now + this.#ttlMs) / PRESENCE_SLOT_MS);
+    const previous = this.#slotOf.get(user);
+    if (previous === slot) return;
+    if (previous === undefined) {
+      this.#markJoined(user);
+    } else {
+      this.#wheel[previous % this.#wheel.length].delete(user);
+    }
+    this.#wheel[slot % this.#wheel.length].add(user);
+    this.#slotOf.set(user, slot);
+  }
+
+  /** @param {string} user */
+  leave(user) {
+    const slot = this.#slotOf.get(user);
+    if (slot === undefined) return;
+    this.#wheel[slot % this.#wheel.length].delete(user);
+    this.#slotOf.delete(user);
+    this.#markLeft(user);
+  }
+
+  /** @param {string} user */
+  has(user) {
+    return this.#slotOf.has(user);
+  }
+
+  // Drops everyone whose expiry slot has passed
+  expire(now = Date.now()) {
+    const target = Math.floor(now / PRESENCE_SLOT_MS);
+    // After a long pause one lap of the wheel covers every slot
+    this.#cursor = Math.max(this.#cursor, target - this.#wheel.length);
+    for (; this.#cursor < target; this.#cursor++) {
+      const due = this.#wheel[this.#cursor % this.#wheel.length];
+      due.forEach(user => {
+        this.#slotOf.delete(user);
+        this.#markLeft(user);
+      });
+      due.clear();
+    }
+  }
+
+  /**
+   * Changes since the last call; a join and leave within one batch cancel out
+   * @returns {PresenceDelta | null}
+   */
+  takeDelta() {
+    if (!this.#joined.size && !this.#left.size) return null;
+    const delta = { joined: [...this.#joined], left: [...this.#left] };
+    this.#joined.clear();
+    this.#left.clear();
+    return delta;
+  }
+
+  snapshot() {
+    return [...this.#slotOf.keys()];
+  }
+
+  /** @param {string} user */
+  #markJoined(user) {
+    if (!this.#left.delete(user)) this.#joined.add(user);
+  }
+
+  /** @param {string} user */
+  #markLeft(user) {
+    if (!this.#joined.delete(user)) this.#left.add(user);
+  }
+}
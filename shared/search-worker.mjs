@@ -0,0 +1,183 @@
+// @ts-check
+// Chat search worker
+// An inverted index over message text, run in a worker and updated as
+// messages arrive (one posting per distinct token), so queries never scan
+// history. Tokens keep formula fragments ("x^2", "h2so4", "9.8") together,
+// fold Greek letters and superscripts, and map common JEE shorthand
+// ("phy", "eqn", "maths") to one spelling. The last query token also
+// matches as a prefix, for search-as-you-type. Removed messages are
+// tombstoned and compacted away in bulk.
+//
+// The worker is this source string: the app starts it from a Blob URL, and
+// Node can run it in a worker_threads Worker with a `self` shim.
+//
+// Messages, handled in order: { type: 'add', docs }, { type: 'remove', ids },
+// { type: 'clear' } and { type: 'query', id, query }, answered with
+// { id, results }.
+export const SEARCH_WORKER_SOURCE = `
+const SYMBOLS = {
+  '²': '^2', '³': '^3', '√': ' sqrt ', '∫': ' integral ',
+  'α': ' alpha ', 'β': ' beta ', 'γ': ' gamma ', 'δ': ' delta ', 'Δ': ' delta ', 'θ': ' theta ',
+  'λ': ' lambda ', 'μ': ' mu ', 'π': ' pi ', 'ρ': ' rho ', 'σ': ' sigma ', 'ω': ' omega ', 'Ω': ' omega '
+};
+const SYMBOL_PATTERN = new RegExp('[' + Object.keys(SYMBOLS).join('') + ']', 'g');
+const TOKEN_PATTERN = /[0-9]+\\.[0-9]+|[a-z0-9]+(?:\\^[a-z0-9]+)*/g;
+const KEEP_TRAILING_S = /(?:ss|us|is|ics)$/;
+const ALIASES = new Map([
+  ['phy', 'physics'], ['phys', 'physics'], ['chem', 'chemistry'], ['maths', 'math'], ['mathematics', 'math'],
+  ['eq', 'equation'], ['eqn', 'equation'], ['qn', 'question'], ['ques', 'question'], ['sol', 'solution'],
+  ['soln', 'solution'], ['thermo', 'thermodynamics'], ['mech', 'mechanics'], ['diff', 'differentiation'],
+  ['integ', 'integration'], ['pyq', 'previous year question']
+]);
+
+const tokenize = (text) => {
+  const tokens = [];
+  const folded = text.replace(SYMBOL_PATTERN, ch => SYMBOLS[ch]).toLowerCase();
+  for (const [raw] of folded.matchAll(TOKEN_PATTERN)) {
+    const token = raw.length > 3 && raw.endsWith('s') && !KEEP_TRAILING_S.test(raw) ? raw.slice(0, -1) : raw;
+    const alias = ALIASES.get(token);
+    if (alias) tokens.push(...alias.split(' '));
+    else tokens.push(token);
+  }
+  return tokens;
+};
+
+// Removed documents stay in the lists as tombstones until they make up this
+// share of the index (and at least COMPACT_MIN_REMOVED), then the index is
+// rebuilt without them
+const COMPACT_MIN_REMOVED = 1000;
+const COMPACT_REMOVED_SHARE = 0.25;
+
+// Documents are numbered in arrival order, so every posting list is sorted
+let ids = [], names = [], texts = [], times = [];
+let docOf = new Map();
+let removed = new Set();
+let postings = new Map();
+let byAuthor = new Map();
+let prefixes = new Map();
+
+const clear = () => {
+  ids = []; names = []; texts = []; times = [];
+  docOf = new Map();
+  removed = new Set();
+  postings = new Map();
+  byAuthor = new Map();
+  prefixes = new Map();
+};
+
+// Appends doc to the list under key; true when the list is new
+const post = (index, key, doc) => {
+  const list = index.get(key);
+  if (list) {
+    list.push(doc);
+    return false;
+  }
+  index.set(key, [doc]);
+  return true;
+};
+
+const add = ({ id, name, author, text, time }) => {
+  if (docOf.has(id)) return;
+  const doc = ids.length;
+  docOf.set(id, doc);
+  ids.push(id); names.push(name); texts.push(text); times.push(time);
+  post(byAuthor, author, doc);
+  for (const token of new Set(tokenize(text))) {
+    if (!post(postings, token, doc)) continue;
+    for (let n = 1; n <= Math.min(3, token.length); n++) post(prefixes, token.slice(0, n), token);
+  }
+};
+
+const remove = (id) => {
+  const doc = docOf.get(id);
+  if (doc === undefined) return;
+  removed.add(doc);
+  docOf.delete(id);
+};
+
+// Renumbers the live documents in order (so lists stay sorted) and drops
+// tombstones, emptied lists and prefixes of tokens that no longer occur
+const compact = () => {
+  const renumbered = new Int32Array(ids.length).fill(-1);
+  const live = { ids: [], names: [], texts: [], times: [] };
+  for (let doc = 0; doc < ids.length; doc++) {
+    if (removed.has(doc)) continue;
+    renumbered[doc] = live.ids.length;
+    live.ids.push(ids[doc]); live.names.push(names[doc]); live.texts.push(texts[doc]); live.times.push(times[doc]);
+  }
+  const remap = (index) => {
+    for (const [key, list] of index) {
+      const kept = [];
+      for (let i = 0; i < list.length; i++) if (renumbered[list[i]] >= 0) kept.push(renumbered[list[i]]);
+      if (kept.length) index.set(key, kept);
+      else index.delete(key);
+    }
+  };
+  remap(postings);
+  remap(byAuthor);
+  for (const [key, tokens] of prefixes) {
+    const kept = tokens.filter(token => postings.has(token));
+    if (kept.length) prefixes.set(key, kept);
+    else prefixes.delete(key);
+  }
+  ({ ids, names, texts, times } = live);
+  docOf = new Map(ids.map((id, doc) => [id, doc]));
+  removed = new Set();
+};
+
+const compactIfDue = () => {
+  if (removed.size >= COMPACT_MIN_REMOVED && removed.size >= ids.length * COMPACT_REMOVED_SHARE) compact();
+};
+
+const intersect = (a, b) => {
+  const out = [];
+  for (let i = 0, j = 0; i < a.length && j < b.length;) {
+    if (a[i] < b[j]) i++;
+    else if (a[i] > b[j]) j++;
+    else { out.push(a[i]); i++; j++; }
+  }
+  return out;
+};
+
+// Union of the postings of every token starting with prefix
+const expand = (prefix) => {
+  if (prefix.length < 2) return postings.get(prefix) || [];
+  const lists = (prefixes.get(prefix.slice(0, 3)) || [])
+    .filter(token => token.startsWith(prefix))
+    .map(token => postings.get(token));
+  if (lists.length < 2) return lists[0] || [];
+  const all = new Uint32Array(lists.reduce((size, list) => size + list.length, 0));
+  let at = 0;
+  for (const list of lists) { all.set(list, at); at += list.length; }
+  all.sort();
+  const out = [];
+  for (let i = 0; i < all.length; i++) if (all[i] !== all[i - 1]) out.push(all[i]);
+  return out;
+};
+
+const search = ({ text, prefix, author, from, to, limit }) => {
+  const tokens = tokenize(text);
+  let docs = author ? byAuthor.get(author) || [] : null;
+  tokens.forEach((token, i) => {
+    const list = prefix && i === tokens.length - 1 ? expand(token) : postings.get(token) || [];
+    docs = docs ? intersect(docs, list) : list;
+  });
+  if (!docs) return [];
+  const hits = [];
+  for (let i = 0; i < docs.length; i++) {
+    const doc = docs[i];
+    if (removed.has(doc) || (from != null && times[doc] < from) || (to != null && times[doc] > to)) continue;
+    hits.push(doc);
+  }
+  hits.sort((a, b) => times[b] - times[a]);
+  return hits.slice(0, limit).map(doc => ({ id: ids[doc], name: names[doc], text: texts[doc], time: times[doc] }));
+};
+
+self.onmessage = (event) => {
+  const message = event.data;
+  if (message.type === 'add') message.docs.forEach(add);
+  else if (message.type === 'remove') { message.ids.forEach(remove); compactIfDue(); }
+  else if (message.type === 'clear') clear();
+  else if (message.type === 'query') self.postMessage({ id: message.id, results: search(message.query) });
+};
+`;
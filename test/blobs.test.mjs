@@ -0,0 +1,101 @@
+// @ts-check
+import assert from 'node:assert/strict';
+import { randomBytes } from 'node:crypto';
+import { after, before, test } from 'node:test';
+import { startServer } from '../server/index.mjs';
+import { BlobUploader, UPLOAD_CHUNK_BYTES, hashBlob } from '../shared/blobs.mjs';
+
+/** @type {Awaited<ReturnType<typeof startServer>>} */
+let server;
+before(async () => {
+  server = await startServer();
+});
+after(() => server.close());
+
+/** @param {string} hash */
+const url = hash => `${server.origin}/blobs/${hash}`;
+const uploader = () => new BlobUploader({ url, retryDelayMs: 1 });
+
+const randomBlob = async (size = 2.5 * UPLOAD_CHUNK_BYTES) => {
+  const blob = new Blob([randomBytes(size)]);
+  return { blob, hash: await hashBlob(blob) };
+};
+
+/**
+ * Upload body bytes the server took in while run ran
+ * @param {() => Promise<unknown>} run
+ */
+const bytesOnTheWire = async run => {
+  const before = server.blobs.bytesReceived;
+  await run();
+  return server.blobs.bytesReceived - before;
+};
+
+test('a blob goes up once, in chunks, and comes back intact', async () => {
+  const { blob, hash } = await randomBlob();
+  assert.equal((await fetch(url(hash), { method: 'HEAD' })).status, 404);
+
+  assert.equal(await bytesOnTheWire(() => uploader().upload(hash, blob)), blob.size);
+  const head = await fetch(url(hash), { method: 'HEAD' });
+  assert.equal(head.status, 200);
+  assert.equal(head.headers.get('Content-Length'), String(blob.size));
+  const body = new Uint8Array(await (await fetch(url(hash))).arrayBuffer());
+  assert.deepEqual(body, new Uint8Array(await blob.arrayBuffer()));
+
+  // Another student sharing the same screenshot sends nothing
+  assert.equal(await bytesOnTheWire(() => uploader().upload(hash, blob)), 0);
+});
+
+test('the same tab uploads a hash once however often it is sent', async () => {
+  const { blob, hash } = await randomBlob();
+  const client = uploader();
+  const sent = await bytesOnTheWire(() => Promise.all([client.upload(hash, blob), client.upload(hash, blob)]));
+  assert.equal(sent, blob.size);
+  assert.equal(await bytesOnTheWire(() => client.upload(hash, blob)), 0);
+});
+
+test('an interrupted upload resumes from the server offset', async () => {
+  const { blob, hash } = await randomBlob();
+  // The first chunk made it before the connection dropped
+  const first = await fetch(url(hash), {
+    method: 'PATCH',
+    headers: { 'Upload-Offset': '0', 'Upload-Length': String(blob.size) },
+    body: blob.slice(0, UPLOAD_CHUNK_BYTES)
+  });
+  assert.equal(first.status, 204);
+  const head = await fetch(url(hash), { method: 'HEAD' });
+  assert.equal(head.status, 404);
+  assert.equal(head.headers.get('Upload-Offset'), String(UPLOAD_CHUNK_BYTES));
+
+  assert.equal(await bytesOnTheWire(() => uploader().upload(hash, blob)), blob.size - UPLOAD_CHUNK_BYTES);
+  assert.equal((await fetch(url(hash), { method: 'HEAD' })).status, 200);
+});
+
+test('a patch at the wrong offset gets 409 and the current offset', async () => {
+  const { blob, hash } = await randomBlob();
+  const patch = (/** @type {number} */ offset) =>
+    fetch(url(hash), {
+      method: 'PATCH',
+      headers: { 'Upload-Offset': String(offset), 'Upload-Length': String(blob.size) },
+      body: blob.slice(offset, offset + UPLOAD_CHUNK_BYTES)
+    });
+  assert.equal((await patch(0)).status, 204);
+  const conflict = await patch(2 * UPLOAD_CHUNK_BYTES);
+  assert.equal(conflict.status, 409);
+  assert.equal(conflict.headers.get('Upload-Offset'), String(UPLOAD_CHUNK_BYTES));
+  assert.equal(await bytesOnTheWire(() => uploader().upload(hash, blob)), blob.size - UPLOAD_CHUNK_BYTES);
+});
+
+test('bytes that do not match their hash are dropped', async () => {
+  const { hash } = await randomBlob(1024);
+  const wrong = randomBytes(1024);
+  const response = await fetch(url(hash), {
+    method: 'PATCH',
+    headers: { 'Upload-Offset': '0', 'Upload-Length': '1024' },
+    body: wrong
+  });
+  assert.equal(response.status, 400);
+  const head = await fetch(url(hash), { method: 'HEAD' });
+  assert.equal(head.status, 404);
+  assert.equal(head.headers.get('Upload-Offset'), '0');
+});
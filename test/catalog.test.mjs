@@ -0,0 +1,177 @@
+// @ts-check
+import assert from 'node:assert/strict';
+import { after, before, test } from 'node:test';
+import { startServer } from '../server/index.mjs';
+import { CATALOG_PAGE_SIZE, HttpCache, catalogUrl, downloadResource } from '../shared/catalog.mjs';
+
+/** @typedef {import('../shared/catalog.mjs').CatalogPage} CatalogPage */
+
+const MAX_AGE_S = 60;
+const STALE_S = 600;
+
+/** @type {Awaited<ReturnType<typeof startServer>>} */
+let server;
+before(async () => {
+  server = await startServer({ catalog: { maxAgeS: MAX_AGE_S, staleS: STALE_S } });
+});
+after(() => server.close());
+
+/**
+ * @param {import('../shared/catalog.mjs').CatalogQuery} query
+ * @param {string} [cursor]
+ */
+const url = (query, cursor) => `${server.origin}${catalogUrl(query, cursor)}`;
+
+// An HttpCache on a clock the test moves
+const cacheWithClock = () => {
+  const clock = { now: 0 };
+  return { clock, cache: new HttpCache({ now: () => clock.now }) };
+};
+
+/**
+ * Catalog requests the server answered while run ran, and how many were 304
+ * @param {() => Promise<unknown>} run
+ */
+const requestsDuring = async run => {
+  const { requests, notModified } = server.catalog;
+  await run();
+  return { requests: server.catalog.requests - requests, notModified: server.catalog.notModified - notModified };
+};
+
+test('the catalog pages through 10k items with filters and a cursor', async () => {
+  const first = /** @type {CatalogPage} */ (await (await fetch(url({}))).json());
+  assert.equal(first.total, 10000);
+  assert.equal(first.items.length, CATALOG_PAGE_SIZE);
+
+  const query = /** @type {const} */ ({ subject: 'physics', type: 'pyq' });
+  /** @type {Set<number>} */
+  const seen = new Set();
+  let total = 0;
+  /** @type {string | undefined} */
+  let cursor;
+  do {
+    const page = /** @type {CatalogPage} */ (await (await fetch(url(query, cursor))).json());
+    total = page.total;
+    for (const item of page.items) {
+      assert.equal(item.subject, 'physics');
+      assert.equal(item.type, 'pyq');
+      assert.ok(!seen.has(item.id), `item ${item.id} repeated`);
+      seen.add(item.id);
+    }
+    cursor = page.nextCursor ?? undefined;
+  } while (cursor);
+  assert.equal(seen.size, total);
+
+  const [paper] = first.items;
+  assert.ok(paper.year);
+  const byYear = /** @type {CatalogPage} */ (await (await fetch(url({ year: paper.year }))).json());
+  assert.ok(byYear.items.every(item => item.year === paper.year));
+  assert.equal((await fetch(`${server.origin}/catalog?cursor=nope`)).status, 400);
+});
+
+test('a page carries an ETag and Cache-Control, and a matching If-None-Match gets a 304', async () => {
+  const response = await fetch(url({ subject: 'chemistry' }));
+  const etag = response.headers.get('ETag');
+  assert.ok(etag);
+  assert.equal(response.headers.get('Cache-Control'), `public, max-age=${MAX_AGE_S}, stale-while-revalidate=${STALE_S}`);
+  await response.arrayBuffer();
+
+  const revalidated = await fetch(url({ subject: 'chemistry' }), { headers: { 'If-None-Match': etag } });
+  assert.equal(revalidated.status, 304);
+  assert.equal(revalidated.headers.get('ETag'), etag);
+  assert.equal((await revalidated.arrayBuffer()).byteLength, 0);
+  assert.equal((await fetch(url({ subject: 'math' }), { headers: { 'If-None-Match': etag } })).status, 200);
+});
+
+test('HttpCache serves fresh pages from memory and revalidates stale ones with the ETag', async () => {
+  const { clock, cache } = cacheWithClock();
+  const pageUrl = url({ subject: 'math', type: 'formulas' });
+  /** @type {CatalogPage} */
+  let page = /** @type {any} */ (undefined);
+  assert.deepEqual(
+    await requestsDuring(async () => {
+      page = await cache.get(pageUrl);
+    }),
+    { requests: 1, notModified: 0 }
+  );
+
+  // Within max-age: no request
+  clock.now += (MAX_AGE_S - 1) * 1000;
+  assert.deepEqual(await requestsDuring(async () => assert.equal(await cache.get(pageUrl), page)), {
+    requests: 0,
+    notModified: 0
+  });
+
+  // Stale: the cached page at once, and a bodiless 304 behind it
+  clock.now += 2 * 1000;
+  /** @type {CatalogPage[]} */
+  const updates = [];
+  assert.deepEqual(
+    await requestsDuring(async () => {
+      assert.equal(await cache.get(pageUrl, update => updates.push(update)), page);
+      await new Promise(resolve => setTimeout(resolve, 50));
+    }),
+    { requests: 1, notModified: 1 }
+  );
+  assert.deepEqual(updates, []);
+
+  // The 304 restarted max-age
+  assert.deepEqual(await requestsDuring(() => cache.get(pageUrl)), { requests: 0, notModified: 0 });
+});
+
+test('a stale page that changed on the server comes back through onUpdate', async () => {
+  const { clock, cache } = cacheWithClock();
+  const pageUrl = url({ subject: 'physics', type: 'ncert' });
+  /** @type {CatalogPage} */
+  const page = await cache.get(pageUrl);
+  const [item] = page.items;
+  server.catalog.update(item.id, { title: `${item.title} (corrected)` });
+
+  clock.now += (MAX_AGE_S + 1) * 1000;
+  /** @type {CatalogPage} */
+  const updated = await new Promise((resolve, reject) => {
+    cache.get(pageUrl, resolve).then(stale => assert.equal(stale, page), reject);
+  });
+  assert.equal(updated.items[0].title, `${item.title} (corrected)`);
+  assert.equal(await cache.get(pageUrl), updated);
+});
+
+test('past stale-while-revalidate the request waits for the network', async () => {
+  const { clock, cache } = cacheWithClock();
+  const pageUrl = url({ type: 'formulas' });
+  /** @type {CatalogPage} */
+  const page = await cache.get(pageUrl);
+  const [item] = page.items;
+  server.catalog.update(item.id, { description: 'Revised.' });
+
+  clock.now += (MAX_AGE_S + STALE_S + 1) * 1000;
+  /** @type {CatalogPage} */
+  let fresh = /** @type {any} */ (undefined);
+  assert.deepEqual(
+    await requestsDuring(async () => {
+      fresh = await cache.get(pageUrl);
+    }),
+    { requests: 1, notModified: 0 }
+  );
+  assert.equal(fresh.items[0].description, 'Revised.');
+});
+
+test('a download streams in parts and reports progress up to 1', async () => {
+  const page = /** @type {CatalogPage} */ (await (await fetch(url({ type: 'pyq' }))).json());
+  const resource = page.items.reduce((largest, item) => ((item.sizeBytes ?? 0) > (largest.sizeBytes ?? 0) ? item : largest));
+  assert.ok((resource.sizeBytes ?? 0) > 1024 * 1024, 'expected a file over 1 MB on the first page');
+
+  /** @type {(number | null)[]} */
+  const progress = [];
+  const blob = await downloadResource({ ...resource, url: `${server.origin}${resource.url}` }, fraction =>
+    progress.push(fraction)
+  );
+  assert.equal(blob.size, resource.sizeBytes);
+  assert.equal(blob.type, 'application/pdf');
+  assert.ok(progress.length > 1, `expected several progress updates, got ${progress.length}`);
+  assert.ok(progress.every((fraction, i) => fraction !== null && (i === 0 || fraction >= /** @type {number} */ (progress[i - 1]))));
+  assert.equal(progress.at(-1), 1);
+
+  const missing = downloadResource({ ...resource, url: `${server.origin}/resources/${resource.id}/wrong.pdf` }, () => {});
+  await assert.rejects(missing, /Download failed \(404\)/);
+});
@@ -0,0 +1,158 @@
+// @ts-check
+import assert from 'node:assert/strict';
+import { after, before, test } from 'node:test';
+import { setTimeout as sleep } from 'node:timers/promises';
+import WebSocket from 'ws';
+import { startServer } from '../server/index.mjs';
+import { ModerationPipeline, createDefaultStages } from '../shared/moderation-pipeline.mjs';
+
+// Messages starting with this take a while to moderate
+const SLOW_MARK = '[slow]';
+
+/** @type {Awaited<ReturnType<typeof startServer>>} */
+let server;
+before(async () => {
+  const slowStage = {
+    name: 'slow',
+    timeoutMs: 1000,
+    fallback: /** @type {const} */ ('allow'),
+    applies: (/** @type {{ text: string }} */ { text }) => text.startsWith(SLOW_MARK),
+    check: async () => {
+      await sleep(50);
+      return { action: /** @type {const} */ ('allow') };
+    }
+  };
+  server = await startServer({ chat: { moderation: new ModerationPipeline([...createDefaultStages(), slowStage]) } });
+});
+after(() => server.close());
+
+/**
+ * Connects and says hello; `next(type)` resolves with the next event of that type
+ * @param {string} name
+ * @param {{ channels?: string[], resumeAfter?: string | null, port?: number }} [hello]
+ */
+const connect = async (name, { channels = ['general'], resumeAfter = null, port = server.port } = {}) => {
+  const socket = new WebSocket(`ws://127.0.0.1:${port}/chat`);
+  /** @type {any[]} */
+  const events = [];
+  /** @type {(() => void)[]} */
+  const waiting = [];
+  socket.on('message', raw => {
+    events.push(JSON.parse(String(raw)));
+    waiting.splice(0).forEach(wake => wake());
+  });
+  await new Promise(resolve => socket.once('open', resolve));
+  socket.send(JSON.stringify({ type: 'hello', name, resumeAfter, channels }));
+  /** @param {string} type */
+  const next = async type => {
+    for (;;) {
+      const index = events.findIndex(event => event.type === type);
+      if (index !== -1) return events.splice(index, 1)[0];
+      await new Promise(resolve => waiting.push(() => resolve(undefined)));
+    }
+  };
+  /** @param {string} clientId @param {string} text @param {string} [channel] */
+  const send = (clientId, text, channel = 'general') =>
+    socket.send(JSON.stringify({ type: 'messages', messages: [{ id: clientId, clientId, name, text, timestamp: Date.now(), channel }] }));
+  return { socket, events, next, send };
+};
+
+test('messages reach subscribers of their channel only, and the sender gets an ack', async () => {
+  const asha = await connect('asha', { channels: ['general', 'group:1'] });
+  const ravi = await connect('ravi', { channels: ['general', 'group:1'] });
+  const meera = await connect('meera');
+  await Promise.all([asha.next('presence'), ravi.next('presence'), meera.next('presence')]);
+
+  asha.send('c1', 'Anyone solved Irodov 1.23?', 'group:1');
+  const [{ acks }, { messages }] = await Promise.all([asha.next('acks'), ravi.next('messages')]);
+  assert.equal(acks[0].clientId, 'c1');
+  assert.equal(messages[0].id, acks[0].id);
+  assert.equal(messages[0].channel, 'group:1');
+
+  meera.send('c2', 'hello everyone');
+  await meera.next('acks');
+  assert.equal((await ravi.next('messages')).messages[0].text, 'hello everyone');
+  assert.ok(!meera.events.some(event => event.type === 'messages' && event.messages.some(m => m.channel === 'group:1')));
+  [asha, ravi, meera].forEach(client => client.socket.close());
+});
+
+test('a re-sent client id is acked again but posted once', async () => {
+  const asha = await connect('asha2');
+  const ravi = await connect('ravi2');
+  await Promise.all([asha.next('presence'), ravi.next('presence')]);
+
+  asha.send('same', 'What is the unit of permittivity?');
+  const first = (await asha.next('acks')).acks[0];
+  asha.send('same', 'What is the unit of permittivity?');
+  const second = (await asha.next('acks')).acks[0];
+
+  assert.equal(second.id, first.id);
+  await new Promise(resolve => setTimeout(resolve, 50));
+  const copies = ravi.events
+    .filter(event => event.type === 'messages')
+    .flatMap(event => event.messages)
+    .filter(message => message.id === first.id);
+  assert.equal(copies.length, 1);
+  [asha, ravi].forEach(client => client.socket.close());
+});
+
+test('a slow check holds back later messages instead of being overtaken', async () => {
+  const asha = await connect('asha4');
+  const ravi = await connect('ravi4');
+  await Promise.all([asha.next('presence'), ravi.next('presence')]);
+
+  const message = (/** @type {string} */ clientId, /** @type {string} */ text) =>
+    ({ id: clientId, clientId, name: 'asha4', text, timestamp: Date.now(), channel: 'general' });
+  asha.socket.send(JSON.stringify({ type: 'messages', messages: [message('o1', `${SLOW_MARK} one`), message('o2', 'two')] }));
+  asha.send('o3', 'three');
+
+  // Past the history ravi got on connect
+  /** @type {{ id: string, name: string, text: string }[]} */
+  const received = [];
+  while (received.length < 3) {
+    received.push(...(await ravi.next('messages')).messages.filter((/** @type {{ name: string }} */ m) => m.name === 'asha4'));
+  }
+  assert.deepEqual(received.map(m => m.text), [`${SLOW_MARK} one`, 'two', 'three']);
+  assert.deepEqual(received.map(m => m.id), received.map(m => m.id).sort());
+  [asha, ravi].forEach(client => client.socket.close());
+});
+
+test('a reconnecting client gets what it missed after resumeAfter', async () => {
+  const asha = await connect('asha3');
+  await asha.next('presence');
+  asha.send('r1', 'first');
+  const seen = (await asha.next('acks')).acks[0].id;
+  asha.send('r2', 'second');
+  await asha.next('acks');
+  asha.socket.close();
+
+  const again = await connect('asha3', { resumeAfter: seen });
+  const { messages } = await again.next('messages');
+  assert.deepEqual(messages.map((/** @type {{ text: string }} */ m) => m.text), ['second']);
+  again.socket.close();
+});
+
+test('banned users are rejected', async () => {
+  const troll = await connect('troll');
+  await troll.next('presence');
+  server.chat.ban('Troll');
+  troll.send('b1', 'spam');
+  assert.equal((await troll.next('acks')).acks[0].rejected, 'banned');
+  troll.socket.close();
+});
+
+test('closing the server drops acks still held back', async () => {
+  const held = await startServer({ chat: { ackDelayMs: 60000 } });
+  const timers = () => process.getActiveResourcesInfo().filter(resource => resource === 'Timeout').length;
+  const asha = await connect('asha6', { port: held.port });
+  await asha.next('presence');
+  const before = timers();
+
+  asha.send('h1', 'held back for a minute');
+  // Moderation's own timers are gone once the ack is scheduled
+  await sleep(50);
+  assert.equal(timers(), before + 1);
+  await held.close();
+  assert.equal(timers(), before);
+  assert.ok(!asha.events.some(event => event.type === 'acks'));
+});
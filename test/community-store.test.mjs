@@ -0,0 +1,108 @@
+// @ts-check
+import assert from 'node:assert/strict';
+import { test } from 'node:test';
+import { loadApp, setupDom } from './support/dom.mjs';
+
+setupDom();
+const app = await loadApp();
+
+test('a session restored after connecting still subscribes its groups', () => {
+  const store = app.createStore(app.communityReducer, app.createCommunityState());
+  /** @type {[number, boolean][]} */
+  const calls = [];
+  const transport = {
+    /** @param {number} groupId @param {boolean} joined */
+    setGroupMembership: (groupId, joined) => calls.push([groupId, joined])
+  };
+  const unfollow = app.followJoinedGroups(store, transport);
+  assert.deepEqual(calls, []);
+
+  // The snapshot lands after the transport connected with no groups
+  store.dispatch({
+    type: 'hydrate',
+    snapshot: { version: 1, bannedUsers: [], flaggedMessages: [], joinedGroups: ['2', '3'] }
+  });
+  assert.deepEqual(calls, [[2, true], [3, true]]);
+
+  store.dispatch({ type: 'leaveGroup', groupId: 2 });
+  store.dispatch({ type: 'joinGroup', groupId: 1 });
+  assert.deepEqual(calls.slice(2), [[2, false], [1, true]]);
+
+  unfollow();
+  store.dispatch({ type: 'leaveGroup', groupId: 1 });
+  assert.equal(calls.length, 4);
+});
+
+/**
+ * @param {string} id
+ * @param {boolean} isFlagged
+ * @param {string} [name]
+ */
+const message = (id, isFlagged, name = 'Asha') => ({
+  id,
+  name,
+  text: 'hi',
+  timestamp: new Date(1700000000000),
+  channel: 'general',
+  isFlagged
+});
+const AT = 1700000000000;
+
+test('counting messages and flags leaves the previous state untouched', () => {
+  const first = app.communityReducer(app.createCommunityState(), {
+    type: 'messagesAdded',
+    messages: [message('1', true)],
+    at: AT
+  });
+  const messagesBefore = new Map(first.stats.messagesByUser);
+  const flagsBefore = new Map(first.stats.flagsByUser);
+  const second = app.communityReducer(first, {
+    type: 'messagesAdded',
+    messages: [message('2', true), message('3', false, 'Ravi')],
+    at: AT + 1000
+  });
+
+  assert.deepEqual(first.stats.messagesByUser, messagesBefore);
+  assert.deepEqual(first.stats.flagsByUser, flagsBefore);
+  assert.deepEqual([...second.stats.messagesByUser], [['asha', 2], ['ravi', 1]]);
+  assert.equal(second.stats.flagsByUser.get('asha'), 2);
+  assert.deepEqual(second.stats.topFlagged, { name: 'asha', count: 2 });
+  assert.equal(second.stats.messageCount, 3);
+  // Same action, same state: the time comes from the action
+  assert.deepEqual(
+    app.communityReducer(first, { type: 'messagesAdded', messages: [message('2', true)], at: AT }).stats,
+    app.communityReducer(first, { type: 'messagesAdded', messages: [message('2', true)], at: AT }).stats
+  );
+});
+
+test('a flag the server clears comes off the counters', () => {
+  const flagged = app.communityReducer(app.createCommunityState(), {
+    type: 'messagesAdded',
+    messages: [message('1', true), message('2', true), message('3', true, 'Ravi')],
+    at: AT
+  });
+  assert.equal(flagged.stats.flagCount, 3);
+
+  // '1' is cleared; '3' moves to its server id and stays flagged
+  const reconciled = app.communityReducer(flagged, {
+    type: 'messagesReconciled',
+    updates: [
+      { previousId: '1', message: message('1', false) },
+      { previousId: '3', message: message('30', true, 'Ravi') }
+    ],
+    at: AT + 1000
+  });
+  assert.equal(reconciled.stats.flagCount, 2);
+  assert.deepEqual([...reconciled.stats.flagsByUser], [['asha', 1], ['ravi', 1]]);
+  assert.deepEqual(reconciled.flagQueue, ['2', '30']);
+  assert.equal(flagged.stats.flagsByUser.get('asha'), 2);
+
+  const cleared = app.communityReducer(reconciled, {
+    type: 'messagesReconciled',
+    updates: [{ previousId: '2', message: message('2', false) }],
+    at: AT + 2000
+  });
+  assert.equal(cleared.stats.flagCount, 1);
+  assert.deepEqual([...cleared.stats.flagsByUser], [['ravi', 1]]);
+  assert.deepEqual(cleared.stats.topFlagged, { name: 'ravi', count: 1 });
+});
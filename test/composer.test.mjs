@@ -0,0 +1,71 @@
+// @ts-check
+import assert from 'node:assert/strict';
+import { test } from 'node:test';
+import { buttonLabelled, click, loadApp, recordRenders, render, setupDom, typeInto, waitFor } from './support/dom.mjs';
+
+setupDom();
+// Before React DOM loads, so it finds the hook
+const renders = recordRenders();
+const { default: React } = await import('react');
+const app = await loadApp();
+const h = React.createElement;
+
+// Composer's memo fiber is the one given onSend
+/** @param {any} fiber */
+const isComposer = fiber => typeof fiber.memoizedProps?.onSend === 'function' && 'userName' in fiber.memoizedProps;
+
+/** @param {any} fiber */
+const componentName = fiber => fiber.type?.displayName || fiber.type?.name || `<tag ${fiber.tag}>`;
+
+/** @param {any} fiber */
+const insideComposer = fiber => {
+  for (let at = fiber; at; at = at.return) if (isComposer(at)) return true;
+  return false;
+};
+
+test('typing re-renders the composer and nothing else', async () => {
+  let commits = 0;
+  const view = await render(
+    h(React.Profiler, { id: 'app', onRender: () => commits++ }, h(app.default))
+  );
+  await typeInto(/** @type {HTMLInputElement} */ (view.container.querySelector('#name')), 'asha');
+  await click(buttonLabelled(view.container, 'Join JEE Prep Community'));
+
+  // A few rows that typing must leave alone
+  const composer = /** @type {HTMLInputElement} */ (view.container.querySelector('input[placeholder^="Type your message"]'));
+  for (const text of ['Gauss law doubt', 'Kinematics doubt', 'Mole concept doubt']) {
+    await typeInto(composer, text);
+    await click(buttonLabelled(view.container, 'Send'));
+  }
+  await waitFor(() => view.container.textContent?.includes('Mole concept doubt') ?? false);
+
+  renders.length = 0;
+  commits = 0;
+  const draft = 'Can someone explain Gauss law?';
+  for (let i = 1; i <= draft.length; i++) await typeInto(composer, draft.slice(0, i));
+
+  assert.equal(commits, draft.length);
+  assert.equal(renders.length, draft.length);
+  for (const rendered of renders) {
+    assert.ok(rendered.some(isComposer), 'the composer rendered');
+    assert.deepEqual(rendered.filter(fiber => !insideComposer(fiber)).map(componentName), [], 'only the composer rendered');
+  }
+  await view.unmount();
+});
+
+test('the draft survives switching tabs', async () => {
+  const view = await render(h(app.default));
+
+  await typeInto(/** @type {HTMLInputElement} */ (view.container.querySelector('#name')), 'asha');
+  await click(buttonLabelled(view.container, 'Join JEE Prep Community'));
+
+  const composer = () =>
+    /** @type {HTMLInputElement} */ (view.container.querySelector('input[placeholder^="Type your message"]'));
+  await typeInto(composer(), 'half-written doubt');
+  await click(buttonLabelled(view.container, 'JEE Resources'));
+  await click(buttonLabelled(view.container, 'Study Groups'));
+  await click(buttonLabelled(view.container, 'Chat'));
+
+  assert.equal(composer().value, 'half-written doubt');
+  await view.unmount();
+});
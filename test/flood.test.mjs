@@ -0,0 +1,82 @@
+// @ts-check
+import assert from 'node:assert/strict';
+import { test } from 'node:test';
+import { FloodGuard, hashForFlood, normalizeUserName } from '../shared/flood.mjs';
+
+test('a burst past the bucket is throttled', () => {
+  const guard = new FloodGuard();
+  const verdicts = Array.from({ length: 7 }, (_, i) => guard.check('asha', `doubt number ${i}`, 0));
+  assert.deepEqual(verdicts, ['ok', 'ok', 'ok', 'ok', 'ok', 'throttled', 'throttled']);
+});
+
+test('tokens refill at one per second up to the burst size', () => {
+  const guard = new FloodGuard();
+  for (let i = 0; i < 5; i++) guard.check('asha', `doubt ${i}`, 0);
+  assert.equal(guard.check('asha', 'too soon', 500), 'throttled');
+  assert.equal(guard.check('asha', 'one token back', 1000), 'ok');
+  assert.equal(guard.check('asha', 'spent again', 1000), 'throttled');
+
+  // A long pause refills to the burst size, not beyond it
+  const later = 60000;
+  const verdicts = Array.from({ length: 6 }, (_, i) => guard.check('asha', `after a break ${i}`, later));
+  assert.equal(verdicts.filter(verdict => verdict === 'ok').length, 5);
+  assert.equal(verdicts[5], 'throttled');
+});
+
+test('throttled sends do not spend tokens or count as repeats', () => {
+  const guard = new FloodGuard();
+  for (let i = 0; i < 5; i++) guard.check('asha', `doubt ${i}`, 0);
+  for (let i = 0; i < 3; i++) assert.equal(guard.check('asha', 'same text', 100), 'throttled');
+  assert.equal(guard.check('asha', 'same text', 1100), 'ok');
+});
+
+test('users have separate buckets', () => {
+  const guard = new FloodGuard();
+  for (let i = 0; i < 5; i++) guard.check('asha', `doubt ${i}`, 0);
+  assert.equal(guard.check('asha', 'again', 0), 'throttled');
+  assert.equal(guard.check('ravi', 'hello', 0), 'ok');
+});
+
+test('the third repeat within the window is flagged as a duplicate', () => {
+  const guard = new FloodGuard();
+  const at = (/** @type {number} */ i) => i * 2000;
+  assert.equal(guard.check('asha', 'pls help with rotation', at(0)), 'ok');
+  assert.equal(guard.check('asha', 'pls help with rotation', at(1)), 'ok');
+  assert.equal(guard.check('asha', 'pls help with rotation', at(2)), 'duplicate');
+  assert.equal(guard.check('asha', 'pls help with rotation', at(3)), 'duplicate');
+});
+
+test('near-duplicates hash the same; different text does not', () => {
+  assert.equal(hashForFlood('Pls help!!'), hashForFlood('pls   heeelp'));
+  assert.equal(hashForFlood('PLS HELP'), hashForFlood('pls, help.'));
+  assert.notEqual(hashForFlood('pls help'), hashForFlood('pls halp'));
+
+  const guard = new FloodGuard();
+  const texts = ['Pls help!!', 'pls   heeelp', 'PLS HELP?'];
+  const verdicts = texts.map((text, i) => guard.check('asha', text, i * 2000));
+  assert.deepEqual(verdicts, ['ok', 'ok', 'duplicate']);
+});
+
+test('repeats age out of the ring of recent messages', () => {
+  const guard = new FloodGuard();
+  let now = 0;
+  const send = (/** @type {string} */ text) => guard.check('asha', text, (now += 2000));
+  send('same doubt');
+  send('same doubt');
+  // Eight other messages push both copies out of the window
+  for (let i = 0; i < 8; i++) send(`other ${i}`);
+  assert.equal(send('same doubt'), 'ok');
+});
+
+test('idle users are forgotten', () => {
+  const guard = new FloodGuard();
+  for (let i = 0; i < 1000; i++) guard.check(`user${i}`, 'hi', 0);
+  assert.equal(guard.size, 1000);
+  // The periodic sweep drops everyone idle for over five minutes
+  for (let i = 0; i < 4096; i++) guard.check('active', `message ${i}`, 10 * 60 * 1000 + i * 1000);
+  assert.equal(guard.size, 1);
+});
+
+test('names are keyed case- and space-insensitively', () => {
+  assert.equal(normalizeUserName('  Asha '), 'asha');
+});
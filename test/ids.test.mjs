@@ -0,0 +1,71 @@
+// @ts-check
+import assert from 'node:assert/strict';
+import { test } from 'node:test';
+import { ID_SEQUENCE_LIMIT, createIdGenerator } from '../shared/ids.mjs';
+
+/**
+ * Each id sorts strictly after the one before it (so all are unique)
+ * @param {string[]} ids
+ */
+const assertIncreasing = ids => {
+  for (let i = 1; i < ids.length; i++) {
+    if (!(ids[i - 1] < ids[i])) assert.fail(`id ${i} (${ids[i]}) does not sort after ${ids[i - 1]}`);
+  }
+};
+
+test('a burst within one millisecond stays unique and ordered', () => {
+  const next = createIdGenerator({ node: '0000', now: () => 1700000000000 });
+  const ids = Array.from({ length: 100000 }, next);
+  assertIncreasing(ids);
+  assert.equal(ids[0].length, 18);
+});
+
+test('a burst on the real clock stays unique and ordered', () => {
+  const next = createIdGenerator();
+  assertIncreasing(Array.from({ length: 200000 }, next));
+});
+
+test('ids never go backwards when the clock does', () => {
+  let seed = 7;
+  const random = () => {
+    seed = (Math.imul(seed, 1103515245) + 12345) >>> 0;
+    return seed / 2 ** 32;
+  };
+  let clock = 1700000000000;
+  // Mostly forward, sometimes stalled, sometimes stepped back by up to 2s (NTP)
+  const next = createIdGenerator({
+    now: () => {
+      const roll = random();
+      clock += roll < 0.6 ? Math.floor(random() * 3) : roll < 0.9 ? 0 : -Math.floor(random() * 2000);
+      return clock;
+    }
+  });
+  assertIncreasing(Array.from({ length: 50000 }, next));
+});
+
+test('a full sequence rolls into the next millisecond', () => {
+  const next = createIdGenerator({ node: 'ABCD', now: () => 1700000000000 });
+  const ids = Array.from({ length: ID_SEQUENCE_LIMIT + 10 }, next);
+  assertIncreasing(ids);
+  const time = (/** @type {string} */ id) => id.slice(0, 10);
+  assert.notEqual(time(ids[0]), time(ids[ids.length - 1]));
+  // Later ids stay on the borrowed millisecond until the clock passes it
+  assert.equal(time(ids[ID_SEQUENCE_LIMIT]), time(ids[ids.length - 1]));
+});
+
+test('ids from different nodes sort by time and never collide', () => {
+  let clock = 1700000000000;
+  const now = () => clock;
+  const a = createIdGenerator({ node: 'AAAA', now });
+  const b = createIdGenerator({ node: 'BBBB', now });
+  const ids = new Set();
+  const ordered = [];
+  for (let ms = 0; ms < 1000; ms++) {
+    clock++;
+    const batch = [a(), b(), a()];
+    batch.forEach(id => ids.add(id));
+    ordered.push(batch.sort());
+  }
+  assert.equal(ids.size, 3000);
+  assertIncreasing(ordered.map(batch => batch[0]));
+});
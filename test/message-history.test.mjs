@@ -0,0 +1,167 @@
+// @ts-check
+import 'fake-indexeddb/auto';
+import assert from 'node:assert/strict';
+import { test } from 'node:test';
+import { loadApp, render, setupDom, waitFor } from './support/dom.mjs';
+
+setupDom();
+const { default: React, act } = await import('react');
+const app = await loadApp();
+const h = React.createElement;
+const MAX_RESIDENT = app.MAX_RESIDENT_PAGES * app.HISTORY_PAGE_SIZE;
+
+/** @param {number} i */
+const messageId = i => String(i).padStart(18, '0');
+
+/** @param {number} i */
+const makeMessage = i => ({
+  id: messageId(i),
+  name: `student${i % 5}`,
+  text: `Message ${i}: which book for organic chemistry?`,
+  timestamp: new Date(1700000000000 + i * 1000),
+  channel: 'general'
+});
+
+/**
+ * Messages from (inclusive) to (exclusive)
+ * @param {number} from
+ * @param {number} to
+ */
+const range = (from, to) => Array.from({ length: to - from }, (_, i) => makeMessage(from + i));
+
+/** @param {{ id: string }[]} messages */
+const numbers = messages => messages.map(message => Number(message.id));
+
+/**
+ * @param {number} from
+ * @param {number} to
+ */
+const span = (from, to) => Array.from({ length: to - from }, (_, i) => from + i);
+
+// Each IndexedDB store gets its own channel in the one shared database
+let channels = 0;
+const stores = {
+  MemoryHistoryStore: () => new app.MemoryHistoryStore(),
+  IndexedDbHistoryStore: () => new app.IndexedDbHistoryStore(`history-test-${channels++}`)
+};
+
+/**
+ * Renders useMessageHistory over store; `current()` is its latest result
+ * @param {any} store
+ */
+const mountHistory = async store => {
+  /** @type {any} */
+  let history;
+  const Probe = () => {
+    history = app.useMessageHistory(store);
+    return null;
+  };
+  const view = await render(h(Probe));
+  return { current: () => history, unmount: view.unmount };
+};
+
+/** @param {() => Promise<unknown>} step */
+const acted = step => act(async () => {
+  await step();
+});
+
+for (const [name, createStore] of Object.entries(stores)) {
+  test(`${name} pages before and after a cursor, which need not still exist`, async () => {
+    const store = createStore();
+    await store.append(range(0, 120));
+
+    assert.deepEqual(numbers(await store.latest(50)), span(70, 120));
+    assert.deepEqual(numbers(await store.before(messageId(70), 50)), span(20, 70));
+    assert.deepEqual(numbers(await store.before(messageId(20), 50)), span(0, 20));
+    assert.deepEqual(await store.before(messageId(0), 50), []);
+    assert.deepEqual(numbers(await store.after(messageId(69), 50)), span(70, 120));
+    assert.deepEqual(await store.after(messageId(119), 50), []);
+
+    assert.deepEqual(numbers(await store.remove([messageId(60)])), [60]);
+    assert.deepEqual(numbers(await store.before(messageId(60), 5)), span(55, 60));
+    assert.deepEqual(numbers(await store.after(messageId(60), 5)), span(61, 66));
+  });
+
+  test(`${name}: scrolling keeps at most MAX_RESIDENT_PAGES resident, evicting the page seen longest ago`, async () => {
+    const store = createStore();
+    const pages = app.MAX_RESIDENT_PAGES + 6;
+    const total = pages * app.HISTORY_PAGE_SIZE;
+    await store.append(range(0, total));
+    const history = await mountHistory(store);
+
+    await acted(() => history.current().jumpToLatest());
+    assert.deepEqual(numbers(history.current().messages), span(total - app.HISTORY_PAGE_SIZE, total));
+    assert.equal(history.current().hasOlder, true);
+
+    // Up to the top; the newest pages go as older ones come in
+    while (history.current().hasOlder) {
+      await acted(() => history.current().loadOlder());
+      const ids = numbers(history.current().messages);
+      assert.ok(ids.length <= MAX_RESIDENT, `${ids.length} messages resident`);
+      assert.deepEqual(ids, span(ids[0], ids[0] + ids.length), 'resident pages stay contiguous');
+    }
+    assert.deepEqual(numbers(history.current().messages), span(0, MAX_RESIDENT));
+    assert.equal(history.current().hasNewer, true);
+
+    // And back down, now evicting from the top
+    await acted(() => history.current().loadNewer());
+    assert.deepEqual(numbers(history.current().messages), span(app.HISTORY_PAGE_SIZE, MAX_RESIDENT + app.HISTORY_PAGE_SIZE));
+    assert.equal(history.current().hasOlder, true);
+    await history.unmount();
+  });
+
+  test(`${name}: live messages past MAX_RESIDENT_PAGES push the oldest page out`, async () => {
+    const store = createStore();
+    const history = await mountHistory(store);
+    await acted(() => history.current().jumpToLatest());
+
+    const total = MAX_RESIDENT + app.HISTORY_PAGE_SIZE;
+    for (let i = 0; i < total; i += 10) await acted(async () => history.current().appendMessages(range(i, i + 10)));
+    assert.deepEqual(numbers(history.current().messages), span(app.HISTORY_PAGE_SIZE, total));
+    assert.equal(history.current().hasOlder, true);
+    assert.equal(history.current().hasNewer, false);
+    await history.unmount();
+  });
+
+  test(`${name}: while scrolled back, others' messages wait and an own send reveals the tail`, async () => {
+    const store = createStore();
+    const total = (app.MAX_RESIDENT_PAGES + 2) * app.HISTORY_PAGE_SIZE;
+    await store.append(range(0, total));
+    const history = await mountHistory(store);
+    await acted(() => history.current().jumpToLatest());
+    while (!history.current().hasNewer) await acted(() => history.current().loadOlder());
+    const scrolledBack = history.current().messages;
+
+    await acted(async () => history.current().appendMessages([makeMessage(total)]));
+    assert.equal(history.current().messages, scrolledBack);
+
+    await acted(async () => history.current().appendMessages([makeMessage(total + 1)], true));
+    await waitFor(() => !history.current().hasNewer);
+    assert.deepEqual(
+      numbers(history.current().messages),
+      span(total + 2 - app.HISTORY_PAGE_SIZE, total + 2)
+    );
+    assert.equal(history.current().hasOlder, true);
+    await history.unmount();
+  });
+
+  test(`${name}: jumpToLatest drops the scrolled-back window for the newest page`, async () => {
+    const store = createStore();
+    const total = (app.MAX_RESIDENT_PAGES + 2) * app.HISTORY_PAGE_SIZE;
+    await store.append(range(0, total));
+    const history = await mountHistory(store);
+    await acted(() => history.current().jumpToLatest());
+    while (history.current().hasOlder) await acted(() => history.current().loadOlder());
+    assert.equal(history.current().hasNewer, true);
+
+    await acted(() => history.current().jumpToLatest());
+    assert.deepEqual(numbers(history.current().messages), span(total - app.HISTORY_PAGE_SIZE, total));
+    assert.equal(history.current().hasOlder, true);
+    assert.equal(history.current().hasNewer, false);
+
+    // Paging up from there starts over from the newest page
+    await acted(() => history.current().loadOlder());
+    assert.deepEqual(numbers(history.current().messages), span(total - 2 * app.HISTORY_PAGE_SIZE, total));
+    await history.unmount();
+  });
+}
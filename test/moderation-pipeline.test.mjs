@@ -0,0 +1,127 @@
+// @ts-check
+import assert from 'node:assert/strict';
+import { test } from 'node:test';
+import { setTimeout as sleep } from 'node:timers/promises';
+import { ThreadModerationWorkers } from '../server/moderation-workers.mjs';
+import { InProcessModerationWorkers, ModerationPipeline } from '../shared/moderation-pipeline.mjs';
+import { createTestStages } from './support/moderation-stages.mjs';
+
+/** @typedef {import('../shared/moderation-pipeline.mjs').ModerationStage} ModerationStage */
+
+/**
+ * A stage that counts its checks and answers with `answer`
+ * @param {string} name
+ * @param {(text: string) => ReturnType<ModerationStage['check']>} answer
+ * @param {Partial<ModerationStage>} [overrides]
+ */
+const countingStage = (name, answer, overrides) => {
+  const stage = {
+    name,
+    timeoutMs: 20,
+    fallback: /** @type {const} */ ('flag'),
+    calls: 0,
+    /** @param {{ text: string }} input */
+    check: ({ text }) => {
+      stage.calls++;
+      return answer(text);
+    },
+    ...overrides
+  };
+  return stage;
+};
+
+test('a stage past its timeout gives its fallback, and a failing one too', async () => {
+  const slow = countingStage('slow', async () => {
+    await sleep(200);
+    return { action: 'allow' };
+  });
+  const broken = countingStage('broken', () => {
+    throw new Error('model unavailable');
+  }, { fallback: 'allow' });
+  const fine = countingStage('fine', () => ({ action: 'allow' }));
+  const pipeline = new ModerationPipeline([slow, broken, fine]);
+
+  const verdict = await pipeline.moderate({ text: 'Is friction ever zero?' });
+  assert.equal(verdict.action, 'flag');
+  assert.deepEqual(verdict.reasons, ['slow timed out']);
+  assert.equal(verdict.degraded, true);
+});
+
+test('degraded verdicts are checked again; settled ones come from the cache', async () => {
+  let slow = true;
+  const stage = countingStage('maybe-slow', async () => {
+    if (slow) await sleep(100);
+    return { action: 'allow' };
+  });
+  const pipeline = new ModerationPipeline([stage]);
+  const input = { text: 'Doubt in SHM' };
+
+  assert.equal((await pipeline.moderate(input)).degraded, true);
+  slow = false;
+  assert.deepEqual(await pipeline.moderate(input), { action: 'allow', reasons: [], degraded: false });
+  assert.equal(stage.calls, 2);
+  await pipeline.moderate(input);
+  assert.equal(stage.calls, 2);
+});
+
+test('identical messages in flight share one check', async () => {
+  const stage = countingStage('lexical', async text => {
+    await sleep(5);
+    return text.includes('spam') ? { action: 'flag', reason: 'spam' } : { action: 'allow' };
+  });
+  const pipeline = new ModerationPipeline([stage]);
+
+  const verdicts = await Promise.all([
+    pipeline.moderate({ text: 'buy spam' }),
+    pipeline.moderate({ text: 'buy spam' }),
+    pipeline.moderate({ text: 'buy spam', imageHash: 'abc' }),
+    pipeline.moderate({ text: 'hello' })
+  ]);
+  assert.deepEqual(verdicts.map(verdict => verdict.action), ['flag', 'flag', 'flag', 'allow']);
+  assert.equal(verdicts[0], verdicts[1]);
+  // The image makes it different content
+  assert.equal(stage.calls, 3);
+});
+
+test('a timed-out check keeps its in-process slot until it settles', async () => {
+  const workers = new InProcessModerationWorkers(1);
+  /** @type {string[]} */
+  const started = [];
+  /** @type {(() => void)[]} */
+  const finish = [];
+  const stage = countingStage('held', text => {
+    started.push(text);
+    return new Promise(resolve => finish.push(() => resolve({ action: 'allow' })));
+  });
+
+  assert.equal(await workers.run(stage, { text: 'first' }), undefined);
+  const second = workers.run(stage, { text: 'second' });
+  await sleep(40);
+  assert.deepEqual(started, ['first']);
+
+  finish[0]();
+  await sleep(0);
+  assert.deepEqual(started, ['first', 'second']);
+  finish[1]();
+  assert.deepEqual(await second, { action: 'allow' });
+});
+
+test('a hung worker thread is replaced and its slot takes work again', { timeout: 20000 }, async () => {
+  const [stage] = createTestStages();
+  const workers = new ThreadModerationWorkers(1, {
+    module: new URL('./support/moderation-stages.mjs', import.meta.url),
+    factory: 'createTestStages'
+  });
+  try {
+    const before = await workers.run(stage, { text: 'warm up' });
+    assert.match(String(before?.reason), /^thread \d+$/);
+
+    assert.equal(await workers.run(stage, { text: 'hang' }), undefined);
+    // Waits for the hung thread's slot, which a new thread takes over
+    const after = await workers.run(stage, { text: 'still there?' });
+    assert.match(String(after?.reason), /^thread \d+$/);
+    assert.notEqual(after?.reason, before?.reason);
+  } finally {
+    await workers.close();
+  }
+});
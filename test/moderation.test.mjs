@@ -0,0 +1,41 @@
+// @ts-check
+import assert from 'node:assert/strict';
+import { test } from 'node:test';
+import { DEFAULT_BLOCKED_WORDS, compileBlockedWords } from '../shared/moderation.mjs';
+
+const containsBlockedWord = compileBlockedWords(DEFAULT_BLOCKED_WORDS);
+
+test('catches disguised variants of blocked words', () => {
+  for (const text of ['what the FUCK', 'sh1t happens', 'shiiiit', 'you asssshole', 'chodh', 'ok mc']) {
+    assert.equal(containsBlockedWord(text), true, text);
+  }
+});
+
+test('catches compounds built on the long stems', () => {
+  for (const text of ['madarchod', 'behenchod', 'you motherfucker', 'total bullshit', 'dipshit', 'a b@stardly move', 'Asssholes']) {
+    assert.equal(containsBlockedWord(text), true, text);
+  }
+});
+
+test('leaves ordinary words with doubled letters alone', () => {
+  for (const text of ['bcc me on it', 'the moon is out', 'mcq practice', 'abc']) {
+    assert.equal(containsBlockedWord(text), false, text);
+  }
+});
+
+test('digits next to numbers and symbols stay digits', () => {
+  for (const text of ['Question 8c please', 'Part (8c)', 'f(x)=8c+1', 'm3 of gas', '4b + 3c']) {
+    assert.equal(containsBlockedWord(text), false, text);
+  }
+  assert.equal(containsBlockedWord('a5$hole'), true);
+});
+
+test('leading star matches inside words', () => {
+  const matches = compileBlockedWords(['*spam']);
+  assert.equal(matches('antispam filter'), true);
+  assert.equal(compileBlockedWords(['spam'])('antispam filter'), false);
+});
+
+test('an empty list never matches', () => {
+  assert.equal(compileBlockedWords(['', '  '])('anything'), false);
+});
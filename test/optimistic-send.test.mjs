@@ -0,0 +1,83 @@
+// @ts-check
+// Optimistic sends against the stand-in chat server: rows show as pending,
+// settle as their acks arrive in whatever order, and fail with a retry once
+// an ack is overdue.
+import assert from 'node:assert/strict';
+import { after, test } from 'node:test';
+import { startServer } from '../server/index.mjs';
+import { buttonLabelled, click, loadApp, render, setupDom, typeInto, waitFor } from './support/dom.mjs';
+
+// Ack delays by message text, one per attempt; anything else is acked at once
+/** @type {Record<string, number[]>} */
+const ACK_DELAYS = { 'first, acked last': [600], 'second, acked first': [50], 'never acked in time': [60000, 0] };
+/** @type {Map<string, number>} */
+const attempts = new Map();
+const server = await startServer({
+  chat: {
+    ackDelayMs: message => {
+      const attempt = attempts.get(String(message.clientId)) ?? 0;
+      attempts.set(String(message.clientId), attempt + 1);
+      return ACK_DELAYS[message.text]?.[attempt] ?? 0;
+    }
+  }
+});
+after(() => server.close());
+
+setupDom(`${server.origin}/`);
+const { default: React } = await import('react');
+const app = await loadApp();
+
+const view = await render(React.createElement(app.default));
+after(() => view.unmount());
+await typeInto(/** @type {HTMLInputElement} */ (view.container.querySelector('#name')), 'asha');
+await click(buttonLabelled(view.container, 'Join JEE Prep Community'));
+await waitFor(() => server.chat.clientCount === 1);
+
+/** @param {string} text */
+const send = async text => {
+  const composer = /** @type {HTMLInputElement} */ (view.container.querySelector('input[placeholder^="Type your message"]'));
+  await typeInto(composer, text);
+  await click(buttonLabelled(view.container, 'Send'));
+};
+
+/** @param {string} text */
+const rowsWith = text =>
+  [...view.container.querySelectorAll('[data-key]')].filter(row => row.querySelector('p')?.textContent === text);
+
+/** @param {string} text */
+const statusOf = text => {
+  const rows = rowsWith(text);
+  assert.equal(rows.length, 1, `one row for "${text}"`);
+  const label = rows[0].textContent ?? '';
+  if (label.includes('Sending…')) return 'pending';
+  if (label.includes('Not delivered')) return 'failed';
+  return 'sent';
+};
+
+test('rows settle as their acks arrive, in any order', async () => {
+  await send('first, acked last');
+  await send('second, acked first');
+  assert.equal(statusOf('first, acked last'), 'pending');
+  assert.equal(statusOf('second, acked first'), 'pending');
+
+  await waitFor(() => statusOf('second, acked first') === 'sent');
+  assert.equal(statusOf('first, acked last'), 'pending');
+
+  await waitFor(() => statusOf('first, acked last') === 'sent');
+  // Settled rows carry the server's ids, in the server's order
+  const keys = [...view.container.querySelectorAll('[data-key]')].map(row => row.getAttribute('data-key'));
+  const [first, second] = ['first, acked last', 'second, acked first'].map(text => rowsWith(text)[0].getAttribute('data-key'));
+  assert.ok(keys.indexOf(first) < keys.indexOf(second));
+});
+
+test('an overdue ack fails the row, and retrying settles it without a duplicate', { timeout: 20000 }, async () => {
+  await send('never acked in time');
+  assert.equal(statusOf('never acked in time'), 'pending');
+
+  await waitFor(() => statusOf('never acked in time') === 'failed', 15000);
+
+  // The server did post it; the retry is acked with the same id, not reposted
+  await click(buttonLabelled(rowsWith('never acked in time')[0], 'Retry'));
+  await waitFor(() => statusOf('never acked in time') === 'sent');
+  assert.deepEqual([...attempts.values()].filter(count => count > 1), [2]);
+});
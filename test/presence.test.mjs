@@ -0,0 +1,77 @@
+// @ts-check
+import assert from 'node:assert/strict';
+import { test } from 'node:test';
+import { PresenceTracker } from '../shared/presence.mjs';
+
+const TTL_MS = 45000;
+const SLOT_MS = 1000;
+
+test('a user without heartbeats expires within a slot of the TTL', () => {
+  const tracker = new PresenceTracker(TTL_MS, 0);
+  tracker.heartbeat('asha', 0);
+  assert.deepEqual(tracker.takeDelta(), { joined: ['asha'], left: [] });
+
+  tracker.expire(TTL_MS - 1);
+  assert.ok(tracker.has('asha'));
+  tracker.expire(TTL_MS + SLOT_MS);
+  assert.ok(!tracker.has('asha'));
+  assert.equal(tracker.size, 0);
+  assert.deepEqual(tracker.takeDelta(), { joined: [], left: ['asha'] });
+});
+
+test('a heartbeat moves the user to a later slot without a delta', () => {
+  const tracker = new PresenceTracker(TTL_MS, 0);
+  tracker.heartbeat('asha', 0);
+  tracker.takeDelta();
+
+  tracker.heartbeat('asha', 30000);
+  assert.equal(tracker.takeDelta(), null);
+  // Past the first expiry, short of the second
+  tracker.expire(TTL_MS + SLOT_MS);
+  assert.ok(tracker.has('asha'));
+  tracker.expire(30000 + TTL_MS + SLOT_MS);
+  assert.ok(!tracker.has('asha'));
+  assert.deepEqual(tracker.takeDelta(), { joined: [], left: ['asha'] });
+});
+
+test('a join and leave in the same batch cancel out', () => {
+  const tracker = new PresenceTracker(TTL_MS, 0);
+  tracker.heartbeat('ravi', 0);
+  tracker.leave('ravi');
+  assert.equal(tracker.takeDelta(), null);
+
+  // And the other way round, for someone already online
+  tracker.heartbeat('meera', 0);
+  tracker.takeDelta();
+  tracker.leave('meera');
+  tracker.heartbeat('meera', 1000);
+  assert.equal(tracker.takeDelta(), null);
+  assert.ok(tracker.has('meera'));
+
+  // Leaving twice, or leaving without having joined, changes nothing
+  tracker.leave('meera');
+  tracker.leave('meera');
+  tracker.leave('nobody');
+  assert.deepEqual(tracker.takeDelta(), { joined: [], left: ['meera'] });
+});
+
+test('after a long pause one lap of the wheel expires everyone due', () => {
+  const tracker = new PresenceTracker(TTL_MS, 0);
+  tracker.heartbeat('asha', 0);
+  tracker.heartbeat('ravi', 20000);
+  tracker.heartbeat('meera', 40000);
+  tracker.takeDelta();
+
+  // Long enough that walking every slot in between would never finish
+  const later = 1e15;
+  tracker.expire(later);
+  assert.equal(tracker.size, 0);
+  assert.deepEqual(tracker.takeDelta()?.left.sort(), ['asha', 'meera', 'ravi']);
+
+  // The wheel carries on from there
+  tracker.heartbeat('asha', later);
+  tracker.expire(later + TTL_MS - 1);
+  assert.ok(tracker.has('asha'));
+  tracker.expire(later + TTL_MS + SLOT_MS);
+  assert.ok(!tracker.has('asha'));
+});
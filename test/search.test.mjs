@@ -0,0 +1,70 @@
+// @ts-check
+import assert from 'node:assert/strict';
+import { after, test } from 'node:test';
+import { startSearchWorker } from './support/search-worker.mjs';
+
+const worker = startSearchWorker();
+after(() => worker.close());
+
+/**
+ * @param {number} i
+ * @param {string} text
+ */
+const doc = (i, text, author = `student${i % 3}`) => ({
+  id: String(i).padStart(6, '0'),
+  name: author,
+  author,
+  text,
+  time: 1000 + i
+});
+
+/** @param {{ id: string }[]} results */
+const idsOf = results => results.map(result => result.id);
+
+test('formulas, symbols and shorthand match what people type', async () => {
+  worker.clear();
+  worker.add([doc(1, 'Why is x² + 2x a parabola?'), doc(2, 'H2SO4 with NaOH, which eqn?'), doc(3, 'Δ of entropy in thermo')]);
+  assert.deepEqual(idsOf(await worker.query({ text: 'x^2' })), ['000001']);
+  assert.deepEqual(idsOf(await worker.query({ text: 'h2so4 equation' })), ['000002']);
+  assert.deepEqual(idsOf(await worker.query({ text: 'delta thermodynamics' })), ['000003']);
+  assert.deepEqual(idsOf(await worker.query({ text: 'parab', prefix: true })), ['000001']);
+});
+
+test('removed messages stop matching and clear empties the index', async () => {
+  worker.clear();
+  worker.add([doc(1, 'projectile range'), doc(2, 'projectile height'), doc(3, 'projectile time')]);
+  worker.remove(['000002']);
+  assert.deepEqual(idsOf(await worker.query({ text: 'projectile' })), ['000003', '000001']);
+  worker.clear();
+  assert.deepEqual(await worker.query({ text: 'projectile' }), []);
+  // Ids can come back after a clear
+  worker.add([doc(2, 'projectile height')]);
+  assert.deepEqual(idsOf(await worker.query({ text: 'projectile' })), ['000002']);
+});
+
+test('compaction keeps results, authors, ranges and prefixes intact', async () => {
+  worker.clear();
+  const docs = Array.from({ length: 4000 }, (_, i) => doc(i, i % 2 ? `kinematics doubt ${i}` : `stoichiometry doubt ${i}`));
+  worker.add(docs);
+  // Half the index, so the worker compacts
+  worker.remove(docs.filter((_, i) => i % 2 === 0).map(d => d.id));
+  const limit = 5000;
+
+  const all = await worker.query({ text: 'doubt', limit });
+  assert.equal(all.length, 2000);
+  assert.ok(all.every(result => Number(result.id) % 2 === 1));
+  assert.deepEqual(await worker.query({ text: 'stoichiometry', limit }), []);
+  assert.deepEqual(await worker.query({ text: 'stoich', prefix: true, limit }), []);
+  assert.equal((await worker.query({ text: 'kinem', prefix: true, limit })).length, 2000);
+
+  const byAuthor = await worker.query({ text: 'doubt', author: 'student1', limit });
+  assert.ok(byAuthor.length > 0 && byAuthor.every(result => result.name === 'student1'));
+  assert.deepEqual(idsOf(await worker.query({ text: 'doubt', from: 1000 + 3001, to: 1000 + 3005, limit })), ['003005', '003003', '003001']);
+
+  // Later adds and removes still line up with the renumbered documents
+  worker.add([doc(5000, 'kinematics again')]);
+  worker.remove(['000001']);
+  const latest = await worker.query({ text: 'kinematics', limit: 1 });
+  assert.deepEqual(idsOf(latest), ['005000']);
+  assert.equal((await worker.query({ text: 'kinematics', limit })).length, 2000);
+});
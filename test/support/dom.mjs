@@ -0,0 +1,173 @@
+// @ts-check
+// Renders the app in Node: a jsdom document stands in for the browser and
+// esbuild compiles Prep.py (TSX) to a module that shares this process's
+// copy of React. Needs the devDependencies (`npm install`).
+import { build } from 'esbuild';
+import { JSDOM } from 'jsdom';
+import { fileURLToPath, pathToFileURL } from 'node:url';
+
+const root = fileURLToPath(new URL('../..', import.meta.url));
+
+/**
+ * Installs jsdom's window as the global environment; call before loadApp.
+ * The app's relative URLs (the chat socket, blobs, the catalog) resolve
+ * against `url`, so point it at a server/index.mjs origin to talk to the
+ * stand-in backend.
+ */
+export const setupDom = (url = 'http://localhost/') => {
+  const { window } = new JSDOM('<!doctype html><html><body><div id="root"></div></body></html>', {
+    url,
+    pretendToBeVisual: true
+  });
+  const global = /** @type {Record<string, unknown>} */ (globalThis);
+  global.window = window;
+  for (const key of Object.getOwnPropertyNames(window)) {
+    if (!(key in globalThis)) global[key] = window[key];
+  }
+  // Node 20 has no global navigator; later versions' can't be replaced
+  if (!('navigator' in globalThis)) global.navigator = window.navigator;
+  // Node's fetch needs absolute URLs; the app's are relative to the page
+  const nodeFetch = globalThis.fetch;
+  global.fetch = (/** @type {RequestInfo | URL} */ input, /** @type {RequestInit} */ init) =>
+    nodeFetch(typeof input === 'string' || input instanceof URL ? new URL(input, window.location.href) : input, init);
+  global.IS_REACT_ACT_ENVIRONMENT = true;
+  return window;
+};
+
+/**
+ * jsdom does no layout: gives every element a viewport-sized client area and
+ * lets scrollTop hold whatever is assigned to it
+ * @param {import('jsdom').DOMWindow} window
+ */
+export const stubLayout = (window, viewportPx = 600) => {
+  const scrollTops = new WeakMap();
+  Object.defineProperty(window.HTMLElement.prototype, 'clientHeight', { configurable: true, get: () => viewportPx });
+  Object.defineProperty(window.Element.prototype, 'scrollTop', {
+    configurable: true,
+    get() {
+      return scrollTops.get(this) ?? 0;
+    },
+    set(value) {
+      scrollTops.set(this, Math.max(0, value));
+    }
+  });
+};
+
+/** Compiles and imports Prep.py; React and ReactDOM stay external */
+export const loadApp = async () => {
+  const outfile = `${root}node_modules/.cache/prepbooster/app.mjs`;
+  await build({
+    entryPoints: [`${root}Prep.py`],
+    outfile,
+    bundle: true,
+    format: 'esm',
+    platform: 'browser',
+    loader: { '.py': 'tsx' },
+    external: ['react', 'react-dom'],
+    logLevel: 'error'
+  });
+  return import(`${pathToFileURL(outfile).href}?t=${Date.now()}`);
+};
+
+/** @param {import('react').ReactElement} element */
+export const render = async element => {
+  const { act } = await import('react');
+  const { createRoot } = await import('react-dom/client');
+  const container = document.createElement('div');
+  document.body.append(container);
+  const reactRoot = createRoot(container);
+  await act(async () => reactRoot.render(element));
+  return {
+    container,
+    /** @param {import('react').ReactElement} next */
+    rerender: next => act(async () => reactRoot.render(next)),
+    unmount: () => act(async () => reactRoot.unmount()).then(() => container.remove())
+  };
+};
+
+/**
+ * Sets an input's value the way typing does, so React's onChange fires
+ * @param {HTMLInputElement} input
+ * @param {string} value
+ */
+export const typeInto = async (input, value) => {
+  const { act } = await import('react');
+  const setValue = Object.getOwnPropertyDescriptor(window.HTMLInputElement.prototype, 'value')?.set;
+  await act(async () => {
+    setValue?.call(input, value);
+    input.dispatchEvent(new window.Event('input', { bubbles: true }));
+  });
+};
+
+/** @param {Element} element */
+export const click = async element => {
+  const { act } = await import('react');
+  await act(async () => {
+    element.dispatchEvent(new window.MouseEvent('click', { bubbles: true }));
+  });
+};
+
+/**
+ * Waits (up to timeoutMs) for check to pass, letting React, timers and
+ * sockets run in between
+ * @param {() => boolean} check
+ */
+export const waitFor = async (check, timeoutMs = 2000) => {
+  const { act } = await import('react');
+  const until = Date.now() + timeoutMs;
+  while (!check()) {
+    if (Date.now() > until) throw new Error('Timed out waiting');
+    await act(() => new Promise(resolve => setTimeout(resolve, 20)));
+  }
+};
+
+/**
+ * First button whose text starts with label
+ * @param {ParentNode} container
+ * @param {string} label
+ */
+export const buttonLabelled = (container, label) => {
+  const button = [...container.querySelectorAll('button')].find(el => el.textContent?.trim().startsWith(label));
+  if (!button) throw new Error(`No "${label}" button`);
+  return button;
+};
+
+// Fiber tags of components (function, class, forwardRef, memo)
+const COMPONENT_TAGS = new Set([0, 1, 11, 14, 15]);
+const PERFORMED_WORK = 1;
+
+/**
+ * Records the component fibers that rendered in each commit, through the
+ * hook React DevTools uses; call before the first render. A fiber rendered
+ * when it isn't carried over untouched from the previous commit and React
+ * did work on it (a memo bailout does none).
+ */
+export const recordRenders = () => {
+  /** @type {any[][]} */
+  const commits = [];
+  let previous = new WeakSet();
+  /** @type {Record<string, unknown>} */ (globalThis).__REACT_DEVTOOLS_GLOBAL_HOOK__ = {
+    supportsFiber: true,
+    isDisabled: false,
+    inject: () => 1,
+    checkDCE: () => {},
+    onCommitFiberUnmount: () => {},
+    onPostCommitFiberRoot: () => {},
+    onCommitFiberRoot: (/** @type {number} */ _renderer, /** @type {{ current: any }} */ root) => {
+      const seen = new WeakSet();
+      /** @type {any[]} */
+      const rendered = [];
+      const stack = [root.current];
+      while (stack.length) {
+        const fiber = stack.pop();
+        seen.add(fiber);
+        if (!previous.has(fiber) && COMPONENT_TAGS.has(fiber.tag) && fiber.flags & PERFORMED_WORK) rendered.push(fiber);
+        if (fiber.sibling) stack.push(fiber.sibling);
+        if (fiber.child) stack.push(fiber.child);
+      }
+      previous = seen;
+      commits.push(rendered);
+    }
+  };
+  return commits;
+};
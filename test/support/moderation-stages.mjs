@@ -0,0 +1,18 @@
+// @ts-check
+// A stage for the ThreadModerationWorkers tests, in its own module so worker
+// threads can build it. It answers with the thread it ran on, and "hang"
+// never returns.
+import { threadId } from 'node:worker_threads';
+
+/** @param {{ timeoutMs?: number }} [options] */
+export const createTestStages = ({ timeoutMs = 20 } = {}) => [
+  {
+    name: 'probe',
+    timeoutMs,
+    fallback: /** @type {const} */ ('flag'),
+    check: (/** @type {{ text: string }} */ { text }) => {
+      if (text === 'hang') for (;;);
+      return { action: /** @type {const} */ ('allow'), reason: `thread ${threadId}` };
+    }
+  }
+];
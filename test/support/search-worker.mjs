@@ -0,0 +1,41 @@
+// @ts-check
+// Runs shared/search-worker.mjs in a worker_threads Worker, with a `self`
+// that speaks the browser worker API
+import { Worker } from 'node:worker_threads';
+import { SEARCH_WORKER_SOURCE } from '../../shared/search-worker.mjs';
+
+const SHIM = `
+const { parentPort } = require('node:worker_threads');
+const self = { postMessage: data => parentPort.postMessage(data) };
+parentPort.on('message', data => self.onmessage({ data }));
+`;
+
+export const startSearchWorker = () => {
+  const worker = new Worker(SHIM + SEARCH_WORKER_SOURCE, { eval: true });
+  let nextId = 0;
+  /** @type {Map<number, (results: { id: string, name: string, text: string, time: number }[]) => void>} */
+  const pending = new Map();
+  worker.on('message', ({ id, results }) => {
+    pending.get(id)?.(results);
+    pending.delete(id);
+  });
+  return {
+    /** @param {{ id: string, name: string, author: string, text: string, time: number }[]} docs */
+    add: docs => worker.postMessage({ type: 'add', docs }),
+    /** @param {string[]} ids */
+    remove: ids => worker.postMessage({ type: 'remove', ids }),
+    clear: () => worker.postMessage({ type: 'clear' }),
+    /**
+     * Resolves once the worker has handled everything posted before it
+     * @param {{ text: string, prefix?: boolean, author?: string, from?: number, to?: number, limit?: number }} query
+     */
+    query: query => {
+      const id = nextId++;
+      return new Promise(resolve => {
+        pending.set(id, resolve);
+        worker.postMessage({ type: 'query', id, query: { limit: 20, ...query } });
+      });
+    },
+    close: () => worker.terminate()
+  };
+};
@@ -0,0 +1,274 @@
+// The admin panel and its telemetry view; Prep.py loads them only once
+// someone opens the admin login, so other users never download them.
+import React, { useState, useEffect, useMemo } from 'react';
+import { RATE_BUCKET_MS, ratePerMinute, saveBlob, telemetry, useStoreSelector, type TelemetryEntry } from '../core.tsx';
+import type { CommunityStore } from '../Prep.py';
+
+interface TelemetrySummary {
+  name: string;
+  count: number;
+  p50: number;
+  p95: number;
+  max: number;
+}
+
+const summarizeTelemetry = (entries: TelemetryEntry[]): TelemetrySummary[] => {
+  const durations = new Map<string, number[]>();
+  entries.forEach(entry => {
+    const list = durations.get(entry.name);
+    if (list) {
+      list.push(entry.duration);
+    } else {
+      durations.set(entry.name, [entry.duration]);
+    }
+  });
+  return [...durations]
+    .map(([name, list]) => {
+      list.sort((a, b) => a - b);
+      const at = (q: number) => list[Math.min(list.length - 1, Math.floor(q * list.length))];
+      return { name, count: list.length, p50: at(0.5), p95: at(0.95), max: list[list.length - 1] };
+    })
+    .sort((a, b) => (a.name < b.name ? -1 : 1));
+};
+
+const downloadJson = (fileName: string, data: unknown) =>
+  saveBlob(fileName, new Blob([JSON.stringify(data, null, 2)], { type: 'application/json' }));
+
+const downloadTelemetry = () => {
+  downloadJson(`prepbooster-telemetry-${Date.now()}.json`, {
+    capturedAt: new Date().toISOString(),
+    sampleRate: telemetry.sampleRate,
+    userAgent: navigator.userAgent,
+    entries: telemetry.snapshot()
+  });
+};
+
+const TELEMETRY_REFRESH_MS = 1000;
+
+// Reads the ring buffer on a timer rather than per entry, so watching the
+// numbers doesn't add renders to them
+const TelemetryPanel = React.memo(() => {
+  const [sampleRate, setSampleRate] = useState(telemetry.sampleRate);
+  const [summary, setSummary] = useState<TelemetrySummary[]>(() => summarizeTelemetry(telemetry.snapshot()));
+
+  useEffect(() => {
+    if (!sampleRate) return;
+    const timer = setInterval(() => setSummary(summarizeTelemetry(telemetry.snapshot())), TELEMETRY_REFRESH_MS);
+    return () => clearInterval(timer);
+  }, [sampleRate]);
+
+  const handleSampleRate = (rate: number) => {
+    telemetry.setSampleRate(rate);
+    setSampleRate(rate);
+  };
+
+  const handleClear = () => {
+    telemetry.clear();
+    setSummary([]);
+  };
+
+  return (
+    <div className="bg-white p-4 rounded-lg shadow mt-4">
+      <h4 className="font-semibold mb-3 text-blue-600">📈 Performance</h4>
+      <div className="flex flex-wrap items-center gap-2 text-sm mb-3">
+        <select
+          value={sampleRate}
+          onChange={(e) => handleSampleRate(Number(e.target.value))}
+          className="p-1 border rounded"
+        >
+          <option value={0}>Off</option>
+          <option value={0.1}>Sample 10%</option>
+          <option value={1}>Record all</option>
+        </select>
+        <button onClick={downloadTelemetry} className="bg-gray-600 text-white px-3 py-1 rounded hover:bg-gray-700">
+          Download JSON
+        </button>
+        <button onClick={handleClear} className="bg-gray-200 text-gray-700 px-3 py-1 rounded hover:bg-gray-300">
+          Clear
+        </button>
+      </div>
+      {summary.length === 0 ? (
+        <p className="text-sm text-gray-500">No samples yet.</p>
+      ) : (
+        <table className="w-full text-xs">
+          <thead>
+            <tr className="text-left text-gray-500">
+              <th>Span</th>
+              <th className="text-right">Count</th>
+              <th className="text-right">p50 ms</th>
+              <th className="text-right">p95 ms</th>
+              <th className="text-right">Max ms</th>
+            </tr>
+          </thead>
+          <tbody>
+            {summary.map(row => (
+              <tr key={row.name}>
+                <td>{row.name}</td>
+                <td className="text-right">{row.count}</td>
+                <td className="text-right">{row.p50.toFixed(1)}</td>
+                <td className="text-right">{row.p95.toFixed(1)}</td>
+                <td className="text-right">{row.max.toFixed(1)}</td>
+              </tr>
+            ))}
+          </tbody>
+        </table>
+      )}
+    </div>
+  );
+});
+
+// Users listed under "Most Active"
+const TOP_POSTERS = 5;
+
+interface AdminPanelProps {
+  store: CommunityStore;
+  blockedWordCount: number;
+  onRemoveAllFlagged: () => void;
+  onClearChat: () => void;
+  onEditBlockedWords: () => void;
+}
+
+// Mounted only in admin mode, so other users never render it or re-render
+// on every stats change
+const AdminPanel = React.memo(({ store, blockedWordCount, onRemoveAllFlagged, onClearChat, onEditBlockedWords }: AdminPanelProps) => {
+  const onlineCount = useStoreSelector(store, state => state.onlineUsers.size);
+  const bannedUsers = useStoreSelector(store, state => state.bannedUsers);
+  const studyGroups = useStoreSelector(store, state => state.studyGroups);
+  const moderationStats = useStoreSelector(store, state => state.stats);
+  const flagQueueLength = useStoreSelector(store, state => state.flagQueue.length);
+  const [statsNow, setStatsNow] = useState(Date.now);
+  const { messagesByUser, flagsByUser } = moderationStats;
+  // Re-sorted only when the per-user counts change
+  const topPosters = useMemo(
+    () => [...messagesByUser].sort((a, b) => b[1] - a[1]).slice(0, TOP_POSTERS),
+    [messagesByUser]
+  );
+
+  // Keep the rolling rates current
+  useEffect(() => {
+    const timer = setInterval(() => setStatsNow(Date.now()), RATE_BUCKET_MS);
+    return () => clearInterval(timer);
+  }, []);
+
+  return (
+    <div className="max-w-6xl mx-auto p-4">
+      <div className="bg-red-50 border border-red-200 rounded-lg p-4">
+        <h3 className="font-bold text-lg mb-4 text-red-700">🛡️ Admin Panel</h3>
+        <div className="bg-white p-4 rounded-lg shadow">
+          <h4 className="font-semibold mb-2 text-blue-600">📊 Chat Statistics</h4>
+          <div className="space-y-2 text-sm">
+            <div className="flex justify-between">
+              <span>Online Users:</span>
+              <span className="font-semibold text-green-600">{onlineCount}</span>
+            </div>
+            <div className="flex justify-between">
+              <span>Banned Users:</span>
+              <span className="font-semibold">{bannedUsers.size}</span>
+            </div>
+            <div className="flex justify-between">
+              <span>Active Groups:</span>
+              <span className="font-semibold">{studyGroups.length}</span>
+            </div>
+            <div className="flex justify-between">
+              <span>Messages (session):</span>
+              <span className="font-semibold">{moderationStats.messageCount}</span>
+            </div>
+            <div className="flex justify-between">
+              <span>Flag Queue:</span>
+              <span className="font-semibold text-red-600">{flagQueueLength}</span>
+            </div>
+            <div className="flex justify-between">
+              <span>Messages / min:</span>
+              <span className="font-semibold">{ratePerMinute(moderationStats.messageRate, statsNow)}</span>
+            </div>
+            <div className="flex justify-between">
+              <span>Flags / min:</span>
+              <span className="font-semibold">{ratePerMinute(moderationStats.flagRate, statsNow)}</span>
+            </div>
+            {moderationStats.topFlagged && (
+              <div className="flex justify-between">
+                <span>Most Flagged:</span>
+                <span className="font-semibold">
+                  {moderationStats.topFlagged.name} ({moderationStats.topFlagged.count})
+                </span>
+              </div>
+            )}
+            {topPosters.length > 0 && (
+              <div>
+                <span>Most Active:</span>
+                <ul className="mt-1 space-y-1">
+                  {topPosters.map(([name, count]) => (
+                    <li key={name} className="flex justify-between pl-2">
+                      <span>{name}</span>
+                      <span className="font-semibold">
+                        {count} messages{flagsByUser.has(name) ? `, ${flagsByUser.get(name)} flagged` : ''}
+                      </span>
+                    </li>
+                  ))}
+                </ul>
+              </div>
+            )}
+          </div>
+
+          <h4 className="font-semibold mt-4 mb-2 text-blue-600">System Info</h4>
+          <div className="text-xs text-gray-600 space-y-1">
+            <div>App Version: 2.0.0</div>
+            <div>Last Updated: {new Date().toLocaleDateString()}</div>
+            <div>Admin Access: Full Permissions</div>
+          </div>
+        </div>
+      </div>
+
+      {/* Advanced Controls */}
+      <div className="bg-white p-4 rounded-lg shadow mt-4">
+        <h4 className="font-semibold mb-3 text-blue-600">⚙️ Advanced Controls</h4>
+        <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
+          <div>
+            <h5 className="font-medium mb-2">Message Management</h5>
+            <div className="space-y-2 text-sm">
+              <button 
+                onClick={onRemoveAllFlagged}
+                className="w-full bg-orange-500 text-white px-3 py-1 rounded hover:bg-orange-600"
+              >
+                Remove All Flagged
+              </button>
+              <button 
+                onClick={onClearChat}
+                className="w-full bg-red-500 text-white px-3 py-1 rounded hover:bg-red-600"
+              >
+                Clear Chat History
+              </button>
+              <button 
+                onClick={onEditBlockedWords}
+                className="w-full bg-gray-600 text-white px-3 py-1 rounded hover:bg-gray-700"
+              >
+                Edit Blocked Words ({blockedWordCount})
+              </button>
+            </div>
+          </div>
+          <div>
+            <h5 className="font-medium mb-2">User Controls</h5>
+            <div className="space-y-2 text-sm">
+              <button 
+                onClick={() => store.dispatch({ type: 'setOnlineUsers', users: [] })}
+                className="w-full bg-blue-500 text-white px-3 py-1 rounded hover:bg-blue-600"
+              >
+                Kick All Users
+              </button>
+              <button 
+                onClick={() => store.dispatch({ type: 'unbanAll' })}
+                className="w-full bg-green-500 text-white px-3 py-1 rounded hover:bg-green-600"
+              >
+                Unban All Users
+              </button>
+            </div>
+          </div>
+        </div>
+      </div>
+
+      <TelemetryPanel />
+    </div>
+  );
+});
+
+export default AdminPanel;
@@ -0,0 +1,54 @@
+// The Study Groups tab; Prep.py loads it when the tab is first opened (or
+// prefetched).
+import React from 'react';
+import { groupChannel, useStoreSelector } from '../core.tsx';
+import type { CommunityStore } from '../Prep.py';
+
+interface GroupsTabProps {
+  store: CommunityStore;
+  onJoin: (groupId: number) => void;
+  onLeave: (groupId: number) => void;
+  onOpen: (channel: string) => void;
+}
+
+const GroupsTab = React.memo(({ store, onJoin, onLeave, onOpen }: GroupsTabProps) => {
+  const studyGroups = useStoreSelector(store, state => state.studyGroups);
+  return (
+    <div className="bg-white rounded-lg shadow-lg p-6">
+      <h2 className="font-bold text-2xl mb-6 text-indigo-600">Study Groups</h2>
+      <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
+        {studyGroups.map(group => (
+          <div key={group.id} className="border rounded-lg p-4">
+            <h3 className="font-semibold text-lg mb-2">{group.name}</h3>
+            <p className="text-gray-600 text-sm mb-3">{group.members} members active</p>
+            {group.isJoined ? (
+              <div className="flex space-x-2">
+                <button
+                  onClick={() => onOpen(groupChannel(group.id))}
+                  className="bg-indigo-600 text-white px-4 py-2 rounded-lg text-sm hover:bg-indigo-700"
+                >
+                  Open Chat
+                </button>
+                <button 
+                  onClick={() => onLeave(group.id)}
+                  className="bg-red-600 text-white px-4 py-2 rounded-lg text-sm hover:bg-red-700"
+                >
+                  Leave Group
+                </button>
+              </div>
+            ) : (
+              <button 
+                onClick={() => onJoin(group.id)}
+                className="bg-green-600 text-white px-4 py-2 rounded-lg text-sm hover:bg-green-700"
+              >
+                Join Group
+              </button>
+            )}
+          </div>
+        ))}
+      </div>
+    </div>
+  );
+});
+
+export default GroupsTab;
@@ -0,0 +1,212 @@
+// The JEE Resources tab; Prep.py loads it when the tab is first opened (or
+// prefetched), so the name screen doesn't ship the catalog client.
+import React, { useState, useRef, useEffect, useMemo } from 'react';
+import { saveBlob } from '../core.tsx';
+import {
+  FIRST_EXAM_YEAR,
+  HttpCache,
+  RESOURCE_SUBJECTS,
+  RESOURCE_TYPES,
+  catalogUrl,
+  downloadResource,
+  type CatalogPage,
+  type CatalogQuery,
+  type JeeResource,
+  type ResourceSubject,
+  type ResourceType
+} from '../shared/catalog.mjs';
+
+const RESOURCE_YEARS = Array.from(
+  { length: new Date().getFullYear() - FIRST_EXAM_YEAR + 1 },
+  (_, i) => new Date().getFullYear() - i
+);
+
+// Resource catalog (the client and its HTTP cache are in shared/catalog.mjs)
+const catalogCache = new HttpCache();
+
+export const fetchCatalogPage = (query: CatalogQuery, cursor?: string, onUpdate?: (page: CatalogPage) => void) =>
+  catalogCache.get<CatalogPage>(catalogUrl(query, cursor), onUpdate);
+
+// Streams the file with progress, then saves it under its URL's name
+const saveResource = async (
+  resource: JeeResource,
+  onProgress: (fraction: number | null) => void,
+  signal?: AbortSignal
+) => {
+  const blob = await downloadResource(resource, onProgress, signal);
+  const fileName = decodeURIComponent(new URL(resource.url, location.href).pathname.split('/').pop() || resource.title);
+  saveBlob(fileName, blob);
+};
+
+// Pages of the catalog for one query, loaded on demand; a new query starts over
+const useResourceCatalog = ({ subject, year, type }: CatalogQuery) => {
+  const [pages, setPages] = useState<CatalogPage[]>([]);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+  // Responses for an earlier query are dropped
+  const generationRef = useRef(0);
+
+  const load = (index: number, cursor?: string) => {
+    const generation = generationRef.current;
+    // A revalidated page may have moved items across page boundaries, so
+    // the pages after it are dropped and load again on demand
+    const place = (page: CatalogPage) => {
+      if (generation === generationRef.current) setPages(previous => [...previous.slice(0, index), page]);
+    };
+    setLoading(true);
+    setError(null);
+    fetchCatalogPage({ subject, year, type }, cursor, place)
+      .then(place, (failure: Error) => {
+        if (generation === generationRef.current) setError(failure.message);
+      })
+      .finally(() => {
+        if (generation === generationRef.current) setLoading(false);
+      });
+  };
+
+  useEffect(() => {
+    generationRef.current++;
+    setPages([]);
+    load(0);
+  }, [subject, year, type]);
+
+  const last = pages[pages.length - 1];
+  const items = useMemo(() => pages.flatMap(page => page.items), [pages]);
+
+  const loadMore = () => {
+    if (!loading && last?.nextCursor) load(pages.length, last.nextCursor);
+  };
+
+  return { items, total: last?.total ?? 0, hasMore: !!last?.nextCursor, loading, error, loadMore };
+};
+
+const formatBytes = (bytes: number) =>
+  bytes < 1024 * 1024 ? `${Math.max(1, Math.round(bytes / 1024))} KB` : `${(bytes / (1024 * 1024)).toFixed(1)} MB`;
+
+interface ResourceCardProps {
+  resource: JeeResource;
+}
+
+// Owns its download progress, so a running download re-renders one card
+const ResourceCard = React.memo(({ resource }: ResourceCardProps) => {
+  const [downloading, setDownloading] = useState(false);
+  const [progress, setProgress] = useState<number | null>(0);
+  const abortRef = useRef<AbortController | null>(null);
+
+  useEffect(() => () => abortRef.current?.abort(), []);
+
+  const handleDownload = () => {
+    const controller = new AbortController();
+    abortRef.current = controller;
+    setDownloading(true);
+    setProgress(0);
+    saveResource(resource, setProgress, controller.signal)
+      .catch(error => {
+        if (!controller.signal.aborted) alert(`Could not download "${resource.title}": ${error.message}`);
+      })
+      .finally(() => setDownloading(false));
+  };
+
+  return (
+    <div className="border rounded-lg p-4 hover:shadow-md transition-shadow">
+      <h3 className="font-semibold text-lg mb-2 text-indigo-700">{resource.title}</h3>
+      <p className="text-xs text-gray-500 mb-2">
+        {RESOURCE_SUBJECTS[resource.subject]} · {RESOURCE_TYPES[resource.type]}
+        {resource.year ? ` · ${resource.year}` : ''}
+      </p>
+      <p className="text-gray-600 text-sm mb-3">{resource.description}</p>
+      {downloading ? (
+        <div>
+          <div className="w-full bg-gray-200 rounded-full h-2 overflow-hidden">
+            <div
+              className={`bg-indigo-600 h-2 ${progress === null ? 'w-full animate-pulse' : ''}`}
+              style={progress === null ? undefined : { width: `${Math.round(progress * 100)}%` }}
+            />
+          </div>
+          <p className="text-xs text-gray-500 mt-1">
+            {progress === null ? 'Downloading…' : `Downloading… ${Math.round(progress * 100)}%`}
+          </p>
+        </div>
+      ) : (
+        <button
+          onClick={handleDownload}
+          className="bg-indigo-600 text-white px-4 py-2 rounded-lg text-sm hover:bg-indigo-700"
+        >
+          Download{resource.sizeBytes ? ` (${formatBytes(resource.sizeBytes)})` : ''}
+        </button>
+      )}
+    </div>
+  );
+});
+
+// Each filter combination is its own cached query, so going back to one
+// already seen is instant
+const ResourcesTab = React.memo(() => {
+  const [subject, setSubject] = useState<ResourceSubject | ''>('');
+  const [year, setYear] = useState('');
+  const [type, setType] = useState<ResourceType | ''>('');
+  const catalog = useResourceCatalog({ subject: subject || undefined, year: Number(year) || undefined, type: type || undefined });
+
+  return (
+    <div className="bg-white rounded-lg shadow-lg p-6">
+      <h2 className="font-bold text-2xl mb-6 text-indigo-600">JEE Preparation Resources</h2>
+      <div className="flex flex-wrap gap-2 mb-6 text-sm">
+        <select
+          value={subject}
+          onChange={(e) => setSubject(e.target.value as ResourceSubject | '')}
+          className="px-3 py-2 border border-gray-300 rounded-lg"
+        >
+          <option value="">All subjects</option>
+          {Object.entries(RESOURCE_SUBJECTS).map(([value, label]) => (
+            <option key={value} value={value}>{label}</option>
+          ))}
+        </select>
+        <select
+          value={type}
+          onChange={(e) => setType(e.target.value as ResourceType | '')}
+          className="px-3 py-2 border border-gray-300 rounded-lg"
+        >
+          <option value="">All types</option>
+          {Object.entries(RESOURCE_TYPES).map(([value, label]) => (
+            <option key={value} value={value}>{label}</option>
+          ))}
+        </select>
+        <select
+          value={year}
+          onChange={(e) => setYear(e.target.value)}
+          className="px-3 py-2 border border-gray-300 rounded-lg"
+        >
+          <option value="">Any year</option>
+          {RESOURCE_YEARS.map(value => (
+            <option key={value} value={value}>{value}</option>
+          ))}
+        </select>
+        <span className="self-center text-gray-500">
+          {catalog.total} {catalog.total === 1 ? 'resource' : 'resources'}
+        </span>
+      </div>
+      {catalog.error && <p className="text-sm text-red-600 mb-4">{catalog.error}</p>}
+      <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
+        {catalog.items.map(resource => (
+          <ResourceCard key={resource.id} resource={resource} />
+        ))}
+      </div>
+      {!catalog.loading && !catalog.error && !catalog.items.length && (
+        <p className="text-center text-gray-500 py-8">No resources match these filters.</p>
+      )}
+      {(catalog.hasMore || catalog.loading) && (
+        <div className="text-center mt-6">
+          <button
+            onClick={catalog.loadMore}
+            disabled={catalog.loading}
+            className="bg-indigo-600 text-white px-4 py-2 rounded-lg text-sm hover:bg-indigo-700 disabled:opacity-50"
+          >
+            {catalog.loading ? 'Loading…' : 'Load more'}
+          </button>
+        </div>
+      )}
+    </div>
+  );
+});
+
+export default ResourcesTab;